@@ -0,0 +1,171 @@
+import math
+import threading
+import time
+
+import concurrency
+import config
+import metrics
+
+
+class Overloaded(Exception):
+    """Raised instead of queueing an upstream call when a wiki's queue is full or the wait would be too long."""
+
+    def __init__(self, host:str, retry_after:float):
+        super().__init__(f"Too many pending requests to {host}; retry in {math.ceil(retry_after)}s.")
+        self.host = host
+        self.retry_after = retry_after
+
+
+class Unavailable(Overloaded):
+    """Raised when a wiki still fails after the retries; reported like shedding, as 503 with a Retry-After."""
+
+    def __init__(self, host:str, retry_after:float, reason:Exception):
+        super().__init__(host, retry_after)
+        self.args = (f"{host} is unavailable ({reason}); retry in {math.ceil(retry_after)}s.",)
+
+
+class TokenBucket:
+    """Request rate limit with bursts; callers reserve a token and sleep until it is due."""
+
+    def __init__(self, rate:float, burst:float):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Takes one token and returns the seconds to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate)
+
+    def cancel(self):
+        with self._lock:
+            self._tokens += 1
+
+
+class AdaptiveLimit:
+    """Concurrency limit with additive increase and multiplicative decrease (AIMD).
+
+    The limit grows by about one per round trip while calls succeed within the
+    target latency, and halves (at most once per cooldown) on throttling or slow calls.
+    """
+
+    def __init__(self, minimum:int, maximum:int, target_latency:float, cooldown:float=1.0):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.target_latency = target_latency
+        self.cooldown = cooldown
+        self.limit = float(self.maximum)
+        self._last_decrease = 0.0
+
+    def on_success(self, latency:float):
+        if latency > self.target_latency:
+            self.on_throttled()
+        else:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+
+    def on_throttled(self):
+        now = time.monotonic()
+        if now - self._last_decrease >= self.cooldown:
+            self.limit = max(self.minimum, self.limit / 2)
+            self._last_decrease = now
+
+
+class HostGate:
+    """Admission control for one wiki host: rate limit, adaptive concurrency and a bounded wait queue."""
+
+    def __init__(self, host:str):
+        self.host = host
+        self.bucket = None
+        if config.HTTP_RATE_LIMIT > 0:
+            self.bucket = TokenBucket(config.HTTP_RATE_LIMIT, config.HTTP_RATE_BURST)
+        self.concurrency = AdaptiveLimit(config.HTTP_MIN_CONCURRENCY, config.HTTP_MAX_CONCURRENCY,
+                                         config.HTTP_TARGET_LATENCY)
+        self.in_flight = 0
+        self.queued = 0
+        self._condition = threading.Condition()
+
+    @property
+    def saturated(self) -> bool:
+        return self.queued >= config.HTTP_QUEUE_SIZE
+
+    def retry_after(self) -> float:
+        rate = self.bucket.rate if self.bucket is not None else self.concurrency.limit / self.concurrency.target_latency
+        return max(1.0, self.queued / max(rate, 1e-6))
+
+    def _shed(self) -> Overloaded:
+        metrics.UPSTREAM_SHED.inc(host=self.host)
+        return Overloaded(self.host, self.retry_after())
+
+    def acquire(self):
+        """Waits for a concurrency slot and a rate token, or raises ``Overloaded`` after ``HTTP_QUEUE_TIMEOUT``."""
+        deadline = time.monotonic() + config.HTTP_QUEUE_TIMEOUT
+        with self._condition:
+            if self.in_flight >= int(self.concurrency.limit):
+                # A full queue only stops new inbound requests (see inbound_overload); calls of
+                # requests already admitted still wait, up to the timeout, so they can finish.
+                self.queued += 1
+                try:
+                    while self.in_flight >= int(self.concurrency.limit):
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise self._shed()
+                        self._condition.wait(remaining)
+                finally:
+                    self.queued -= 1
+            self.in_flight += 1
+
+        if self.bucket is not None:
+            wait = self.bucket.reserve()
+            if time.monotonic() + wait > deadline:
+                self.bucket.cancel()
+                self.release()
+                raise self._shed()
+            time.sleep(wait)
+
+    def release(self, latency:float|None=None, throttled:bool=False):
+        with self._condition:
+            self.in_flight -= 1
+            if throttled:
+                self.concurrency.on_throttled()
+            elif latency is not None:
+                self.concurrency.on_success(latency)
+            metrics.UPSTREAM_CONCURRENCY_LIMIT.set(self.concurrency.limit, host=self.host)
+            self._condition.notify_all()
+
+    def throttled(self):
+        """Signals throttling detected after the call completed (e.g. a ``maxlag`` error body)."""
+        with self._condition:
+            self.concurrency.on_throttled()
+            metrics.UPSTREAM_CONCURRENCY_LIMIT.set(self.concurrency.limit, host=self.host)
+
+
+_gates:dict[str, HostGate] = {}
+_gates_lock = threading.Lock()
+
+
+def gate(host:str) -> HostGate:
+    with _gates_lock:
+        if host not in _gates:
+            _gates[host] = HostGate(host)
+        return _gates[host]
+
+
+def inbound_overload() -> Overloaded | None:
+    """Why new inbound work should be rejected right now, if it should.
+
+    That is the case while any wiki's wait queue is full or while the analysis
+    pool has more than ``ANALYSIS_QUEUE_SIZE`` calls waiting for a thread.
+    """
+    with _gates_lock:
+        host_gate = next((host_gate for host_gate in _gates.values() if host_gate.saturated), None)
+    if host_gate is not None:
+        return Overloaded(host_gate.host, host_gate.retry_after())
+    if concurrency.backlog() >= config.ANALYSIS_THREADS + config.ANALYSIS_QUEUE_SIZE:
+        return Overloaded("the analysis pool", 1.0)
+    return None
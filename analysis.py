@@ -0,0 +1,236 @@
+import re
+from typing import Iterable
+
+from lxml import etree, html as lxml_html
+
+HEADER_TAGS = ("h1", "h2", "h3", "h4", "h5", "h6")
+SECTION_HEADING_TAGS = ("h2", "h3")
+SEE_ALSO_SECTION = "See also"
+# Parents whose children are top-level blocks of the article (Parsoid wraps each section in <section>).
+BLOCK_PARENT_TAGS = ("body", "section")
+# The article content: the <div> of action=parse HTML, or the <body> of REST (Parsoid) HTML.
+CONTENT_CLASSES = {"mw-parser-output", "parsoid-body"}
+# The "Contents" heading of the table of contents, which only action=parse HTML has.
+TOC_HEADING_ID = "mw-toc-heading"
+
+
+class DocumentTooLarge(ValueError):
+    """Raised while streaming when the HTML grows past the allowed size."""
+
+
+def _classes(element) -> list[str]:
+    return (element.get("class") or "").split()
+
+
+def _colspan(cell) -> int:
+    try:
+        return max(1, int(cell.get("colspan", "1")))
+    except ValueError:
+        return 1
+
+
+def _text(element) -> str:
+    """Equivalent of BeautifulSoup's ``get_text(" ", strip=True)``."""
+    return " ".join(text.strip() for text in element.itertext() if text.strip())
+
+
+class HtmlAnalyzer:
+    """Computes every HTML-based metric from one stream of start/end element events.
+
+    Produces the header counts, per-table row and column stats, the attribute
+    pairs of the first infobox and the number of links in the list following
+    the "See also" heading. Events can come from ``etree.iterwalk`` over a
+    parsed tree or from an incremental parser; only the element being closed
+    and its ancestors are ever inspected. The ``action=parse`` and the REST
+    (Parsoid) HTML of a revision give the same metrics.
+    """
+
+    def __init__(self, section_name:str=SEE_ALSO_SECTION):
+        self.section_pattern = re.compile(section_name, re.IGNORECASE)
+        self.headers = dict.fromkeys(HEADER_TAGS, 0)
+        self.tables:list[dict] = []
+        self.infobox:list[dict | None] = []
+        self.see_also_links = 0
+
+        self._open_tables:list[dict] = []
+        self._open_rows:list[dict] = []
+        self._content_depth = 0
+        self._infobox_element = None
+        self._infobox_done = False
+        # See-also state: None (searching), the heading anchor (scanning siblings), the list being counted, or True (done)
+        self._see_also = None
+        self._see_also_list = None
+
+    def start(self, element):
+        tag = element.tag
+        if not isinstance(tag, str):
+            return
+        if not CONTENT_CLASSES.isdisjoint(_classes(element)):
+            self._content_depth += 1
+
+        if tag in self.headers:
+            if element.get("id") != TOC_HEADING_ID:
+                self.headers[tag] += 1
+        elif tag == "table":
+            self._start_table(element)
+        elif tag == "tr":
+            self._start_row(element)
+        elif tag in ("td", "th"):
+            columns = _colspan(element)
+            for row in self._open_rows:
+                row["columns"] += columns
+
+        self._scan_see_also(element, tag)
+
+    def end(self, element):
+        tag = element.tag
+        if not isinstance(tag, str):
+            return
+        if tag == "tr":
+            self._end_row(element)
+        elif tag == "table":
+            table = self._open_tables.pop()
+            if table["Columns"] is None:
+                table["Columns"] = 0
+            if element is self._infobox_element:
+                self._infobox_element = None
+                self._infobox_done = True
+        elif tag in SECTION_HEADING_TAGS and self._see_also is None and self._content_depth:
+            if self.section_pattern.match("".join(element.itertext()).strip()):
+                # Newer skins wrap headings in <div class="mw-heading">; the list is a sibling of the wrapper.
+                parent = element.getparent()
+                if parent is not None and parent.tag == "div" and "mw-heading" in _classes(parent):
+                    self._see_also = parent
+                else:
+                    self._see_also = element
+        elif element is self._see_also_list:
+            self._see_also_list = None
+            self._see_also = True
+
+        if not CONTENT_CLASSES.isdisjoint(_classes(element)):
+            self._content_depth -= 1
+
+    def can_discard(self, element) -> bool:
+        """Whether a closed element will not be looked at again, so an incremental parser may drop it."""
+        return self._infobox_element is None and element is not self._see_also
+
+    def _start_table(self, element):
+        table = {"Index": len(self.tables) + 1, "Rows": 0, "Columns": None, "first_row": None}
+        self.tables.append(table)
+        self._open_tables.append(table)
+        if self._infobox_element is None and not self._infobox_done and "infobox" in _classes(element):
+            self._infobox_element = element
+
+    def _start_row(self, element):
+        row = {"columns": 0, "infobox_slot": None}
+        self._open_rows.append(row)
+        # Rows count towards every enclosing table, like a recursive find_all("tr").
+        for table in self._open_tables:
+            table["Rows"] += 1
+            if table["Columns"] is None and table["first_row"] is None:
+                table["first_row"] = row
+        if self._infobox_element is not None:
+            # Reserve the slot now so pairs keep document order even when rows are nested.
+            row["infobox_slot"] = len(self.infobox)
+            self.infobox.append(None)
+
+    def _end_row(self, element):
+        row = self._open_rows.pop()
+        for table in self._open_tables:
+            if table["first_row"] is row:
+                table["first_row"] = None
+                if row["columns"] > 0:
+                    table["Columns"] = row["columns"]
+        if row["infobox_slot"] is not None:
+            header = next(element.iter("th"), None)
+            cell = next(element.iter("td"), None)
+            if header is not None and cell is not None:
+                self.infobox[row["infobox_slot"]] = {"attribute": _text(header), "value": _text(cell)}
+
+    def _scan_see_also(self, element, tag):
+        if self._see_also is None or self._see_also is True:
+            return
+        if self._see_also_list is not None:
+            if tag == "a":
+                self.see_also_links += 1
+            return
+        anchor = self._see_also
+        parent = element.getparent()
+        if parent is None or parent is not anchor.getparent():
+            return
+        if tag in SECTION_HEADING_TAGS or (tag == "div" and "mw-heading" in _classes(element)):
+            self._see_also = True
+        elif tag in ("ul", "ol"):
+            self._see_also_list = element
+
+    def result(self) -> dict:
+        return {
+            "headers": dict(self.headers),
+            "tables": [{"Index": table["Index"], "Rows": table["Rows"], "Columns": table["Columns"] or 0}
+                       for table in self.tables],
+            "infobox": [pair for pair in self.infobox if pair is not None],
+            "see_also_links": self.see_also_links,
+        }
+
+
+def analyze_html(html:str, section_name:str=SEE_ALSO_SECTION) -> dict:
+    """Parses the article HTML with lxml and collects every HTML metric in a single walk."""
+    analyzer = HtmlAnalyzer(section_name)
+    if html and html.strip():
+        root = lxml_html.document_fromstring(html)
+        for event, element in etree.iterwalk(root, events=("start", "end")):
+            if event == "start":
+                analyzer.start(element)
+            else:
+                analyzer.end(element)
+    return analyzer.result()
+
+
+def _discard(element, analyzer:HtmlAnalyzer):
+    """Frees a closed table row or article block, and the closed siblings before it."""
+    parent = element.getparent()
+    if parent is None:
+        return
+    if element.tag != "tr" and parent.tag not in BLOCK_PARENT_TAGS \
+            and not (parent.tag == "div" and "mw-parser-output" in _classes(parent)):
+        return
+    if not analyzer.can_discard(element):
+        return
+    element.clear()
+    previous = element.getprevious()
+    while previous is not None:
+        earlier = previous.getprevious()
+        if analyzer.can_discard(previous):
+            parent.remove(previous)
+        previous = earlier
+
+
+def analyze_html_stream(chunks:Iterable[bytes], section_name:str=SEE_ALSO_SECTION, max_bytes:int=0) -> dict:
+    """Same metrics as ``analyze_html``, computed while the HTML arrives in chunks.
+
+    Table rows are dropped at their end tag and blocks of the article body when they
+    close, so memory is bounded by the largest block rather than the document.
+    Raises ``DocumentTooLarge`` once more than ``max_bytes`` (0: no limit) were read.
+    """
+    analyzer = HtmlAnalyzer(section_name)
+    parser = etree.HTMLPullParser(events=("start", "end"), remove_comments=True)
+    received = 0
+
+    def drain():
+        for event, element in parser.read_events():
+            if event == "start":
+                analyzer.start(element)
+            else:
+                analyzer.end(element)
+                _discard(element, analyzer)
+
+    for chunk in chunks:
+        received += len(chunk)
+        if max_bytes and received > max_bytes:
+            raise DocumentTooLarge(f"Article HTML exceeds {max_bytes} bytes")
+        parser.feed(chunk)
+        drain()
+    if received:
+        parser.close()
+        drain()
+    return analyzer.result()
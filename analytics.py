@@ -0,0 +1,93 @@
+import threading
+from typing import Literal
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from pydantic import BaseModel, Field
+from starlette import status
+
+import config
+import metrics
+from concurrency import run_blocking
+from responses import json_response
+from score_index import score_index
+from scoring import SCORE_WEIGHTS
+
+analytics_router = APIRouter(
+    prefix="/analytics",
+    tags=["Analytics"],
+)
+
+Normalization = Literal["none", "log", "minmax", "zscore"]
+
+_frames = None
+_frames_lock = threading.Lock()
+
+
+def _score_frame():
+    global _frames
+    with _frames_lock:
+        if _frames is None:
+            from corpus import ScoreFrame
+
+            _frames = ScoreFrame(score_index, config.ANALYTICS_FRAME_TTL)
+        return _frames
+
+
+class ScoreWeights(BaseModel):
+    citations: float = Field(SCORE_WEIGHTS["citations"], title="Citation weight")
+    tables: float = Field(SCORE_WEIGHTS["tables"], title="Table weight")
+    infobox_attributes: float = Field(SCORE_WEIGHTS["infobox_attributes"], title="Infobox attribute weight")
+    headers: float = Field(SCORE_WEIGHTS["headers"], title="Header weight")
+    images: float = Field(SCORE_WEIGHTS["images"], title="Image weight")
+
+
+class ArticleRef(BaseModel):
+    language: str = Field(min_length=1, title="Language code")
+    title: str = Field(min_length=1, title="Article title in that language")
+
+
+class AnalyticsRequest(BaseModel):
+    weights: ScoreWeights = Field(default_factory=ScoreWeights, title="Component weights")
+    normalization: Normalization = Field("none", title="Per-language normalization of the component counts")
+    languages: list[str] | None = Field(None, title="Restrict to these languages")
+    percentiles: list[float] = Field([50, 90, 99], title="Score percentiles reported per language")
+    limit: int = Field(100, ge=0, le=10000, title="Top articles returned per language")
+    groups: list[list[ArticleRef]] | None = Field(None, title="Language versions of the same article to rank")
+
+
+def analyze_scores(request:AnalyticsRequest) -> dict:
+    from corpus import language_summary, rank_groups, score_corpus
+
+    frame = _score_frame().get()
+    if request.languages:
+        frame = frame[frame["language"].isin(request.languages)]
+        frame = frame.assign(language=frame["language"].cat.remove_unused_categories())
+    with metrics.timed("analytics"):
+        scored = score_corpus(frame, request.weights.model_dump(), request.normalization)
+        top = scored[scored["rank"] <= request.limit].sort_values(["language", "rank", "title"])
+        top = top.assign(language=top["language"].astype(str))
+        response = {
+            "articles": len(scored),
+            "weights": request.weights.model_dump(),
+            "normalization": request.normalization,
+            "languages": language_summary(scored, request.percentiles),
+            "top": {language: rows.drop(columns="language").head(request.limit).to_dict(orient="records")
+                    for language, rows in top.groupby("language")},
+        }
+        if request.groups:
+            response["groups"] = rank_groups(scored, [[(ref.language, ref.title) for ref in group]
+                                                      for group in request.groups])
+    return response
+
+
+@analytics_router.post("/scores", status_code=status.HTTP_200_OK)
+async def post_analytics_scores(http_request: Request, request: AnalyticsRequest, fields: str | None = Query(None)):
+    """
+    Re-scores every indexed article under the given weights and normalization, with per-language
+    percentiles, z-scores and rankings. Works from the score index only; nothing is refetched.
+    """
+    if score_index is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="The score index is disabled.")
+    if any(not 0 <= p <= 100 for p in request.percentiles):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Percentiles must be within 0-100.")
+    return json_response(http_request, await run_blocking(analyze_scores, request), fields)
@@ -1,7 +1,109 @@
-from fastapi import FastAPI
-from Operations import operations_router
+import asyncio
+import math
+import re
+import threading
+import time
+from contextlib import asynccontextmanager, suppress
 
-application:FastAPI = FastAPI()
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 
+from admission import Overloaded, inbound_overload
+from analytics import analytics_router
+from history import history_router
+from jobs import job_store, jobs_router, start_workers
+import config
+import metrics
+from metrics import metrics_router
+from operations import operations_router, prewarm
+from responses import CompressionMiddleware, ORJSONResponse
+from routers import citations, headers, infoboxes, tables
+from score_index import score_index
+from scores import refresh_periodically, scores_router
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    tasks = []
+    if config.PREWARM_ARTICLES:
+        # The server accepts requests once startup returns, so popular articles are analyzed first;
+        # whatever is still running after PREWARM_TIMEOUT finishes in the background.
+        warming = asyncio.create_task(prewarm(config.PREWARM_ARTICLES))
+        await asyncio.wait([warming], timeout=config.PREWARM_TIMEOUT)
+        tasks.append(warming)
+    if score_index is not None and config.SCORE_INDEX_REFRESH_INTERVAL > 0:
+        tasks.append(asyncio.create_task(refresh_periodically()))
+    if job_store is not None:
+        tasks.extend(start_workers())
+    yield
+    for task in tasks:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+
+
+application:FastAPI = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
+
+# Only one request is profiled at a time; cProfile cannot run several profilers at once.
+_profiling_lock = threading.Lock()
+
+
+def _overloaded_response(error: Overloaded) -> JSONResponse:
+    return JSONResponse(status_code=503, content={"detail": str(error)},
+                        headers={"Retry-After": str(math.ceil(error.retry_after))})
+
+
+@application.exception_handler(Overloaded)
+async def overloaded(request: Request, error: Overloaded):
+    return _overloaded_response(error)
+
+
+@application.middleware("http")
+async def shed_load(request: Request, call_next):
+    """Rejects new analysis requests at once instead of queueing them behind a saturated upstream."""
+    if request.url.path.startswith("/operations"):
+        error = inbound_overload()
+        if error is not None:
+            metrics.ERRORS.inc(stage="shed")
+            return _overloaded_response(error)
+    return await call_next(request)
+
+
+@application.middleware("http")
+async def server_timing(request: Request, call_next):
+    """Adds a Server-Timing header and, on request, writes a cProfile dump for this request."""
+    start = time.perf_counter()
+    timings = metrics.start_request()
+
+    profile = None
+    if config.PROFILING_ENABLED and request.headers.get("X-Profile") == "1" and _profiling_lock.acquire(False):
+        profile = metrics.start_profile()
+    try:
+        with metrics.profiled():
+            response = await call_next(request)
+    finally:
+        if profile is not None:
+            _profiling_lock.release()
+
+    response.headers["Server-Timing"] = timings.header(total=time.perf_counter() - start)
+    if profile is not None:
+        dump = profile.dump(re.sub(r"[^A-Za-z0-9_.-]+", "_", request.url.path).strip("_"))
+        if dump:
+            response.headers["X-Profile-Dump"] = dump
+    return response
+
+
+# Added last so it wraps every other middleware and also compresses their responses.
+application.add_middleware(CompressionMiddleware, minimum_size=config.RESPONSE_COMPRESSION_MIN_SIZE,
+                           gzip_level=config.RESPONSE_GZIP_LEVEL, brotli_quality=config.RESPONSE_BROTLI_QUALITY)
 
 application.include_router(operations_router)
+application.include_router(jobs_router)
+application.include_router(scores_router)
+application.include_router(history_router)
+application.include_router(analytics_router)
+application.include_router(metrics_router)
+application.include_router(tables.router)
+application.include_router(infoboxes.router)
+application.include_router(citations.router)
+application.include_router(headers.router)
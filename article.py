@@ -0,0 +1,183 @@
+import json
+from urllib.parse import quote
+
+from fastapi import HTTPException
+from requests import RequestException
+from starlette import status
+
+import config
+import mediawiki
+import metrics
+from analysis import DocumentTooLarge, analyze_html, analyze_html_stream
+from cache import article_cache, revision_key
+from concurrency import run_cpu_bound
+from singleflight import SingleFlight
+
+# Concurrent fetches of the same (language, title) share one upstream call.
+_fetches = SingleFlight()
+HTML_CHUNK_SIZE = 64 * 1024
+
+
+class ArticleDocument:
+    """A single fetched article, shared by every analyzer.
+
+    The rendered HTML, wikitext, external links and images all come from one
+    ``action=parse`` call, and the HTML is analyzed at most once. Streamed
+    articles (see ``stream_article``) keep only the analysis, never the HTML.
+    """
+
+    def __init__(self, title:str, language:str, html:str, wikitext:str,
+                 external_links:list[str], images:list[str], revision_id:int|None=None,
+                 analysis:dict|None=None):
+        self.title = title
+        self.language = language
+        self.html = html
+        self.wikitext = wikitext
+        self.external_links = external_links
+        self.images = images
+        self.revision_id = revision_id
+        self._analysis = analysis
+
+    @property
+    def analysis(self) -> dict:
+        """Header, table, infobox and "See also" metrics from a single lxml pass over the HTML."""
+        if self._analysis is None:
+            with metrics.timed("html_analysis", self.language):
+                self._analysis = run_cpu_bound(analyze_html, self.html)
+        return self._analysis
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "title": self.title, "language": self.language, "html": self.html,
+            "wikitext": self.wikitext, "external_links": self.external_links,
+            "images": self.images, "revision_id": self.revision_id, "analysis": self._analysis
+        })
+
+    @classmethod
+    def from_json(cls, payload:str) -> "ArticleDocument":
+        return cls(**json.loads(payload))
+
+
+def parse_page(page_title:str, language:str, props:str, max_bytes:int=0) -> dict:
+    """Runs ``action=parse`` for the given props and returns its ``parse`` object.
+
+    Network failures become 503, a missing page 404, other API errors 400 and
+    a response larger than ``max_bytes`` (0: no limit) 422.
+    """
+    params = {
+        "action": "parse",
+        "page": page_title,
+        "prop": props,
+        "redirects": "1"
+    }
+
+    try:
+        with metrics.timed("fetch", language):
+            data = mediawiki.api_get(language, params, max_bytes=max_bytes)
+    except RequestException as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+    except mediawiki.ResponseTooLarge as e:
+        raise HTTPException(status_code=422, detail=f"{page_title}: {e}")
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+    if "error" in data:
+        error = data["error"]
+        if error.get("code") in ("missingtitle", "invalidtitle"):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                                detail=f"Page '{page_title}' not found in {language} Wikipedia.")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=error.get("info", "Unknown API error"))
+    if "parse" not in data:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            detail="Malformed parse response")
+    return data["parse"]
+
+
+def fetch_article(page_title:str, language:str) -> ArticleDocument:
+    """Fetches an article with a single ``action=parse`` call; 422 past ``MAX_ARTICLE_HTML_BYTES``."""
+    parsed = parse_page(page_title, language, "text|wikitext|externallinks|images|revid",
+                        max_bytes=config.MAX_ARTICLE_HTML_BYTES)
+    try:
+        return ArticleDocument(
+            title=parsed.get("title", page_title),
+            language=language,
+            html=parsed["text"]["*"],
+            wikitext=parsed["wikitext"]["*"],
+            external_links=parsed.get("externallinks", []),
+            images=parsed.get("images", []),
+            revision_id=parsed.get("revid")
+        )
+    except (KeyError, TypeError) as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+def html_url(page_title:str, language:str, revision_id:int|None) -> str:
+    base = config.MEDIAWIKI_REST_URL.format(language=language)
+    if revision_id is not None:
+        return f"{base}/revision/{revision_id}/html"
+    return f"{base}/page/{quote(page_title.replace(' ', '_'), safe='')}/html"
+
+
+def stream_article(page_title:str, language:str) -> ArticleDocument:
+    """Fetches a large article without ever holding its rendered HTML or a tree of it.
+
+    Wikitext, links and images come from ``action=parse`` as usual; the HTML of the
+    same revision is read from the REST API in chunks and analyzed while it downloads.
+    Raises 422 when it is larger than ``MAX_ARTICLE_HTML_BYTES``.
+    """
+    parsed = parse_page(page_title, language, "wikitext|externallinks|images|revid")
+    revision_id = parsed.get("revid")
+    title = parsed.get("title", page_title)
+    try:
+        with metrics.timed("fetch_html_stream", language):
+            response = mediawiki.get(html_url(title, language, revision_id), stream=True)
+            with response:
+                if response.status_code == status.HTTP_404_NOT_FOUND:
+                    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                                        detail=f"Page '{page_title}' not found in {language} Wikipedia.")
+                response.raise_for_status()
+                declared = int(response.headers.get("Content-Length") or 0)
+                if config.MAX_ARTICLE_HTML_BYTES and declared > config.MAX_ARTICLE_HTML_BYTES:
+                    raise DocumentTooLarge(f"Article HTML exceeds {config.MAX_ARTICLE_HTML_BYTES} bytes")
+                analysis = analyze_html_stream(response.iter_content(HTML_CHUNK_SIZE),
+                                               max_bytes=config.MAX_ARTICLE_HTML_BYTES)
+    except RequestException as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+    except DocumentTooLarge as e:
+        raise HTTPException(status_code=422, detail=f"{page_title}: {e}")
+
+    try:
+        return ArticleDocument(
+            title=title,
+            language=language,
+            html="",
+            wikitext=parsed["wikitext"]["*"],
+            external_links=parsed.get("externallinks", []),
+            images=parsed.get("images", []),
+            revision_id=revision_id,
+            analysis=analysis
+        )
+    except (KeyError, TypeError) as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+def get_article(page_title:str, language:str, revision_id:int|None=None, length:int|None=None) -> ArticleDocument:
+    """Returns the article from the revision-keyed cache when possible, fetching it otherwise.
+
+    Articles of at least ``HTML_STREAMING_MIN_LENGTH`` bytes (the ``length`` of their
+    ``prop=info`` record) are streamed; unknown lengths use the single ``action=parse`` call.
+    """
+    if article_cache is not None and revision_id is not None:
+        cached = article_cache.get(revision_key("article", language, page_title, revision_id))
+        metrics.record_cache("article", cached is not None)
+        if cached is not None:
+            return ArticleDocument.from_json(cached)
+
+    fetch = fetch_article
+    if length is not None and length >= config.HTML_STREAMING_MIN_LENGTH:
+        fetch = stream_article
+    document = _fetches.do((language, page_title), fetch, page_title, language)
+    if article_cache is not None and document.revision_id is not None:
+        article_cache.set(revision_key("article", language, page_title, document.revision_id), document.to_json())
+    return document
@@ -0,0 +1 @@
+# Benchmarks run against a local MediaWiki stand-in; see benchmarks/bench.py.
@@ -0,0 +1,183 @@
+"""Benchmark suite for the analyzers and the full ``get_results`` flow.
+
+Runs against the local MediaWiki stand-in (never the live wikis) and reports,
+per analyzer module and for the whole multi-language analysis: wall time,
+CPU time, peak traced memory and upstream request counts, then p50/p99
+latency and throughput of ``get_results`` under concurrent load.
+
+    python -m benchmarks.bench                                 # synthetic fixtures
+    python -m benchmarks.bench --fixtures benchmarks/fixtures  # recorded fixtures
+    python -m benchmarks.bench --latency-ms 80 --error-rate 0.02 --concurrency 16 --requests 200 --json out.json
+
+The application cache and score index are disabled so every run measures cold analyses.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.fixtures import load_fixtures, synthesize
+from benchmarks.mock_wiki import MockWiki, api_url_template, start_server
+
+
+def _configure_environment(api_url:str):
+    # Must run before the application modules are imported: they read config at import time.
+    os.environ["MEDIAWIKI_API_URL"] = api_url
+    os.environ["CACHE_ENABLED"] = "0"
+    os.environ["SCORE_INDEX_PATH"] = ""
+    os.environ["LANGLINKS_CACHE_SIZE"] = "0"
+    os.environ.setdefault("HTTP_BACKOFF_BASE", "0.01")
+    # The stand-in serves every language from one host; rate-limit only when asked to.
+    os.environ.setdefault("HTTP_RATE_LIMIT", "0")
+
+
+def _percentile(values:list[float], percentile:float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(percentile / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def measure(wiki:MockWiki, func, repeat:int=3) -> dict:
+    """Median wall/CPU time over ``repeat`` runs, then one traced run for peak memory."""
+    walls, cpus = [], []
+    wiki.reset()
+    for _ in range(repeat):
+        wall, cpu = time.perf_counter(), time.process_time()
+        func()
+        walls.append(time.perf_counter() - wall)
+        cpus.append(time.process_time() - cpu)
+    upstream = sum(wiki.stats.values()) // repeat
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "wall_ms": round(statistics.median(walls) * 1000, 2),
+        "cpu_ms": round(statistics.median(cpus) * 1000, 2),
+        "peak_kib": round(peak / 1024, 1),
+        "upstream_requests": upstream,
+    }
+
+
+def bench_analyzers(wiki:MockWiki, titles:list[str], language:str, repeat:int) -> dict:
+    import citation, header, images, infobox, operations, table
+    from article import ArticleDocument, fetch_article
+    from fast_score import get_score_counts
+
+    analyzers = {
+        "table.analyze_tables": table.analyze_tables,
+        "header.count_html_headers": header.count_html_headers,
+        "infobox.analyze_infobox": infobox.analyze_infobox,
+        "citation.extract_citation_from_wikitext": citation.extract_citation_from_wikitext,
+        "images.get_image_count": images.get_image_count,
+    }
+    results = {}
+    for title in titles:
+        payload = fetch_article(title, language).to_json()
+        rows = {"article.fetch_article": measure(wiki, lambda: fetch_article(title, language), repeat)}
+        for name, analyzer in analyzers.items():
+            # A fresh document per run, so each analyzer pays for its own parse as it would in isolation.
+            rows[name] = measure(wiki, lambda: analyzer(title, language, ArticleDocument.from_json(payload)), repeat)
+        rows["operations.analyze_single_article"] = measure(
+            wiki, lambda: operations.analyze_single_article(title, language), repeat)
+        rows["fast_score.get_score_counts"] = measure(wiki, lambda: get_score_counts(title, language), repeat)
+        results[title] = rows
+    return results
+
+
+def bench_get_results(wiki:MockWiki, titles:list[str], language:str, repeat:int) -> dict:
+    import operations
+
+    return {title: measure(wiki, lambda: asyncio.run(operations.analyze_article(title, language)), repeat)
+            for title in titles}
+
+
+async def _load(titles:list[str], language:str, concurrency:int, requests:int) -> tuple[list[float], float]:
+    import operations
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(index:int):
+        async with semaphore:
+            start = time.perf_counter()
+            await operations.analyze_article(titles[index % len(titles)], language)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(index) for index in range(requests)))
+    return latencies, time.perf_counter() - start
+
+
+def bench_load(wiki:MockWiki, titles:list[str], language:str, concurrency:int, requests:int) -> dict:
+    wiki.reset()
+    cpu = time.process_time()
+    latencies, elapsed = asyncio.run(_load(titles, language, concurrency, requests))
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "throughput_rps": round(requests / elapsed, 2),
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 1),
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 1),
+        "cpu_ms_per_request": round((time.process_time() - cpu) / requests * 1000, 2),
+        "upstream_requests_per_request": round(sum(wiki.stats.values()) / requests, 2),
+    }
+
+
+def _print_rows(heading:str, rows:dict[str, dict]):
+    print(f"\n{heading}")
+    columns = list(next(iter(rows.values())).keys())
+    width = max(len(name) for name in rows) + 2
+    widths = [max(12, len(column)) + 2 for column in columns]
+    print("".ljust(width) + "".join(column.rjust(w) for column, w in zip(columns, widths)))
+    for name, values in rows.items():
+        print(name.ljust(width) + "".join(str(values[column]).rjust(w) for column, w in zip(columns, widths)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the analyzers against a local MediaWiki stand-in.")
+    parser.add_argument("--fixtures", help="Fixture directory (default: freshly synthesized articles)")
+    parser.add_argument("--language", default="en", help="Source language of the benchmarked articles")
+    parser.add_argument("--titles", nargs="*", help="Articles to benchmark (default: all fixtures of --language)")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=32)
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    fixtures_root = args.fixtures
+    if fixtures_root is None:
+        fixtures_root = tempfile.mkdtemp(prefix="wiki-fixtures-")
+        synthesize(fixtures_root)
+    fixtures = load_fixtures(fixtures_root)
+    wiki = MockWiki(fixtures, args.latency_ms / 1000, args.jitter_ms / 1000, args.error_rate, seed=0)
+    server = start_server(wiki)
+    _configure_environment(api_url_template(server))
+
+    titles = args.titles or [title.replace(" ", "_") for language, title in fixtures if language == args.language]
+    results = {
+        "analyzers": bench_analyzers(wiki, titles, args.language, args.repeat),
+        "get_results": bench_get_results(wiki, titles, args.language, args.repeat),
+        "load": bench_load(wiki, titles, args.language, args.concurrency, args.requests),
+    }
+    server.shutdown()
+
+    for title, rows in results["analyzers"].items():
+        _print_rows(f"Analyzers: {title}", rows)
+    _print_rows("get_results (all languages)", results["get_results"])
+    _print_rows("Concurrent load", {"get_results": results["load"]})
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as output:
+            json.dump(results, output, indent=2)
+
+
+if __name__ == "__main__":
+    main()
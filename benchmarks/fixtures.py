@@ -0,0 +1,168 @@
+"""Recorded and synthetic article fixtures for the MediaWiki stand-in server.
+
+A fixture is one JSON file per (language, article) under ``<root>/<language>/``
+holding everything the stand-in needs to answer ``action=parse`` and
+``prop=revisions|langlinks|extlinks|images|info`` queries for that article.
+
+Record real articles (needs network access)::
+
+    python -m benchmarks.fixtures record benchmarks/fixtures en:Python_(programming_language) en:List_of_sovereign_states
+
+Generate synthetic articles of increasing size (offline)::
+
+    python -m benchmarks.fixtures synthesize benchmarks/fixtures
+"""
+import argparse
+import json
+import os
+import random
+from urllib.parse import quote
+
+LANGUAGES = ("en", "es", "fr", "de", "pt", "ar")
+
+# name -> (sections, tables, rows per table, references, images)
+SYNTHETIC_SIZES = {
+    "Small_article": (4, 0, 0, 8, 1),
+    "Medium_article": (20, 3, 15, 80, 12),
+    "Large_article": (60, 10, 60, 400, 40),
+    "Huge_list_article": (40, 40, 500, 1500, 80),
+}
+
+
+def fixture_path(root:str, language:str, title:str) -> str:
+    return os.path.join(root, language, quote(title.replace(" ", "_"), safe="") + ".json")
+
+
+def save_fixture(root:str, fixture:dict):
+    path = fixture_path(root, fixture["language"], fixture["title"])
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as output:
+        json.dump(fixture, output, ensure_ascii=False)
+
+
+def load_fixtures(root:str) -> dict[tuple[str, str], dict]:
+    """Returns every fixture keyed by (language, title with spaces)."""
+    fixtures = {}
+    for language in sorted(os.listdir(root)):
+        directory = os.path.join(root, language)
+        if not os.path.isdir(directory):
+            continue
+        for name in sorted(os.listdir(directory)):
+            if name.endswith(".json"):
+                with open(os.path.join(directory, name), encoding="utf-8") as source:
+                    fixture = json.load(source)
+                fixtures[(fixture["language"], fixture["title"].replace("_", " "))] = fixture
+    return fixtures
+
+
+def synthetic_article(title:str, language:str, sections:int, tables:int, rows:int, references:int,
+                      images:int, seed:int=0) -> dict:
+    """Builds matching HTML and wikitext for an article with the given structure."""
+    rng = random.Random(f"{seed}:{language}:{title}")
+    html = ['<div class="mw-parser-output">',
+            '<table class="infobox"><tr><th colspan="2">%s</th></tr>' % title]
+    wikitext = ["{{Infobox country", "| name = %s" % title]
+    for attribute in range(12):
+        html.append(f"<tr><th>Attribute {attribute}</th><td>Value {rng.randint(0, 10 ** 6)}</td></tr>")
+        wikitext.append(f"| attribute_{attribute} = Value {rng.randint(0, 10 ** 6)}")
+    html.append("</table>")
+    wikitext.append("}}")
+
+    paragraph = "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 8
+    refs_per_section = max(1, references // max(1, sections))
+    for section in range(sections):
+        level = 2 if section % 3 == 0 else 3
+        html.append(f'<div class="mw-heading mw-heading{level}"><h{level} id="S{section}">Section {section}</h{level}></div>')
+        wikitext.append(f"{'=' * level} Section {section} {'=' * level}")
+        cite = "".join(f'<sup class="reference"><a href="#cite_note-{section}-{ref}">[{ref}]</a></sup>'
+                       for ref in range(refs_per_section))
+        html.append(f"<p>{paragraph}{cite}</p>")
+        wikitext.append(paragraph + "".join(
+            f"<ref>{{{{Cite journal |title=Ref {section}.{ref} |doi=10.1000/{section}.{ref} |isbn=978-3-16-148410-{ref % 10}}}}}</ref>"
+            for ref in range(refs_per_section)))
+    for table in range(tables):
+        html.append('<table class="wikitable"><tr>' + "".join(f"<th>Col {c}</th>" for c in range(6)) + "</tr>")
+        wikitext.append('{| class="wikitable"\n! ' + " !! ".join(f"Col {c}" for c in range(6)))
+        for row in range(rows):
+            values = [str(rng.randint(0, 10 ** 6)) for _ in range(6)]
+            html.append("<tr>" + "".join(f"<td>{value}</td>" for value in values) + "</tr>")
+            wikitext.append("|-\n| " + " || ".join(values))
+        html.append("</table>")
+        wikitext.append("|}")
+    html.append('<div class="mw-heading mw-heading2"><h2 id="See_also">See also</h2></div><ul>'
+                + "".join(f'<li><a href="/wiki/Related_{i}">Related {i}</a></li>' for i in range(6)) + "</ul>")
+    wikitext.append("== See also ==\n" + "\n".join(f"* [[Related {i}]]" for i in range(6)))
+    image_names = [f"Image_{title}_{i}.jpg" for i in range(images)]
+    wikitext.extend(f"[[File:{name}|thumb]]" for name in image_names)
+    html.append("</div>")
+
+    return {
+        "title": title,
+        "language": language,
+        "revid": rng.randint(10 ** 8, 10 ** 9),
+        "touched": "2025-01-01T00:00:00Z",
+        "html": "".join(html),
+        "wikitext": "\n".join(wikitext),
+        "externallinks": [f"https://example.org/{title}/{i}" for i in range(references)],
+        "images": image_names,
+        "langlinks": {other: title for other in LANGUAGES if other != language},
+    }
+
+
+def synthesize(root:str):
+    for title, (sections, tables, rows, references, images) in SYNTHETIC_SIZES.items():
+        for language in LANGUAGES:
+            save_fixture(root, synthetic_article(title, language, sections, tables, rows, references, images))
+
+
+def record(root:str, articles:list[str]):
+    """Downloads the listed ``language:title`` articles from the live wikis, plus their interlanguage versions."""
+    import mediawiki
+
+    for article in articles:
+        language, _, title = article.partition(":")
+        links = _record_one(root, language, title, mediawiki)
+        for other, other_title in links.items():
+            if other in LANGUAGES:
+                _record_one(root, other, other_title, mediawiki)
+
+
+def _record_one(root:str, language:str, title:str, mediawiki) -> dict[str, str]:
+    parsed = mediawiki.api_get(language, {"action": "parse", "page": title, "redirects": "1",
+                                          "prop": "text|wikitext|externallinks|images|revid"})["parse"]
+    query = mediawiki.api_get(language, {"action": "query", "titles": parsed["title"],
+                                         "prop": "info|langlinks", "lllimit": "max"})["query"]
+    page = next(iter(query["pages"].values()))
+    langlinks = {link["lang"]: link["*"] for link in page.get("langlinks", [])}
+    save_fixture(root, {
+        "title": parsed["title"],
+        "language": language,
+        "revid": parsed["revid"],
+        "touched": page.get("touched"),
+        "html": parsed["text"]["*"],
+        "wikitext": parsed["wikitext"]["*"],
+        "externallinks": parsed.get("externallinks", []),
+        "images": parsed.get("images", []),
+        "langlinks": langlinks,
+    })
+    return langlinks
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create fixtures for the MediaWiki stand-in server.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    synthesize_parser = commands.add_parser("synthesize", help="Generate synthetic articles of increasing size")
+    synthesize_parser.add_argument("root")
+    record_parser = commands.add_parser("record", help="Record live articles given as language:title")
+    record_parser.add_argument("root")
+    record_parser.add_argument("articles", nargs="+")
+    args = parser.parse_args()
+
+    if args.command == "synthesize":
+        synthesize(args.root)
+    else:
+        record(args.root, args.articles)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+"""Local stand-in for the MediaWiki action API that replays article fixtures.
+
+Serves every language from one host at ``/<language>/w/api.php`` (and the
+REST HTML routes under ``/<language>/w/rest.php/v1``), so the service can be
+pointed at it with::
+
+    MEDIAWIKI_API_URL="http://127.0.0.1:8765/{language}/w/api.php"
+
+Latency and failures can be injected. With ``history_length`` every article
+also has a synthetic edit history in which each revision edits one section. ``GET /__stats`` returns the number of
+requests served per (language, action/prop) and ``POST /__reset`` clears it.
+
+    python -m benchmarks.mock_wiki benchmarks/fixtures --port 8765 --latency-ms 80 --error-rate 0.02
+"""
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+from benchmarks.fixtures import load_fixtures
+from wikitext import HEADING_PATTERN
+
+
+class MockWiki:
+    """Answers action API requests from in-memory fixtures."""
+
+    def __init__(self, fixtures:dict[tuple[str, str], dict], latency:float=0.0, jitter:float=0.0,
+                 error_rate:float=0.0, seed:int|None=None, history_length:int=1):
+        self.fixtures = fixtures
+        self.history_length = max(1, history_length)
+        self._histories:dict[tuple[str, str], list[dict]] = {}
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.stats = Counter()
+        self.bytes_sent = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def reset(self):
+        with self._lock:
+            self.stats.clear()
+            self.bytes_sent = 0
+
+    def handle(self, language:str, params:dict[str, str]) -> tuple[int, dict, dict]:
+        """Returns (status, headers, JSON body) for one API request."""
+        action = params.get("action", "")
+        with self._lock:
+            self.stats[(language, action + ":" + params.get("prop", ""))] += 1
+            roll = self._random.random()
+            delay = max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+        time.sleep(delay)
+
+        if roll < self.error_rate / 2:
+            return 503, {"Retry-After": "0"}, {"error": {"code": "unavailable", "info": "Injected failure"}}
+        if roll < self.error_rate:
+            return 200, {"Retry-After": "0"}, {"error": {"code": "maxlag", "info": "Injected replication lag"}}
+        if action == "parse":
+            return 200, {}, self._parse(language, params)
+        if action == "query":
+            return 200, {}, self._query(language, params)
+        return 200, {}, {"error": {"code": "badvalue", "info": f"Unsupported action {action!r}"}}
+
+    def html(self, language:str, route:list[str]) -> str | None:
+        """Rendered page of ``page/<title>/html`` or ``revision/<id>/html``, like the REST API (Parsoid) returns."""
+        with self._lock:
+            self.stats[(language, "rest:html")] += 1
+        time.sleep(self.latency)
+        if len(route) != 3 or route[2] != "html":
+            return None
+        if route[0] == "page":
+            fixture = self._fixture(language, route[1])
+        elif route[0] == "revision":
+            fixture = next((fixture for (fixture_language, _), fixture in self.fixtures.items()
+                            if fixture_language == language and str(fixture["revid"]) == route[1]), None)
+        else:
+            return None
+        if fixture is None:
+            return None
+        return ('<!DOCTYPE html>\n<html><head><meta charset="utf-8"><title>%s</title></head>'
+                '<body class="mw-content-ltr parsoid-body mediawiki">%s</body></html>'
+                % (fixture["title"].replace("_", " "), fixture["html"]))
+
+    def _fixture(self, language:str, title:str) -> dict | None:
+        return self.fixtures.get((language, title.replace("_", " ").strip()))
+
+    def _history_text(self, fixture:dict, age:int) -> str:
+        """Wikitext ``age`` revisions before the fixture.
+
+        The synthetic history is a series of round-robin edits that each append a line
+        to one section, so consecutive revisions differ in exactly one section.
+        """
+        bounds = [0, *(match.start() for match in HEADING_PATTERN.finditer(fixture["wikitext"])),
+                  len(fixture["wikitext"])]
+        sections = [fixture["wikitext"][start:end] for start, end in zip(bounds, bounds[1:])]
+        edits = self.history_length - 1 - age
+        return "".join(section + "".join(f"\nEdit {number} of this section.\n"
+                                         for number in range(index, edits, len(sections)))
+                       for index, section in enumerate(sections))
+
+    def history(self, fixture:dict) -> list[dict]:
+        """Revision metadata of a fixture, newest (the fixture itself) first."""
+        key = (fixture["language"], fixture["title"])
+        with self._lock:
+            cached = self._histories.get(key)
+        if cached is None:
+            cached = [{"revid": fixture["revid"] - age, "age": age, "timestamp": fixture.get("touched"),
+                       "sha1": hashlib.sha1(self._history_text(fixture, age).encode()).hexdigest()}
+                      for age in range(self.history_length)]
+            with self._lock:
+                self._histories[key] = cached
+        return cached
+
+    def _revision(self, fixture:dict, revision:dict, rvprop:str) -> dict:
+        record = {"revid": revision["revid"], "parentid": revision["revid"] - 1}
+        if "timestamp" in rvprop:
+            record["timestamp"] = revision["timestamp"]
+        if "sha1" in rvprop:
+            record["sha1"] = revision["sha1"]
+        if "content" in rvprop:
+            record["slots"] = {"main": {"contentmodel": "wikitext",
+                                        "*": self._history_text(fixture, revision["age"])}}
+        return record
+
+    def _revisions_by_id(self, language:str, params:dict[str, str]) -> dict:
+        wanted = {int(revision_id) for revision_id in params["revids"].split("|")}
+        pages = {}
+        for (fixture_language, _), fixture in self.fixtures.items():
+            if fixture_language != language:
+                continue
+            ages = sorted(fixture["revid"] - revision_id for revision_id in wanted
+                          if 0 <= fixture["revid"] - revision_id < self.history_length)
+            if ages:
+                history = self.history(fixture)
+                pages[str(abs(hash(fixture["title"])) % 10 ** 8)] = {
+                    "ns": 0, "title": fixture["title"].replace("_", " "),
+                    "revisions": [self._revision(fixture, history[age], params.get("rvprop", "")) for age in ages]}
+        return {"batchcomplete": "", "query": {"pages": pages}}
+
+    def _parse(self, language:str, params:dict[str, str]) -> dict:
+        fixture = self._fixture(language, params.get("page", ""))
+        if fixture is None:
+            return {"error": {"code": "missingtitle", "info": "The page you specified doesn't exist."}}
+        props = params.get("prop", "text").split("|")
+        parsed = {"title": fixture["title"].replace("_", " "), "pageid": abs(hash(fixture["title"])) % 10 ** 8}
+        if "text" in props:
+            parsed["text"] = {"*": fixture["html"]}
+        if "wikitext" in props:
+            parsed["wikitext"] = {"*": fixture["wikitext"]}
+        if "externallinks" in props:
+            parsed["externallinks"] = fixture["externallinks"]
+        if "images" in props:
+            parsed["images"] = fixture["images"]
+        if "sections" in props:
+            parsed["sections"] = [{"toclevel": len(match.group(1)) - 1, "level": str(len(match.group(1))),
+                                   "line": match.group(2), "index": str(index + 1)}
+                                  for index, match in enumerate(HEADING_PATTERN.finditer(fixture["wikitext"]))]
+        if "revid" in props:
+            parsed["revid"] = fixture["revid"]
+        return {"parse": parsed}
+
+    def _query(self, language:str, params:dict[str, str]) -> dict:
+        if "revids" in params:
+            return self._revisions_by_id(language, params)
+        props = params.get("prop", "").split("|")
+        continuation = None
+        pages = {}
+        normalized = []
+        for index, title in enumerate(params.get("titles", "").split("|")):
+            display = title.replace("_", " ")
+            if display != title:
+                normalized.append({"from": title, "to": display})
+            fixture = self._fixture(language, title)
+            if fixture is None:
+                pages[str(-1 - index)] = {"ns": 0, "title": display, "missing": ""}
+                continue
+            page = {"pageid": index + 1, "ns": 0, "title": display}
+            if "info" in props:
+                page.update(lastrevid=fixture["revid"], touched=fixture.get("touched"),
+                            length=len(fixture["wikitext"].encode()))
+            if "langlinks" in props:
+                page["langlinks"] = [{"lang": lang, "*": linked} for lang, linked in fixture["langlinks"].items()]
+            if "extlinks" in props:
+                page["extlinks"] = [{"*": url} for url in fixture["externallinks"]]
+            if "images" in props:
+                page["images"] = [{"ns": 6, "title": "File:" + name} for name in fixture["images"]]
+            if "revisions" in props:
+                offset = int(params.get("rvcontinue", "0"))
+                limit = int(params.get("rvlimit", "1"))
+                history = self.history(fixture)
+                page["revisions"] = [self._revision(fixture, revision, params.get("rvprop", "ids|timestamp|content"))
+                                     for revision in history[offset:offset + limit]]
+                if offset + limit < len(history):
+                    continuation = {"rvcontinue": str(offset + limit), "continue": "||"}
+            pages[str(index + 1)] = page
+        query = {"pages": pages}
+        if normalized:
+            query["normalized"] = normalized
+        if continuation is not None:
+            return {"continue": continuation, "query": query}
+        return {"batchcomplete": "", "query": query}
+
+
+def _handler_for(wiki:MockWiki):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body are written separately; without this, delayed ACKs add ~40 ms per response.
+        disable_nagle_algorithm = True
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status:int, body:dict, headers:dict | None=None):
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(payload)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(payload)
+            with wiki._lock:
+                wiki.bytes_sent += len(payload)
+
+        def _send_html(self, html:str | None):
+            if html is None:
+                return self._send(404, {"httpCode": 404, "httpReason": "Not Found"})
+            payload = html.encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            with wiki._lock:
+                wiki.bytes_sent += len(payload)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == "/__stats":
+                with wiki._lock:
+                    stats = {f"{language} {call}": count for (language, call), count in wiki.stats.items()}
+                    body = {"requests": sum(wiki.stats.values()), "bytes": wiki.bytes_sent, "by_call": stats}
+                return self._send(200, body)
+            parts = url.path.strip("/").split("/")
+            if parts[1:4] == ["w", "rest.php", "v1"]:
+                return self._send_html(wiki.html(parts[0], [unquote(part) for part in parts[4:]]))
+            if len(parts) != 3 or parts[1:] != ["w", "api.php"]:
+                return self._send(404, {"error": {"code": "notfound", "info": url.path}})
+            params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            status, headers, body = wiki.handle(parts[0], params)
+            self._send(status, body, headers)
+
+        def do_POST(self):
+            if urlparse(self.path).path == "/__reset":
+                wiki.reset()
+                return self._send(200, {"reset": True})
+            self._send(404, {})
+
+    return Handler
+
+
+def start_server(wiki:MockWiki, host:str="127.0.0.1", port:int=0) -> ThreadingHTTPServer:
+    """Starts the stand-in on a background thread; ``port=0`` picks a free port."""
+    server = ThreadingHTTPServer((host, port), _handler_for(wiki))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="mock-wiki", daemon=True).start()
+    return server
+
+
+def api_url_template(server:ThreadingHTTPServer) -> str:
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}/{{language}}/w/api.php"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve recorded MediaWiki responses locally.")
+    parser.add_argument("fixtures", help="Fixture directory (see benchmarks.fixtures)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Mean injected latency per request")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Uniform +/- jitter around the latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 503/maxlag")
+    parser.add_argument("--history", type=int, default=1, help="Revisions in the synthetic history of every article")
+    args = parser.parse_args()
+
+    wiki = MockWiki(load_fixtures(args.fixtures), args.latency_ms / 1000, args.jitter_ms / 1000, args.error_rate,
+                    history_length=args.history)
+    server = start_server(wiki, args.host, args.port)
+    print(f"Serving {len(wiki.fixtures)} fixtures at {api_url_template(server)}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
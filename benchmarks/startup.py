@@ -0,0 +1,155 @@
+"""Import-time and cold-start benchmark for new service replicas.
+
+Measures how long ``import application`` takes (with the slowest imports), then
+starts real uvicorn processes against the local MediaWiki stand-in and reports
+time to ready and the latency of the first and a repeated request, for:
+
+- ``cold``: empty caches, no prewarming
+- ``prewarmed``: empty caches, ``PREWARM_ARTICLES`` set to the requested article
+- ``shared``: a new replica on the same host as ``cold`` (same cache file), no prewarming
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --title Large_article --latency-ms 80 --json startup.json
+"""
+import argparse
+import json
+import os
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+from benchmarks.fixtures import load_fixtures, synthesize
+from benchmarks.mock_wiki import MockWiki, api_url_template, start_server
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def _environment(api_url:str, state_dir:str, **overrides:str) -> dict[str, str]:
+    return {
+        **os.environ,
+        "MEDIAWIKI_API_URL": api_url,
+        "CACHE_DB_PATH": os.path.join(state_dir, "cache.sqlite3"),
+        "SCORE_INDEX_PATH": os.path.join(state_dir, "scores.sqlite3"),
+        "SCORE_INDEX_REFRESH_INTERVAL": "0",
+        "HTTP_RATE_LIMIT": os.environ.get("HTTP_RATE_LIMIT", "0"),
+        **overrides,
+    }
+
+
+def import_time(environment:dict[str, str], top:int=10) -> dict:
+    """Wall time of ``import application`` in a fresh interpreter, and its slowest top-level imports."""
+    start = time.perf_counter()
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", "import application"], cwd=ROOT,
+                               env=environment, capture_output=True, text=True, check=True)
+    wall = time.perf_counter() - start
+
+    # Children are printed before their parent, one indentation level (two spaces) deeper.
+    children, total = [], None
+    for line in completed.stderr.splitlines():
+        match = re.match(r"import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)", line)
+        if match is None:
+            continue
+        name, cumulative_ms, depth = match.group(4), int(match.group(2)) / 1000, len(match.group(3))
+        if depth == 2:
+            children.append((name, cumulative_ms))
+        elif depth == 0:
+            if name == "application":
+                total = cumulative_ms
+                break
+            children = []
+    slowest = sorted(children, key=lambda entry: -entry[1])
+    return {
+        "interpreter_wall_ms": round(wall * 1000, 1),
+        "import_application_ms": total,
+        "slowest_imports_ms": {name: round(ms, 1) for name, ms in slowest[:top]},
+    }
+
+
+def _get(url:str, timeout:float=120) -> float:
+    start = time.perf_counter()
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        response.read()
+    return time.perf_counter() - start
+
+
+def cold_start(environment:dict[str, str], path:str, timeout:float=120) -> dict:
+    """Starts one uvicorn replica and times readiness, the first request and a repeated request."""
+    port = _free_port()
+    start = time.perf_counter()
+    server = subprocess.Popen([sys.executable, "-m", "uvicorn", "application:application", "--port", str(port),
+                               "--log-level", "warning"], cwd=ROOT, env=environment)
+    try:
+        # uvicorn accepts connections only after the lifespan startup (and so prewarming) has finished.
+        while True:
+            try:
+                _get(f"http://127.0.0.1:{port}/metrics", timeout=1)
+                break
+            except OSError:
+                if server.poll() is not None or time.perf_counter() - start > timeout:
+                    raise RuntimeError("The replica did not become ready")
+                time.sleep(0.05)
+        ready = time.perf_counter() - start
+        first = _get(f"http://127.0.0.1:{port}{path}")
+        repeated = _get(f"http://127.0.0.1:{port}{path}")
+    finally:
+        server.terminate()
+        server.wait()
+    return {
+        "ready_ms": round(ready * 1000, 1),
+        "first_request_ms": round(first * 1000, 1),
+        "repeat_request_ms": round(repeated * 1000, 1),
+        "ready_plus_first_ms": round((ready + first) * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark import time and replica cold starts.")
+    parser.add_argument("--fixtures", help="Fixture directory (default: freshly synthesized articles)")
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--title", default="Medium_article")
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    fixtures_root = args.fixtures
+    if fixtures_root is None:
+        fixtures_root = tempfile.mkdtemp(prefix="wiki-fixtures-")
+        synthesize(fixtures_root)
+    server = start_server(MockWiki(load_fixtures(fixtures_root), args.latency_ms / 1000, seed=0))
+    api_url = api_url_template(server)
+    path = f"/operations/{args.language}/{args.title}"
+
+    results = {"imports": import_time(_environment(api_url, tempfile.mkdtemp()))}
+    shared_state = tempfile.mkdtemp()
+    results["cold"] = cold_start(_environment(api_url, shared_state), path)
+    results["prewarmed"] = cold_start(_environment(api_url, tempfile.mkdtemp(),
+                                                   PREWARM_ARTICLES=f"{args.language}:{args.title}"), path)
+    results["shared"] = cold_start(_environment(api_url, shared_state), path)
+    server.shutdown()
+
+    imports = results["imports"]
+    print(f"\nimport application: {imports['import_application_ms']} ms "
+          f"(interpreter total {imports['interpreter_wall_ms']} ms)")
+    for name, ms in imports["slowest_imports_ms"].items():
+        print(f"  {name:<28}{ms:>10}")
+    columns = list(results["cold"])
+    print("\n" + "".ljust(12) + "".join(column.rjust(22) for column in columns))
+    for scenario in ("cold", "prewarmed", "shared"):
+        print(scenario.ljust(12) + "".join(str(results[scenario][column]).rjust(22) for column in columns))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as output:
+            json.dump(results, output, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import config
+
+
+class MemoryCache:
+    """Thread-safe LRU cache of string values, bounded by entry count, total size and age."""
+
+    def __init__(self, max_entries:int, max_bytes:int, ttl:float):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries:OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key:str) -> str | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key:str, value:str, ttl:float|None=None):
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+            self._size += len(value)
+            while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key:str):
+        _, value = self._entries.pop(key)
+        self._size -= len(value)
+
+
+class SQLiteCache:
+    """Persistent cache of string values in a SQLite file, surviving restarts.
+
+    Every worker process on a host opens the same file, so it is also how workers share results.
+    Writes purge expired entries every ``purge_interval`` seconds, and then the oldest
+    entries beyond ``max_bytes`` (0: no size bound).
+    """
+
+    def __init__(self, path:str, ttl:float, max_bytes:int=0, purge_interval:float=600):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.purge_interval = purge_interval
+        self._next_purge = time.monotonic() + purge_interval
+        self._purge_lock = threading.Lock()
+        self._local = threading.local()
+        with self._connection() as connection:
+            connection.execute("CREATE TABLE IF NOT EXISTS cache "
+                               "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL)")
+            connection.execute("CREATE INDEX IF NOT EXISTS cache_expires ON cache (expires)")
+
+    def _connection(self) -> sqlite3.Connection:
+        # SQLite connections cannot be shared across threads, so each thread opens its own.
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def get(self, key:str) -> str | None:
+        row = self._connection().execute("SELECT value, expires FROM cache WHERE key = ?", (key,)).fetchone()
+        if row is None or row[1] < time.time():
+            return None
+        return row[0]
+
+    def set(self, key:str, value:str, ttl:float|None=None):
+        with self._connection() as connection:
+            connection.execute("INSERT OR REPLACE INTO cache (key, value, expires) VALUES (?, ?, ?)",
+                               (key, value, time.time() + (self.ttl if ttl is None else ttl)))
+        if time.monotonic() >= self._next_purge and self._purge_lock.acquire(blocking=False):
+            try:
+                self._next_purge = time.monotonic() + self.purge_interval
+                self.purge()
+            finally:
+                self._purge_lock.release()
+
+    def purge_expired(self):
+        with self._connection() as connection:
+            connection.execute("DELETE FROM cache WHERE expires < ?", (time.time(),))
+
+    def purge(self):
+        """Drops expired entries, then the entries closest to expiry until at most ``max_bytes`` remain."""
+        self.purge_expired()
+        if self.max_bytes <= 0:
+            return
+        with self._connection() as connection:
+            connection.execute("DELETE FROM cache WHERE key IN (SELECT key FROM ("
+                               "SELECT key, SUM(length(value)) OVER (ORDER BY expires DESC, key) AS kept "
+                               "FROM cache) WHERE kept > ?)", (self.max_bytes,))
+
+
+class TieredCache:
+    """In-memory LRU in front of an optional persistent tier; disk hits are promoted to memory."""
+
+    def __init__(self, memory:MemoryCache, disk:SQLiteCache | None=None):
+        self.memory = memory
+        self.disk = disk
+
+    def get(self, key:str) -> str | None:
+        value = self.memory.get(key)
+        if value is None and self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                self.memory.set(key, value)
+        return value
+
+    def set(self, key:str, value:str, ttl:float|None=None):
+        """Stores ``value`` in every tier; ``ttl`` overrides the tiers' default lifetimes."""
+        self.memory.set(key, value, ttl)
+        if self.disk is not None:
+            self.disk.set(key, value, ttl)
+
+
+# Bump when the shape or meaning of cached results changes, so stale entries are never read back.
+CACHE_VERSION = 5
+
+
+def revision_key(kind:str, language:str, title:str, revision_id:int) -> str:
+    return f"v{CACHE_VERSION}:{kind}:{language}:{title}:{revision_id}"
+
+
+def content_key(kind:str, content:str) -> str:
+    """Key of a result that depends only on ``content``, such as the counts of one wikitext section."""
+    return f"v{CACHE_VERSION}:{kind}:{hashlib.blake2b(content.encode(), digest_size=16).hexdigest()}"
+
+
+def _build_cache() -> TieredCache | None:
+    if not config.CACHE_ENABLED:
+        return None
+    memory = MemoryCache(config.CACHE_MAX_ENTRIES, config.CACHE_MAX_BYTES, config.CACHE_TTL)
+    disk = None
+    if config.CACHE_DB_PATH:
+        disk = SQLiteCache(config.CACHE_DB_PATH, config.CACHE_DISK_TTL, config.CACHE_DISK_MAX_BYTES,
+                           config.CACHE_DISK_PURGE_INTERVAL)
+        disk.purge()
+    return TieredCache(memory, disk)
+
+
+# Shared cache for fetched article data and computed results, keyed by revision.
+article_cache = _build_cache()
@@ -1,15 +1,26 @@
-import re
-from bs4 import BeautifulSoup
 from pydantic import BaseModel, Field
 from fastapi import HTTPException
-import requests
-from requests import RequestException
 from starlette import status
 
+from analysis import analyze_html
+from article import ArticleDocument, fetch_article
+from concurrency import run_cpu_bound
+# count_doi_isbn_in_wikitext is re-exported: it was defined here before the scanner moved to wikitext.
+from wikitext import count_doi_isbn_in_wikitext, scan_citations  # noqa: F401
+import metrics
+
 
 class CitationResponse(BaseModel):
     citations_with_doi: int = Field(description="Count of citations containing a DOI identifier.", gt=-1)
     citations_with_isbn:int = Field(description="Count of citations containing a ISBN identifier.", gt=-1)
+    citations_with_pmid:int = Field(description="Count of citations containing a PMID identifier.", gt=-1)
+    citations_with_url:int = Field(description="Count of citations containing a URL parameter.", gt=-1)
+
+    cite_templates:int = Field(description="Count of citation templates (cite web, cite journal, ...).", gt=-1)
+    refs:int = Field(description="Count of <ref> tags, including re-uses.", gt=-1)
+    named_refs:int = Field(description="Count of <ref name=...> definitions.", gt=-1)
+    reused_refs:int = Field(description="Count of references re-using a named ref.", gt=-1)
+    bare_refs:int = Field(description="Count of refs without any citation template.", gt=-1)
 
     see_also_links:int = Field(description="Count of see-also-links containing a DOI identifier.", gt=-1)
     external_links:int = Field(description="Count of external links containing a DOI identifier.", gt=-1)
@@ -17,71 +28,17 @@ class CitationResponse(BaseModel):
     page_title:str = Field(description="Page title", min_length=1)
     language:str = Field(description="Language", min_length=1)
 
-    total_citations:int = Field(description="Total number of citations", gt=-1)
+    total_citations:int = Field(description="Total number of distinct citations", gt=-1)
 
 
 def count_links_in_section(html_content: str, section_name: str) -> int:
-    soup = BeautifulSoup(html_content, "html.parser")
-    content = soup.find("div", class_="mw-parser-output")
-    if not content:
-        return 0
-    heading = content.find(lambda tag: tag.name in ['h2', 'h3'] and re.match(section_name, tag.text.strip(), re.IGNORECASE))
-    if not heading:
-        return 0
-    link_count = 0
-    current_element = heading.next_sibling
-    while current_element:
-        if current_element.name in ['h2', 'h3']:
-            break
-        if current_element.name in ['ul', 'ol']:
-            link_count = len(current_element.find_all('a'))
-            break
-        current_element = current_element.next_sibling
-    return link_count
-
-
-def count_doi_isbn_in_wikitext(wikitext: str) -> dict[str, int]:
-    wikitext_lower = wikitext.lower()
-
-    # Simple regex to count occurrences of DOI= or ISBN= parameter within citation templates
-    # This is an approximation but is highly effective.
-    doi_count = len(re.findall(r'(\||}})\s*doi\s*=', wikitext_lower))
-    isbn_count = len(re.findall(r'(\||}})\s*isbn\s*=', wikitext_lower))
-    total_citations_count = len(re.findall(r'\{\{([A-Z])', wikitext))
+    return analyze_html(html_content, section_name)["see_also_links"]
 
-    return {
-        "citations_with_doi": doi_count,
-        "citations_with_isbn": isbn_count,
-        "total_citations": total_citations_count,
-    }
 
-def extract_citation_from_wikitext(page_title:str, language:str):
-    api_url = f"https://{language}.wikipedia.org/w/api.php"
-    wikitext_params = {
-        "action": "query",
-        "prop": "revisions",
-        "titles": page_title,
-        "rvprop": "content",
-        "format": "json",
-        "rvslots": "main"
-    }
+def extract_citation_from_wikitext(page_title:str, language:str, document:ArticleDocument|None=None):
+    if document is None:
+        document = fetch_article(page_title, language)
 
-    extlinks_params = {
-        "action": "query",
-        "prop": "extlinks",
-        "titles": page_title,
-        "ellimit": "max",  # Get up to 500 links
-        "format": "json"
-    }
-
-    html_params = {
-        "action": "parse",
-        "page": page_title,
-        "format": "json",
-        "prop": "text"
-    }
-
-    headers = {"User-Agent": "CitationLinkExtractor/1.0"}
     results = {
         "citations_with_doi": 0,
         "citations_with_isbn": 0,
@@ -90,42 +47,13 @@ def extract_citation_from_wikitext(page_title:str, language:str):
     }
 
     try:
-        text_response = requests.get(api_url, headers=headers, params=wikitext_params, timeout=15)
-        text_response.raise_for_status()
-        data = text_response.json()
-
-        page_data = data.get("query", {}).get("pages", {})
-        page_id = next(iter(page_data.keys()), '-1')
-
-        if page_id == '-1' or 'missing' in page_data[page_id]:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Error: Page {page_title} not found in {language}")
-
-        if "error" in text_response.json():
-            error_msg = text_response.json()["error"].get("info", "Unknown Wikitext API error")
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error_msg)
-
-        wiki_text = page_data[page_id]['revisions'][0]['slots']['main']['*']
-        doi_isbn_count = count_doi_isbn_in_wikitext(wiki_text)
-        results.update(doi_isbn_count)
+        analysis = document.analysis
+        with metrics.timed("analyzer.citation", language):
+            results.update(run_cpu_bound(scan_citations, document.wikitext))
 
-        ext_link_response = requests.get(api_url, headers=headers, params=extlinks_params, timeout=15)
-        ext_link_response.raise_for_status()
-        ext_link_data = ext_link_response.json()
+            results['external_links'] = len(document.external_links)
+            results['see_also_links'] = analysis["see_also_links"]
 
-        page_id_ext = next(iter(ext_link_data.get('query', {}).get('pages', {}).keys()), '-1')
-        if page_id_ext != '-1':
-            external_links_list = ext_link_data['query']['pages'][page_id_ext].get('extlinks', [])
-            results['external_links'] = len(external_links_list)
-
-        html_response = requests.get(api_url, headers=headers, params=html_params, timeout=15)
-        html_response.raise_for_status()
-        html_data = html_response.json()
-        html = html_data["parse"]["text"]["*"]
-
-        results['see_also_links'] = count_links_in_section(html, "See also")
-
-        return CitationResponse(page_title=page_title, language=language, **results)
-    except RequestException as e:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+            return CitationResponse(page_title=page_title, language=language, **results)
     except (KeyError, ValueError, TypeError) as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -0,0 +1,151 @@
+import asyncio
+import contextvars
+import functools
+import multiprocessing
+import threading
+import traceback
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import config
+import metrics
+
+_executor = ThreadPoolExecutor(max_workers=config.ANALYSIS_THREADS, thread_name_prefix="analysis")
+
+
+def _call(func, args, kwargs):
+    with metrics.profiled():
+        return func(*args, **kwargs)
+
+
+# Calls submitted through run_blocking that have not finished, running or queued for a thread.
+_backlog = 0
+
+
+def backlog() -> int:
+    return _backlog
+
+
+async def run_blocking(func, *args, **kwargs):
+    """Runs a blocking function on the shared analysis pool without blocking the event loop."""
+    global _backlog
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    _backlog += 1
+    try:
+        return await loop.run_in_executor(_executor, functools.partial(context.run, _call, func, args, kwargs))
+    finally:
+        _backlog -= 1
+
+
+# Created on first use; replaced if a worker dies.
+_process_pool:ProcessPoolExecutor | None = None
+_process_pool_lock = threading.Lock()
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            # "spawn" because forking a process that runs many threads can deadlock the child.
+            _process_pool = ProcessPoolExecutor(max_workers=config.ANALYSIS_PROCESSES,
+                                                mp_context=multiprocessing.get_context("spawn"))
+        return _process_pool
+
+
+def _discard_process_pool(pool:ProcessPoolExecutor):
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is pool:
+            _process_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def run_cpu_bound(func, document:str, *args):
+    """Runs a CPU-bound analysis of ``document`` (HTML or wikitext) on the worker process pool.
+
+    Blocks the calling thread, not the event loop. Only the document goes to the worker and
+    only the compact result comes back. ``func`` must be a module-level function. Small
+    documents, a disabled pool or a broken pool run ``func`` in this process instead.
+    """
+    if config.ANALYSIS_PROCESSES <= 0 or len(document) < config.ANALYSIS_PROCESS_MIN_CHARS:
+        return func(document, *args)
+    pool = _get_process_pool()
+    try:
+        return pool.submit(func, document, *args).result()
+    except BrokenProcessPool:
+        metrics.ERRORS.inc(stage="process_pool")
+        _discard_process_pool(pool)
+        return func(document, *args)
+
+
+_DONE = object()
+
+
+async def iterate_blocking(func, *args):
+    """Yields the items of the iterator ``func(*args)``, which is created, advanced and closed on one thread.
+
+    lxml trees use the string dictionary of the thread that parsed them and must not be freed
+    on another; only the items (plain strings) leave the thread. The thread is the stream's own,
+    so a slow client never holds a thread of the analysis pool.
+    """
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="stream")
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    state = {}
+
+    def advance():
+        try:
+            if "iterator" not in state:
+                state["iterator"] = iter(func(*args))
+            return next(state["iterator"], _DONE)
+        except BaseException as e:
+            # The failed frames still hold the iterator's locals; free them here, not on the caller's thread.
+            state.clear()
+            traceback.clear_frames(e.__traceback__)
+            raise
+
+    def close():
+        iterator = state.pop("iterator", None)
+        if iterator is not None and hasattr(iterator, "close"):
+            iterator.close()
+
+    try:
+        while True:
+            item = await loop.run_in_executor(executor, functools.partial(context.run, _call, advance, (), {}))
+            if item is _DONE:
+                return
+            yield item
+    finally:
+        # Also reached when the consumer stops early (e.g. a streaming client disconnects).
+        executor.submit(close)
+        executor.shutdown(wait=False)
+
+
+async def bounded_gather(calls, limit:int):
+    """Awaits the given coroutine factories with at most ``limit`` running at once, preserving order."""
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def run(call):
+        async with semaphore:
+            return await call()
+
+    return await asyncio.gather(*(run(call) for call in calls))
+
+
+async def bounded_as_completed(calls, limit:int):
+    """Yields the results of the given coroutine factories as they finish, with at most ``limit`` running."""
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def run(call):
+        async with semaphore:
+            return await call()
+
+    tasks = [asyncio.ensure_future(run(call)) for call in calls]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # The consumer may stop early (e.g. a streaming client disconnects); do not leave work behind.
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,141 @@
+import os
+
+# --- Concurrency ---
+# Number of threads shared by all requests for blocking MediaWiki calls and analysis.
+ANALYSIS_THREADS = int(os.getenv("ANALYSIS_THREADS", "32"))
+# Calls allowed to wait for a free thread before new /operations requests are rejected with 503.
+ANALYSIS_QUEUE_SIZE = int(os.getenv("ANALYSIS_QUEUE_SIZE", "256"))
+# Maximum number of languages analyzed at the same time within one request.
+MAX_CONCURRENT_LANGUAGES = int(os.getenv("MAX_CONCURRENT_LANGUAGES", "6"))
+# Most language codes accepted in an explicit ``languages`` list (``languages=all`` is bounded by the langlinks).
+MAX_LANGUAGES = int(os.getenv("MAX_LANGUAGES", "400"))
+# Concurrent prop=info lookups (one per wiki) when pre-ranking languages for ``top_k``.
+LANGUAGE_INFO_CONCURRENCY = int(os.getenv("LANGUAGE_INFO_CONCURRENCY", "16"))
+# Worker processes for CPU-bound HTML and wikitext analysis (0 analyzes in-process on the threads above).
+ANALYSIS_PROCESSES = int(os.getenv("ANALYSIS_PROCESSES", "0"))
+# Documents shorter than this many characters are analyzed in-process; shipping them costs more than it saves.
+ANALYSIS_PROCESS_MIN_CHARS = int(os.getenv("ANALYSIS_PROCESS_MIN_CHARS", "20000"))
+
+# --- Profiling ---
+# When enabled, a request sent with the header "X-Profile: 1" writes a cProfile dump to PROFILE_DIR.
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "0") == "1"
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+# Comma-separated languages that get their own series in the stage histogram; every other language is
+# recorded as "other" so the number of series stays bounded (empty: no language label values at all).
+METRICS_LANGUAGES = frozenset(code.strip() for code in os.getenv("METRICS_LANGUAGES", "en,es,fr,de,pt,ar").split(",")
+                              if code.strip())
+
+# --- Interlanguage links ---
+# Number of (source wiki, title) langlinks maps kept in memory.
+LANGLINKS_CACHE_SIZE = int(os.getenv("LANGLINKS_CACHE_SIZE", "10000"))
+# Seconds a cached langlinks map stays valid.
+LANGLINKS_CACHE_TTL = float(os.getenv("LANGLINKS_CACHE_TTL", "3600"))
+
+# --- MediaWiki HTTP client ---
+# Action API endpoint per wiki; point it at a local stand-in (see benchmarks/) to run offline.
+MEDIAWIKI_API_URL = os.getenv("MEDIAWIKI_API_URL", "https://{language}.wikipedia.org/w/api.php")
+# REST API base per wiki, used to stream the HTML of large articles; defaults to the action API's host.
+MEDIAWIKI_REST_URL = os.getenv("MEDIAWIKI_REST_URL", MEDIAWIKI_API_URL.replace("/api.php", "/rest.php/v1"))
+# Articles with at least this many bytes of wikitext have their HTML streamed and analyzed while it downloads.
+HTML_STREAMING_MIN_LENGTH = int(os.getenv("HTML_STREAMING_MIN_LENGTH", "100000"))
+# Largest article HTML in bytes (streamed, or the action=parse response carrying it) before the fetch
+# is abandoned (0: no limit).
+MAX_ARTICLE_HTML_BYTES = int(os.getenv("MAX_ARTICLE_HTML_BYTES", str(64 * 1024 * 1024)))
+USER_AGENT = os.getenv("USER_AGENT", "WikiStructureAnalyzer/1.0 (https://github.com/grey-box/wil-symmetry-ccsu-rawkit-2025)")
+# Number of wiki hosts with their own keep-alive pool, and connections kept per host.
+HTTP_POOL_HOSTS = int(os.getenv("HTTP_POOL_HOSTS", "16"))
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "32"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "15"))
+# Retries after the first attempt, with jittered exponential backoff between them.
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "3"))
+HTTP_BACKOFF_BASE = float(os.getenv("HTTP_BACKOFF_BASE", "0.5"))
+HTTP_BACKOFF_MAX = float(os.getenv("HTTP_BACKOFF_MAX", "10"))
+# Seconds of database replication lag at which MediaWiki should refuse our requests.
+MEDIAWIKI_MAXLAG = int(os.getenv("MEDIAWIKI_MAXLAG", "5"))
+
+# --- Upstream admission control (per wiki host) ---
+# Sustained requests per second and burst size; HTTP_RATE_LIMIT=0 disables rate limiting.
+HTTP_RATE_LIMIT = float(os.getenv("HTTP_RATE_LIMIT", "25"))
+HTTP_RATE_BURST = float(os.getenv("HTTP_RATE_BURST", "50"))
+# Bounds of the adaptive concurrency limit, and the latency above which it backs off.
+HTTP_MIN_CONCURRENCY = int(os.getenv("HTTP_MIN_CONCURRENCY", "2"))
+HTTP_MAX_CONCURRENCY = int(os.getenv("HTTP_MAX_CONCURRENCY", "32"))
+HTTP_TARGET_LATENCY = float(os.getenv("HTTP_TARGET_LATENCY", "3"))
+# Calls allowed to wait for a slot (keep below ANALYSIS_THREADS), and how long they may wait,
+# before new work is rejected with 503.
+HTTP_QUEUE_SIZE = int(os.getenv("HTTP_QUEUE_SIZE", "24"))
+HTTP_QUEUE_TIMEOUT = float(os.getenv("HTTP_QUEUE_TIMEOUT", "10"))
+
+# --- Article and result cache ---
+CACHE_ENABLED = os.getenv("CACHE_ENABLED", "1") == "1"
+# In-memory LRU tier: entry count, total size of cached values in characters, and age in seconds.
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "5000"))
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+CACHE_TTL = float(os.getenv("CACHE_TTL", "3600"))
+# Persistent SQLite tier; set CACHE_DB_PATH to an empty string to keep the cache in memory only.
+CACHE_DB_PATH = os.getenv("CACHE_DB_PATH", "cache.sqlite3")
+CACHE_DISK_TTL = float(os.getenv("CACHE_DISK_TTL", str(7 * 24 * 3600)))
+# Size bound of the persistent tier in characters (0: unbounded), enforced with the expiry purge every interval.
+CACHE_DISK_MAX_BYTES = int(os.getenv("CACHE_DISK_MAX_BYTES", str(2 * 1024 * 1024 * 1024)))
+CACHE_DISK_PURGE_INTERVAL = float(os.getenv("CACHE_DISK_PURGE_INTERVAL", "600"))
+
+# --- Startup ---
+# "|"-separated language:title pairs analyzed at startup, before the process accepts requests,
+# e.g. "en:Python_(programming_language)|fr:Paris".
+PREWARM_ARTICLES = [tuple(entry.strip().split(":", 1)) for entry in os.getenv("PREWARM_ARTICLES", "").split("|")
+                    if ":" in entry]
+# Longest time startup waits for prewarming; what is left continues in the background.
+PREWARM_TIMEOUT = float(os.getenv("PREWARM_TIMEOUT", "30"))
+
+# --- Batch scoring ---
+# Maximum number of articles accepted by /operations/batch.
+BATCH_MAX_ARTICLES = int(os.getenv("BATCH_MAX_ARTICLES", "500"))
+# Maximum number of (article, language) analyses running at once within one batch.
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "16"))
+
+# --- Score index ---
+# SQLite file holding the latest score of every analyzed article; set to an empty string to disable.
+SCORE_INDEX_PATH = os.getenv("SCORE_INDEX_PATH", "scores.sqlite3")
+# Seconds between background checks of indexed articles for new revisions (0 disables the refresher).
+SCORE_INDEX_REFRESH_INTERVAL = float(os.getenv("SCORE_INDEX_REFRESH_INTERVAL", "900"))
+# Maximum number of changed articles re-analyzed per wiki in one refresh pass.
+SCORE_INDEX_REFRESH_LIMIT = int(os.getenv("SCORE_INDEX_REFRESH_LIMIT", "500"))
+
+# --- Job queue ---
+# SQLite file of the /jobs queue; set to an empty string to disable the job API and its workers.
+JOB_DB_PATH = os.getenv("JOB_DB_PATH", "jobs.sqlite3")
+# Workers per process for the interactive lane, and for bulk jobs (which never use the interactive workers).
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_BULK_WORKERS = int(os.getenv("JOB_BULK_WORKERS", "2"))
+# Seconds a running job stays claimed without a heartbeat before another worker takes it over.
+JOB_LEASE = float(os.getenv("JOB_LEASE", "60"))
+# Runs of a job interrupted by crashes or restarts before it is marked failed.
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+# Seconds between checks for jobs submitted to other worker processes.
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "2"))
+# Seconds finished jobs are kept.
+JOB_RETENTION = float(os.getenv("JOB_RETENTION", str(7 * 24 * 3600)))
+# Comma-separated hosts that job callbacks may target; empty accepts any host that resolves only to public addresses.
+JOB_CALLBACK_HOSTS = frozenset(host.strip().lower() for host in os.getenv("JOB_CALLBACK_HOSTS", "").split(",")
+                               if host.strip())
+# Threads that deliver job callbacks, apart from the analysis threads.
+JOB_CALLBACK_THREADS = int(os.getenv("JOB_CALLBACK_THREADS", "2"))
+
+# --- Revision history ---
+# Most revisions a /history request may cover.
+HISTORY_MAX_REVISIONS = int(os.getenv("HISTORY_MAX_REVISIONS", "500"))
+# Revisions whose wikitext is downloaded per query (50 is the API maximum for most clients).
+HISTORY_BATCH_SIZE = int(os.getenv("HISTORY_BATCH_SIZE", "50"))
+
+# --- Analytics ---
+# Seconds the in-memory copy of the score index may lag behind writes, from this or other workers.
+ANALYTICS_FRAME_TTL = float(os.getenv("ANALYTICS_FRAME_TTL", "60"))
+
+# --- Responses ---
+# Bodies smaller than this many bytes are sent uncompressed; larger ones use brotli or gzip.
+RESPONSE_COMPRESSION_MIN_SIZE = int(os.getenv("RESPONSE_COMPRESSION_MIN_SIZE", "1000"))
+RESPONSE_GZIP_LEVEL = int(os.getenv("RESPONSE_GZIP_LEVEL", "6"))
+RESPONSE_BROTLI_QUALITY = int(os.getenv("RESPONSE_BROTLI_QUALITY", "5"))
+# Cache-Control max-age for JSON results; 0 sends "no-cache" so clients and CDNs revalidate with the ETag.
+RESPONSE_MAX_AGE = int(os.getenv("RESPONSE_MAX_AGE", "0"))
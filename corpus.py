@@ -0,0 +1,155 @@
+"""Vectorized scoring, ranking and normalization over the whole score index.
+
+Kept apart from the ``/analytics`` router so numpy and pandas are only imported
+on the first analytics request, not at service startup.
+"""
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+import metrics
+from score_index import COMPONENTS, ScoreIndex
+
+
+class ScoreFrame:
+    """Component counts of every indexed article as one columnar DataFrame, reloaded every ``ttl`` seconds.
+
+    Scoring writes to the index constantly, so writes (from any worker) are seen after at
+    most ``ANALYTICS_FRAME_TTL`` seconds rather than reloading the whole index for each one.
+    """
+
+    def __init__(self, index:ScoreIndex, ttl:float):
+        self.index = index
+        self.ttl = ttl
+        self._frame:pd.DataFrame | None = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self) -> pd.DataFrame:
+        with self._lock:
+            if self._frame is None or time.monotonic() - self._loaded_at > self.ttl:
+                with metrics.timed("analytics_load"):
+                    frame = pd.read_sql_query("SELECT language, title, revision_id, " + ", ".join(COMPONENTS)
+                                              + " FROM scores", self.index.connection())
+                frame["language"] = frame["language"].astype("category")
+                self._frame = frame
+                self._loaded_at = time.monotonic()
+            return self._frame
+
+
+def weighted_scores(counts:np.ndarray, weights:dict[str, float]) -> np.ndarray:
+    """Vectorized ``score_from_counts``: one matrix-vector product over a (rows x components) array."""
+    return counts @ np.array([weights[name] for name in COMPONENTS], dtype=np.float64)
+
+
+def _group_sums(values:np.ndarray, codes:np.ndarray, groups:int) -> np.ndarray:
+    if values.ndim == 1:
+        return np.bincount(codes, values, minlength=groups)
+    return np.stack([np.bincount(codes, column, minlength=groups) for column in values.T], axis=1)
+
+
+def _group_mean_std(values:np.ndarray, codes:np.ndarray, groups:int) -> tuple[np.ndarray, np.ndarray]:
+    """Per-group mean and population standard deviation of the rows of ``values``, indexed by group code."""
+    sizes = np.maximum(np.bincount(codes, minlength=groups), 1).reshape((groups,) + (1,) * (values.ndim - 1))
+    mean = _group_sums(values, codes, groups) / sizes
+    return mean, np.sqrt(_group_sums((values - mean[codes]) ** 2, codes, groups) / sizes)
+
+
+def _sort_within_groups(keys:np.ndarray, codes:np.ndarray) -> np.ndarray:
+    """Row order by group code, then by ``keys`` ascending; cheaper than lexsort on small integer codes."""
+    by_key = np.argsort(keys)
+    return by_key[np.argsort(codes[by_key], kind="stable")]
+
+
+def _safe_divide(numerator:np.ndarray, denominator:np.ndarray) -> np.ndarray:
+    # Constant columns within a language carry no signal; they normalize to 0 rather than NaN.
+    return np.divide(numerator, denominator, out=np.zeros_like(numerator), where=denominator > 0)
+
+
+def normalize_components(counts:np.ndarray, codes:np.ndarray, groups:int, normalization:str) -> np.ndarray:
+    """Normalizes a (rows x components) count matrix within each language group."""
+    if normalization == "none":
+        return counts
+    if normalization == "log":
+        return np.log1p(counts)
+    if normalization == "minmax":
+        order = np.argsort(codes, kind="stable")
+        present = np.unique(codes)
+        starts = np.searchsorted(codes[order], present)
+        low = np.zeros((groups, counts.shape[1]))
+        high = np.zeros((groups, counts.shape[1]))
+        low[present] = np.minimum.reduceat(counts[order], starts, axis=0)
+        high[present] = np.maximum.reduceat(counts[order], starts, axis=0)
+        return _safe_divide(counts - low[codes], (high - low)[codes])
+    mean, std = _group_mean_std(counts, codes, groups)
+    return _safe_divide(counts - mean[codes], std[codes])
+
+
+def score_corpus(frame:pd.DataFrame, weights:dict[str, float], normalization:str="none") -> pd.DataFrame:
+    """Scores every row under ``weights`` and adds per-language rank, percentile and z-score columns.
+
+    ``rank`` is 1 for the best article of its language (ties share the better rank) and
+    ``percentile`` is the share of the language's articles scoring at or below the row.
+    """
+    codes = frame["language"].cat.codes.to_numpy().astype(np.intp)
+    groups = len(frame["language"].cat.categories)
+    counts = frame[list(COMPONENTS)].to_numpy(dtype=np.float64)
+    scores = weighted_scores(normalize_components(counts, codes, groups, normalization), weights)
+
+    # One sort by (language, score descending) yields every per-language ranking at once.
+    order = _sort_within_groups(-scores, codes)
+    sorted_codes, sorted_scores = codes[order], scores[order]
+    positions = np.arange(len(order))
+    starts = np.searchsorted(sorted_codes, np.arange(groups))
+    new_value = np.ones(len(order), dtype=bool)
+    new_value[1:] = (sorted_scores[1:] != sorted_scores[:-1]) | (sorted_codes[1:] != sorted_codes[:-1])
+    ranks = np.empty(len(order), dtype=np.int64)
+    ranks[order] = np.maximum.accumulate(np.where(new_value, positions, 0)) - starts[sorted_codes] + 1
+
+    sizes = np.bincount(codes, minlength=groups)
+    mean, std = _group_mean_std(scores, codes, groups)
+    scored = frame[["language", "title", "revision_id"]].copy()
+    scored["score"] = scores
+    scored["rank"] = ranks
+    scored["percentile"] = (sizes[codes] - ranks + 1) / sizes[codes] * 100
+    scored["z_score"] = _safe_divide(scores - mean[codes], std[codes])
+    return scored
+
+
+def language_summary(scored:pd.DataFrame, percentiles:list[float]) -> dict[str, dict]:
+    codes = scored["language"].cat.codes.to_numpy().astype(np.intp)
+    scores = scored["score"].to_numpy()
+    order = _sort_within_groups(scores, codes)
+    boundaries = np.searchsorted(codes[order], np.arange(len(scored["language"].cat.categories) + 1))
+    summary = {}
+    # One slice per language (not per row) of the already sorted scores.
+    for code, language in enumerate(scored["language"].cat.categories):
+        values = scores[order[boundaries[code]:boundaries[code + 1]]]
+        if not len(values):
+            continue
+        quantiles = np.percentile(values, percentiles) if percentiles else []
+        summary[str(language)] = {
+            "articles": len(values),
+            "mean": float(values.mean()),
+            "std": float(values.std()),
+            "percentiles": {f"p{p:g}": float(q) for p, q in zip(percentiles, quantiles)},
+        }
+    return summary
+
+
+def rank_groups(scored:pd.DataFrame, groups:list[list[tuple[str, str]]]) -> list[list[dict]]:
+    """Ranks the language versions of each article group and marks the highest scoring one as authority."""
+    members = pd.DataFrame(
+        [(number, language, title.replace(" ", "_")) for number, group in enumerate(groups) for language, title in group],
+        columns=["group", "language", "title"])
+    members["language"] = members["language"].astype(str)
+    lookup = scored.assign(language=scored["language"].astype(str))
+    ranked = members.merge(lookup, on=["language", "title"], how="left")
+    ranked["is_authority_article"] = ranked["score"].notna() & (
+        ranked["score"] == ranked.groupby("group")["score"].transform("max"))
+    ranked = ranked.sort_values(["group", "score"], ascending=[True, False], na_position="last")
+    ranked[["revision_id", "rank"]] = ranked[["revision_id", "rank"]].astype("Int64")
+    ranked = ranked.astype(object).where(ranked.notna(), None)
+    return [rows.drop(columns="group").to_dict(orient="records") for _, rows in ranked.groupby("group", sort=True)]
@@ -0,0 +1,141 @@
+"""Offline bulk scoring of a Wikipedia ``pages-articles`` XML dump.
+
+Usage::
+
+    python dumps.py enwiki-latest-pages-articles.xml.bz2 scores.csv --workers 8
+    python dumps.py frwiki-latest-pages-articles.xml.bz2 scores.parquet --language fr
+
+The dump is decompressed and parsed incrementally, so memory stays bounded by
+the number of pages in flight, not by the size of the dump. Pages are scored
+from their wikitext by a pool of worker processes.
+"""
+import argparse
+import bz2
+import csv
+import os
+import re
+import xml.etree.ElementTree as ElementTree
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+
+from wikitext import score_wikitext
+
+OUTPUT_COLUMNS = ["language", "title", "revision_id", "score", "citations", "tables", "infobox_attributes",
+                  "headers", "images", "citations_with_doi", "citations_with_isbn"]
+
+
+def _local_name(tag:str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def iter_pages(path:str, namespaces:tuple[int, ...]=(0,)):
+    """Yields ``(title, revision_id, wikitext)`` for every non-redirect page in the given namespaces."""
+    opener = bz2.open if path.endswith(".bz2") else open
+    with opener(path, "rb") as dump:
+        events = ElementTree.iterparse(dump, events=("start", "end"))
+        _, root = next(events)
+        for event, element in events:
+            if event != "end" or _local_name(element.tag) != "page":
+                continue
+            revision = element.find("{*}revision")
+            if element.find("{*}redirect") is None and int(element.findtext("{*}ns") or 0) in namespaces \
+                    and revision is not None:
+                yield (element.findtext("{*}title") or "", int(revision.findtext("{*}id") or 0),
+                       revision.findtext("{*}text") or "")
+            # Drop the finished page so the tree never grows beyond one page.
+            root.clear()
+
+
+def score_pages(pages:list[tuple[str, int, str]], language:str) -> list[dict]:
+    """Worker entry point: scores a chunk of pages and returns only the compact count rows."""
+    rows = []
+    for title, revision_id, text in pages:
+        score, counts = score_wikitext(text)
+        rows.append({"language": language, "title": title, "revision_id": revision_id,
+                     "score": round(score, 3), **counts})
+    return rows
+
+
+def score_dump(path:str, language:str, workers:int|None=None, chunk_size:int=64):
+    """Yields score rows for every article of the dump, computed across a process pool.
+
+    At most ``2 * workers`` chunks are in flight, which bounds memory use.
+    """
+    workers = workers or os.cpu_count() or 1
+    pages = iter_pages(path)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        while True:
+            while len(pending) < 2 * workers:
+                chunk = list(islice(pages, chunk_size))
+                if not chunk:
+                    break
+                pending.add(pool.submit(score_pages, chunk, language))
+            if not pending:
+                return
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from future.result()
+
+
+def write_csv(rows, output_path:str) -> int:
+    written = 0
+    with open(output_path, "w", newline="", encoding="utf-8") as output:
+        writer = csv.DictWriter(output, fieldnames=OUTPUT_COLUMNS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            written += 1
+    return written
+
+
+def write_parquet(rows, output_path:str, batch_size:int=10000) -> int:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise RuntimeError("Parquet output requires pyarrow (pip install pyarrow)") from e
+
+    written = 0
+    writer = None
+    try:
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+            table = pa.Table.from_pylist(batch)
+            if writer is None:
+                writer = pq.ParquetWriter(output_path, table.schema)
+            writer.write_table(table)
+            written += len(batch)
+    finally:
+        if writer is not None:
+            writer.close()
+    return written
+
+
+def language_from_dump_name(path:str) -> str | None:
+    match = re.match(r"([a-z_-]+?)wiki-", os.path.basename(path))
+    return match.group(1) if match else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score every article of a Wikipedia XML dump.")
+    parser.add_argument("dump", help="Path to a pages-articles .xml or .xml.bz2 dump")
+    parser.add_argument("output", help="Output file (.csv or .parquet)")
+    parser.add_argument("--language", help="Language code (defaults to the prefix of the dump file name)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (defaults to all cores)")
+    parser.add_argument("--chunk-size", type=int, default=64, help="Pages sent to a worker at a time")
+    args = parser.parse_args()
+
+    language = args.language or language_from_dump_name(args.dump) or "en"
+    rows = score_dump(args.dump, language, workers=args.workers, chunk_size=args.chunk_size)
+    if args.output.endswith(".parquet"):
+        written = write_parquet(rows, args.output)
+    else:
+        written = write_csv(rows, args.output)
+    print(f"Scored {written} articles from {args.dump} into {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import json
+
+from fastapi import HTTPException
+from starlette import status
+
+import metrics
+from article import parse_page
+from cache import article_cache, revision_key
+from concurrency import run_cpu_bound
+from singleflight import SingleFlight
+from wikitext import wikitext_component_counts
+
+# Everything the five score components need, without the rendered HTML.
+FAST_PROPS = "sections|images|wikitext|revid"
+
+_fetches = SingleFlight()
+
+
+def counts_from_parse(parsed:dict) -> dict[str, int]:
+    """Score components from a metadata-only ``action=parse`` result.
+
+    Headers and images come straight from the ``sections`` and ``images`` props;
+    citations, tables and infobox attributes are counted in the wikitext.
+    """
+    return {
+        **run_cpu_bound(wikitext_component_counts, parsed["wikitext"]["*"]),
+        "headers": len(parsed.get("sections", [])),
+        "images": len(parsed.get("images", [])),
+    }
+
+
+def _fetch_counts(page_title:str, language:str) -> tuple[int | None, dict[str, int]]:
+    parsed = parse_page(page_title, language, FAST_PROPS)
+    try:
+        with metrics.timed("fast_counts", language):
+            return parsed.get("revid"), counts_from_parse(parsed)
+    except (KeyError, TypeError) as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+def get_score_counts(page_title:str, language:str, revision_id:int|None=None) -> dict[str, int]:
+    """The five score components of an article, cached by revision like full analyses."""
+    if article_cache is not None and revision_id is not None:
+        cached = article_cache.get(revision_key("counts", language, page_title, revision_id))
+        metrics.record_cache("counts", cached is not None)
+        if cached is not None:
+            return json.loads(cached)
+
+    fetched_revision, counts = _fetches.do((language, page_title), _fetch_counts, page_title, language)
+    if article_cache is not None and fetched_revision is not None:
+        article_cache.set(revision_key("counts", language, page_title, fetched_revision), json.dumps(counts))
+    return counts
@@ -0,0 +1,184 @@
+"""Score history of an article over its latest revisions.
+
+Revisions are first listed without content (ids, timestamps and sha1). Only the
+revisions whose counts are not cached yet are downloaded, ``HISTORY_BATCH_SIZE``
+per query, and a revision with the sha1 of one already scored (a revert) is not
+downloaded at all. Each wikitext is split into sections whose counts are cached
+by content hash, so a revision only rescans the sections its edit changed.
+"""
+import json
+from collections import Counter
+from typing import Iterator
+
+from fastapi import APIRouter, HTTPException, Path, Query, Request
+from requests import RequestException
+from starlette import status
+
+import config
+import mediawiki
+import metrics
+from cache import article_cache, content_key, revision_key
+from concurrency import run_blocking
+from responses import json_response
+from scoring import score_from_counts
+from wikitext import combine_section_counts, section_counts, split_sections
+
+history_router = APIRouter(
+    prefix="/history",
+    tags=["History"],
+)
+
+# Revisions listed per query when no content is requested (the API maximum).
+REVISION_LIST_LIMIT = 500
+
+
+def _api_get(language: str, params: dict) -> dict:
+    try:
+        data = mediawiki.api_get(language, params)
+    except RequestException as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+    if "error" in data:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=data["error"].get("info", "Unknown API error"))
+    return data
+
+
+def list_revisions(title: str, language: str, limit: int) -> list[dict]:
+    """The ``limit`` latest revisions of an article, newest first, with ``revid``, ``timestamp`` and ``sha1``."""
+    params = {
+        "action": "query",
+        "prop": "revisions",
+        "titles": title,
+        "redirects": "1",
+        "rvprop": "ids|timestamp|sha1",
+        "rvlimit": str(min(limit, REVISION_LIST_LIMIT))
+    }
+    revisions = []
+    while len(revisions) < limit:
+        data = _api_get(language, params)
+        page = next(iter(data.get("query", {}).get("pages", {}).values()), {"missing": ""})
+        if "missing" in page or "invalid" in page:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                                detail=f"Page '{title}' not found in {language} Wikipedia.")
+        revisions.extend(page.get("revisions", []))
+        if "continue" not in data:
+            break
+        params = {**params, **data["continue"]}
+    return revisions[:limit]
+
+
+def iter_wikitexts(revision_ids: list[int], language: str) -> Iterator[tuple[int, str | None]]:
+    """``(revid, wikitext)`` of the given revisions, one batch in memory at a time; hidden text is None."""
+    for start in range(0, len(revision_ids), config.HISTORY_BATCH_SIZE):
+        chunk = revision_ids[start:start + config.HISTORY_BATCH_SIZE]
+        with metrics.timed("history_fetch", language):
+            data = _api_get(language, {
+                "action": "query",
+                "prop": "revisions",
+                "revids": "|".join(str(revision_id) for revision_id in chunk),
+                "rvprop": "ids|content",
+                "rvslots": "main"
+            })
+        for page in data.get("query", {}).get("pages", {}).values():
+            for revision in page.get("revisions", []):
+                yield revision["revid"], revision.get("slots", {}).get("main", {}).get("*")
+
+
+def _section_counts(section: str, memo: dict[str, dict], stats: Counter) -> dict:
+    key = content_key("section", section)
+    counts = memo.get(key)
+    if counts is None and article_cache is not None:
+        cached = article_cache.get(key)
+        counts = json.loads(cached) if cached is not None else None
+    if counts is None:
+        counts = section_counts(section)
+        stats["sections_scanned"] += 1
+        if article_cache is not None:
+            article_cache.set(key, json.dumps(counts))
+    else:
+        stats["sections_reused"] += 1
+    memo[key] = counts
+    return counts
+
+
+def score_history(title: str, language: str, limit: int) -> dict:
+    """Score and components of each of the ``limit`` latest revisions, oldest first."""
+    normalized_title = title.replace(" ", "_")
+    revisions = list_revisions(normalized_title, language, limit)
+    stats = Counter()
+    counts_by_revision: dict[int, dict | None] = {}
+    counts_by_sha1: dict[str, dict] = {}
+
+    for revision in revisions:
+        if article_cache is None:
+            break
+        cached = article_cache.get(revision_key("history", language, normalized_title, revision["revid"]))
+        metrics.record_cache("history", cached is not None)
+        if cached is not None:
+            counts_by_revision[revision["revid"]] = json.loads(cached)
+            if revision.get("sha1"):
+                counts_by_sha1[revision["sha1"]] = counts_by_revision[revision["revid"]]
+
+    # Download each missing content once: reverts share the sha1 of an earlier revision.
+    to_fetch, pending_sha1 = [], set()
+    for revision in revisions:
+        sha1 = revision.get("sha1")
+        if revision["revid"] in counts_by_revision or sha1 in counts_by_sha1 or sha1 in pending_sha1:
+            continue
+        to_fetch.append(revision["revid"])
+        if sha1:
+            pending_sha1.add(sha1)
+    # Oldest first, so every section of an edit's parent is already in the memo.
+    to_fetch.reverse()
+
+    sha1_by_revision = {revision["revid"]: revision.get("sha1") for revision in revisions}
+    memo: dict[str, dict] = {}
+    for revision_id, wikitext in iter_wikitexts(to_fetch, language):
+        stats["revisions_downloaded"] += 1
+        counts = None
+        if wikitext is not None:
+            counts = combine_section_counts([_section_counts(section, memo, stats)
+                                             for section in split_sections(wikitext)])
+            if article_cache is not None:
+                article_cache.set(revision_key("history", language, normalized_title, revision_id),
+                                  json.dumps(counts))
+            if sha1_by_revision.get(revision_id):
+                counts_by_sha1[sha1_by_revision[revision_id]] = counts
+        counts_by_revision[revision_id] = counts
+
+    series = []
+    for revision in reversed(revisions):
+        counts = counts_by_revision.get(revision["revid"]) or counts_by_sha1.get(revision.get("sha1"))
+        point = {"revision_id": revision["revid"], "timestamp": revision.get("timestamp")}
+        if counts is None:
+            point.update(score=None, error="Revision content is hidden or unavailable.")
+        else:
+            point.update(score=round(score_from_counts(**counts), 3), **counts)
+        series.append(point)
+
+    return {
+        "article": title,
+        "language": language,
+        "revisions": len(series),
+        "revisions_downloaded": stats["revisions_downloaded"],
+        "sections_scanned": stats["sections_scanned"],
+        "sections_reused": stats["sections_reused"],
+        "series": series
+    }
+
+
+@history_router.get("/{language}/{title}", status_code=status.HTTP_200_OK)
+async def get_history(request: Request, title: str, language: str = Path(min_length=1),
+                      limit: int = Query(100, ge=1), fields: str | None = Query(None)):
+    """
+    Quality score of the article over its ``limit`` latest revisions, oldest first.
+    Scores are computed from wikitext, like offline dump scoring, so they are comparable
+    with each other rather than identical to the rendered-HTML analysis.
+    ``fields`` selects parts of the response, e.g. ``series.timestamp,series.score``.
+    """
+    if limit > config.HISTORY_MAX_REVISIONS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"At most {config.HISTORY_MAX_REVISIONS} revisions may be requested.")
+    return json_response(request, await run_blocking(score_history, title, language, limit), fields)
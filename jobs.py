@@ -0,0 +1,446 @@
+import asyncio
+import ipaddress
+import json
+import logging
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+from typing import Literal
+from urllib.parse import urlparse
+
+import requests
+from fastapi import APIRouter, HTTPException, Path, Query, Request
+from pydantic import BaseModel, Field
+from starlette import status
+
+import config
+import metrics
+from admission import Overloaded
+from mediawiki import LANGUAGE_CODE
+from concurrency import run_blocking
+from operations import BatchArticle, ScoreMode, iter_language_scores, plan_languages, rank_scores
+from responses import json_response
+
+logger = logging.getLogger(__name__)
+
+jobs_router = APIRouter(
+    prefix="/jobs",
+    tags=["Jobs"],
+)
+
+# "interactive" jobs have workers of their own; "bulk" jobs only run on the JOB_BULK_WORKERS.
+Priority = Literal["interactive", "bulk"]
+PENDING = ("queued", "running")
+
+
+class JobStore:
+    """Durable job queue in SQLite, shared by every worker process on the host.
+
+    A running job holds a lease that its worker keeps extending; a job whose lease
+    ran out (its process died or restarted) is claimed again by the next free worker.
+    """
+
+    def __init__(self, path:str):
+        self.path = path
+        self._local = threading.local()
+        with self.connection() as connection:
+            connection.execute("CREATE TABLE IF NOT EXISTS jobs ("
+                               "id TEXT PRIMARY KEY, dedup_key TEXT NOT NULL, language TEXT NOT NULL, "
+                               "title TEXT NOT NULL, mode TEXT NOT NULL, priority TEXT NOT NULL, "
+                               "status TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, "
+                               "created_at REAL NOT NULL, available_at REAL NOT NULL, started_at REAL, "
+                               "finished_at REAL, lease_until REAL, languages TEXT, progress TEXT, result TEXT, "
+                               "error TEXT)")
+            if "languages" not in {row[1] for row in connection.execute("PRAGMA table_info(jobs)")}:
+                # Queues created before jobs recorded the languages they analyze.
+                connection.execute("ALTER TABLE jobs ADD COLUMN languages TEXT")
+            connection.execute("CREATE INDEX IF NOT EXISTS jobs_by_status ON jobs (status, priority, available_at)")
+            connection.execute("CREATE INDEX IF NOT EXISTS jobs_by_key ON jobs (dedup_key, status)")
+            connection.execute("CREATE TABLE IF NOT EXISTS job_callbacks (job_id TEXT NOT NULL, url TEXT NOT NULL, "
+                               "PRIMARY KEY (job_id, url))")
+
+    def connection(self) -> sqlite3.Connection:
+        # SQLite connections cannot be shared across threads, so each thread opens its own.
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def _transaction(self):
+        # BEGIN IMMEDIATE takes the write lock up front, so two processes never claim or insert the same job.
+        connection = self.connection()
+        connection.execute("BEGIN IMMEDIATE")
+        return connection
+
+    def submit(self, language:str, title:str, mode:str, priority:str, callback_url:str|None=None) -> tuple[dict, bool]:
+        """Queues a job, or returns the identical job already queued or running (and whether it was reused)."""
+        dedup_key = f"{language}:{title}:{mode}"
+        connection = self._transaction()
+        try:
+            row = connection.execute("SELECT * FROM jobs WHERE dedup_key = ? AND status IN (?, ?)",
+                                     (dedup_key, *PENDING)).fetchone()
+            if row is None:
+                job_id = uuid.uuid4().hex
+                now = time.time()
+                connection.execute("INSERT INTO jobs (id, dedup_key, language, title, mode, priority, status, "
+                                   "created_at, available_at) VALUES (?, ?, ?, ?, ?, ?, 'queued', ?, ?)",
+                                   (job_id, dedup_key, language, title, mode, priority, now, now))
+            else:
+                job_id = row["id"]
+                if priority == "interactive" and row["priority"] == "bulk":
+                    # An interactive caller waiting on a queued bulk job moves it to the interactive lane.
+                    connection.execute("UPDATE jobs SET priority = 'interactive' WHERE id = ?", (job_id,))
+            if callback_url:
+                connection.execute("INSERT OR IGNORE INTO job_callbacks (job_id, url) VALUES (?, ?)",
+                                   (job_id, callback_url))
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return self.get(job_id), row is not None
+
+    def get(self, job_id:str) -> dict | None:
+        row = self.connection().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row is not None else None
+
+    def claim(self, lanes:tuple[str, ...], lease:float) -> dict | None:
+        """Takes the oldest available job of the first lane that has one, including jobs with an expired lease."""
+        now = time.time()
+        connection = self._transaction()
+        try:
+            row = None
+            for lane in lanes:
+                row = connection.execute(
+                    "SELECT * FROM jobs WHERE priority = ? AND ((status = 'queued' AND available_at <= ?) "
+                    "OR (status = 'running' AND lease_until < ?)) ORDER BY available_at LIMIT 1",
+                    (lane, now, now)).fetchone()
+                if row is not None:
+                    break
+            if row is not None:
+                if row["attempts"] >= config.JOB_MAX_ATTEMPTS:
+                    connection.execute("UPDATE jobs SET status = 'failed', finished_at = ?, error = ? WHERE id = ?",
+                                       (now, "The job was interrupted too many times.", row["id"]))
+                    row = None
+                else:
+                    connection.execute("UPDATE jobs SET status = 'running', attempts = attempts + 1, started_at = ?, "
+                                       "lease_until = ? WHERE id = ?", (now, now + lease, row["id"]))
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return self.get(row["id"]) if row is not None else None
+
+    def plan(self, job_id:str, languages:list[str]):
+        """Records the languages a running job analyzes, which sets the total of its progress."""
+        self.connection().execute("UPDATE jobs SET languages = ? WHERE id = ? AND status = 'running'",
+                                  (json.dumps(languages), job_id))
+
+    def heartbeat(self, job_id:str, lease:float, progress:list[dict]|None=None) -> bool:
+        """Extends the lease (and records partial results); False once the job was cancelled."""
+        query = "UPDATE jobs SET lease_until = ?" + (", progress = ?" if progress is not None else "") \
+                + " WHERE id = ? AND status = 'running'"
+        params = [time.time() + lease] + ([json.dumps(progress)] if progress is not None else []) + [job_id]
+        return self.connection().execute(query, params).rowcount == 1
+
+    def finish(self, job_id:str, result:dict|None=None, error:str|None=None):
+        self.connection().execute(
+            "UPDATE jobs SET status = ?, finished_at = ?, result = ?, error = ?, lease_until = NULL "
+            "WHERE id = ? AND status = 'running'",
+            ("done" if error is None else "failed", time.time(),
+             json.dumps(result) if result is not None else None, error, job_id))
+
+    def defer(self, job_id:str, delay:float):
+        """Puts a running job back in the queue, available again after ``delay`` seconds."""
+        self.connection().execute(
+            "UPDATE jobs SET status = 'queued', available_at = ?, attempts = attempts - 1, lease_until = NULL "
+            "WHERE id = ? AND status = 'running'", (time.time() + delay, job_id))
+
+    def cancel(self, job_id:str) -> bool:
+        return self.connection().execute(
+            "UPDATE jobs SET status = 'cancelled', finished_at = ?, lease_until = NULL "
+            "WHERE id = ? AND status IN (?, ?)", (time.time(), job_id, *PENDING)).rowcount == 1
+
+    def callbacks(self, job_id:str) -> list[str]:
+        return [row[0] for row in self.connection().execute("SELECT url FROM job_callbacks WHERE job_id = ?",
+                                                            (job_id,))]
+
+    def counts(self) -> dict[str, int]:
+        return {row[0]: row[1] for row in self.connection().execute(
+            "SELECT status, COUNT(*) FROM jobs GROUP BY status")}
+
+    def purge_finished(self, older_than:float):
+        cutoff = time.time() - older_than
+        with self.connection() as connection:
+            connection.execute("DELETE FROM job_callbacks WHERE job_id IN "
+                               "(SELECT id FROM jobs WHERE status NOT IN (?, ?) AND finished_at < ?)",
+                               (*PENDING, cutoff))
+            connection.execute("DELETE FROM jobs WHERE status NOT IN (?, ?) AND finished_at < ?", (*PENDING, cutoff))
+
+
+def _build_store() -> JobStore | None:
+    if not config.JOB_DB_PATH:
+        return None
+    store = JobStore(config.JOB_DB_PATH)
+    store.purge_finished(config.JOB_RETENTION)
+    return store
+
+
+# Shared job queue; None when disabled.
+job_store = _build_store()
+
+# Set when a job is submitted in this process; workers also poll for jobs submitted by other processes.
+_submitted = asyncio.Event()
+
+
+def job_response(job:dict) -> dict:
+    progress = json.loads(job["progress"]) if job["progress"] else []
+    # Known once a worker has resolved the article's language versions.
+    languages = json.loads(job["languages"]) if job["languages"] else None
+    return {
+        "id": job["id"],
+        "status": job["status"],
+        "priority": job["priority"],
+        "article": job["title"],
+        "source_language_code": job["language"],
+        "mode": job["mode"],
+        "attempts": job["attempts"],
+        "created_at": job["created_at"],
+        "started_at": job["started_at"],
+        "finished_at": job["finished_at"],
+        "progress": {"completed": len(progress), "total": len(languages) if languages is not None else None,
+                     "scores_by_language": progress},
+        "result": json.loads(job["result"]) if job["result"] else None,
+        "error": job["error"],
+    }
+
+
+def check_callback_url(url:str):
+    """Raises ``ValueError`` for a callback URL that could reach internal services.
+
+    Hosts listed in ``JOB_CALLBACK_HOSTS`` are accepted as configured. With the list empty,
+    every address the host resolves to must be public (no loopback, private, link-local or
+    reserved ranges).
+    """
+    parsed = urlparse(url)
+    host = (parsed.hostname or "").lower()
+    if parsed.scheme not in ("http", "https") or not host:
+        raise ValueError("The callback URL must be an absolute http(s) URL.")
+    if config.JOB_CALLBACK_HOSTS:
+        if host not in config.JOB_CALLBACK_HOSTS:
+            raise ValueError(f"Callbacks to '{host}' are not allowed.")
+        return
+    try:
+        addresses = {info[4][0] for info in socket.getaddrinfo(host, parsed.port, proto=socket.IPPROTO_TCP)}
+    except (socket.gaierror, UnicodeError) as e:
+        raise ValueError(f"The callback host '{host}' cannot be resolved.") from e
+    for address in addresses:
+        ip = ipaddress.ip_address(address.split("%")[0])
+        ip = getattr(ip, "ipv4_mapped", None) or ip
+        if not ip.is_global:
+            raise ValueError(f"Callbacks to '{host}' are not allowed: it resolves to a non-public address.")
+
+
+# Callback deliveries and their retry sleeps run here, never on the shared analysis threads.
+_callback_executor = ThreadPoolExecutor(config.JOB_CALLBACK_THREADS, thread_name_prefix="job-callback")
+
+
+def _notify(job:dict):
+    """POSTs the finished job to its callback URLs, retrying a few times."""
+    body = json.dumps(job_response(job), ensure_ascii=False).encode("utf-8")
+    for url in job_store.callbacks(job["id"]):
+        try:
+            # Checked again on delivery: the host may resolve differently than when the job was submitted.
+            check_callback_url(url)
+        except ValueError as e:
+            metrics.ERRORS.inc(stage="job_callback")
+            logger.warning("Callback for job %s to %s refused: %s", job["id"], url, e)
+            continue
+        for attempt in range(3):
+            try:
+                response = requests.post(url, data=body, headers={"Content-Type": "application/json"},
+                                         timeout=(config.HTTP_CONNECT_TIMEOUT, config.HTTP_READ_TIMEOUT),
+                                         allow_redirects=False)
+                if response.status_code < 500:
+                    break
+            except requests.RequestException:
+                pass
+            time.sleep(2 ** attempt)
+        else:
+            metrics.ERRORS.inc(stage="job_callback")
+            logger.warning("Callback for job %s to %s failed", job["id"], url)
+
+
+async def _keep_leased(job_id:str, progress:list[dict], cancelled:asyncio.Event):
+    while True:
+        await asyncio.sleep(config.JOB_LEASE / 3)
+        if not await run_blocking(job_store.heartbeat, job_id, config.JOB_LEASE, progress):
+            cancelled.set()
+
+
+async def run_job(job:dict):
+    """Analyzes every language of the job's article, recording each language's score as it completes."""
+    progress:list[dict] = []
+    cancelled = asyncio.Event()
+    lease = asyncio.create_task(_keep_leased(job["id"], progress, cancelled))
+    try:
+        titles, page_infos, _ = await plan_languages(job["title"], job["language"])
+        await run_blocking(job_store.plan, job["id"], list(titles))
+        async for record in iter_language_scores(job["title"], job["language"], job["mode"], titles, page_infos):
+            progress.append(record)
+            if not await run_blocking(job_store.heartbeat, job["id"], config.JOB_LEASE, progress) \
+                    or cancelled.is_set():
+                return
+        result = {
+            "article": job["title"],
+            "source_language_code": job["language"],
+            "scores_by_language": rank_scores(progress)
+        }
+        await run_blocking(job_store.finish, job["id"], result)
+    except Overloaded as e:
+        await run_blocking(job_store.defer, job["id"], e.retry_after)
+        return
+    except Exception as e:
+        metrics.ERRORS.inc(stage="job")
+        await run_blocking(job_store.finish, job["id"], None, getattr(e, "detail", None) or str(e))
+    finally:
+        lease.cancel()
+        with suppress(asyncio.CancelledError):
+            await lease
+
+    finished = await run_blocking(job_store.get, job["id"])
+    if finished["status"] in ("done", "failed"):
+        _callback_executor.submit(_notify, finished)
+
+
+async def _worker(lanes:tuple[str, ...]):
+    while True:
+        try:
+            job = await run_blocking(job_store.claim, lanes, config.JOB_LEASE)
+        except Exception:
+            metrics.ERRORS.inc(stage="job")
+            logger.exception("Claiming a job failed")
+            job = None
+        if job is None:
+            _submitted.clear()
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(_submitted.wait(), config.JOB_POLL_INTERVAL)
+            continue
+        with metrics.timed("job", job["language"]):
+            await run_job(job)
+
+
+def start_workers() -> list[asyncio.Task]:
+    """Starts the job workers: interactive workers take only interactive jobs, so bulk work cannot
+    hold them; bulk workers prefer bulk jobs and help with interactive ones when there are none."""
+    return ([asyncio.create_task(_worker(("interactive",))) for _ in range(config.JOB_WORKERS)]
+            + [asyncio.create_task(_worker(("bulk", "interactive"))) for _ in range(config.JOB_BULK_WORKERS)])
+
+
+def _require_store() -> JobStore:
+    if job_store is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="The job queue is disabled.")
+    return job_store
+
+
+class JobRequest(BaseModel):
+    language: str = Field(min_length=1, pattern=LANGUAGE_CODE.pattern, title="Source language code")
+    title: str = Field(min_length=1, title="Article title in the source language")
+    mode: ScoreMode = Field("full", title="Scoring mode")
+    priority: Priority = Field("interactive", title="Queue lane")
+    callback_url: str | None = Field(None, pattern=r"^https?://", title="URL that receives the finished job (POST)")
+
+
+class BatchJobRequest(BaseModel):
+    articles: list[BatchArticle] = Field(min_length=1, title="Articles to score, one job each")
+    mode: ScoreMode = Field("full", title="Scoring mode")
+    priority: Priority = Field("bulk", title="Queue lane")
+    callback_url: str | None = Field(None, pattern=r"^https?://", title="URL that receives each finished job (POST)")
+
+
+async def _require_safe_callback(callback_url: str | None):
+    if callback_url is None:
+        return
+    try:
+        await run_blocking(check_callback_url, callback_url)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+def _submit_all(articles:list[tuple[str, str]], mode:str, priority:str, callback_url:str|None) -> list[dict]:
+    jobs = []
+    for language, title in articles:
+        job, reused = job_store.submit(language, title.replace(" ", "_"), mode, priority, callback_url)
+        jobs.append({**job_response(job), "deduplicated": reused})
+    return jobs
+
+
+@jobs_router.post("", status_code=status.HTTP_202_ACCEPTED)
+async def submit_job(request: JobRequest):
+    """
+    Queues a multi-language analysis and returns its job at once; poll ``GET /jobs/{id}`` or pass
+    ``callback_url``. An identical job that is still queued or running is returned instead of a new one.
+    """
+    _require_store()
+    await _require_safe_callback(request.callback_url)
+    jobs = await run_blocking(_submit_all, [(request.language, request.title)], request.mode, request.priority,
+                              request.callback_url)
+    _submitted.set()
+    return jobs[0]
+
+
+@jobs_router.post("/batch", status_code=status.HTTP_202_ACCEPTED)
+async def submit_batch_jobs(request: BatchJobRequest):
+    """
+    Queues one job per article, in the bulk lane by default.
+    """
+    _require_store()
+    if len(request.articles) > config.BATCH_MAX_ARTICLES:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"A batch may contain at most {config.BATCH_MAX_ARTICLES} articles.")
+    await _require_safe_callback(request.callback_url)
+    jobs = await run_blocking(_submit_all, [(article.language, article.title) for article in request.articles],
+                              request.mode, request.priority, request.callback_url)
+    _submitted.set()
+    return {"jobs": jobs}
+
+
+@jobs_router.get("", status_code=status.HTTP_200_OK)
+async def get_job_counts():
+    """
+    Number of jobs per status (queued, running, done, failed, cancelled).
+    """
+    store = _require_store()
+    return {"jobs": await run_blocking(store.counts)}
+
+
+@jobs_router.get("/{job_id}", status_code=status.HTTP_200_OK)
+async def get_job(request: Request, job_id: str = Path(min_length=1), fields: str | None = Query(None)):
+    """
+    Returns the job's status, the languages scored so far and, once done, the ranked result.
+    """
+    store = _require_store()
+    job = await run_blocking(store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Job '{job_id}' not found.")
+    return json_response(request, job_response(job), fields)
+
+
+@jobs_router.delete("/{job_id}", status_code=status.HTTP_200_OK)
+async def cancel_job(job_id: str = Path(min_length=1)):
+    """
+    Cancels a queued or running job; a running job stops after the language it is analyzing.
+    """
+    store = _require_store()
+    if not await run_blocking(store.cancel, job_id):
+        if await run_blocking(store.get, job_id) is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Job '{job_id}' not found.")
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Job '{job_id}' has already finished.")
+    return job_response(await run_blocking(store.get, job_id))
@@ -0,0 +1,142 @@
+import json
+import random
+import re
+import time
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import admission
+import config
+import metrics
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+# Wiki language codes ("en", "zh-min-nan"). They are substituted into the API host name,
+# so anything else could point upstream calls at another host.
+LANGUAGE_CODE = re.compile(r"^[a-z][a-z0-9-]{1,19}$")
+READ_CHUNK_SIZE = 64 * 1024
+
+
+class APIError(requests.RequestException):
+    """An error body from the action API (e.g. ``maxlag`` after the last retry) where data was required."""
+
+    def __init__(self, error:dict):
+        super().__init__(f"{error.get('code', 'error')}: {error.get('info', 'Unknown API error')}")
+        self.code = error.get("code")
+
+
+class ResponseTooLarge(ValueError):
+    """Raised while reading a capped response body once it grows past the allowed size."""
+
+
+def _build_session() -> requests.Session:
+    session = requests.Session()
+    # One keep-alive pool per wiki host, so repeated calls reuse their TLS connection.
+    adapter = HTTPAdapter(pool_connections=config.HTTP_POOL_HOSTS, pool_maxsize=config.HTTP_POOL_SIZE)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["User-Agent"] = config.USER_AGENT
+    return session
+
+
+_session = _build_session()
+
+
+def api_url(language:str) -> str:
+    if not LANGUAGE_CODE.fullmatch(language):
+        raise ValueError(f"Invalid language code: {language!r}")
+    return config.MEDIAWIKI_API_URL.format(language=language)
+
+
+def _retry_delay(attempt:int, retry_after:str|None) -> float:
+    """Full-jitter exponential backoff, never shorter than the server's Retry-After."""
+    delay = random.uniform(0, min(config.HTTP_BACKOFF_MAX, config.HTTP_BACKOFF_BASE * 2 ** attempt))
+    if retry_after:
+        try:
+            delay = max(delay, float(retry_after))
+        except ValueError:
+            pass
+    return min(delay, config.HTTP_BACKOFF_MAX)
+
+
+def get(url:str, params:dict|None=None, timeout=None, **kwargs) -> requests.Response:
+    """GET through the shared pooled session, retrying connection errors, 429 and 5xx responses.
+
+    Every attempt passes the host's admission control first, which raises
+    ``admission.Overloaded`` rather than queueing without bound.
+    """
+    timeout = timeout or (config.HTTP_CONNECT_TIMEOUT, config.HTTP_READ_TIMEOUT)
+    host = urlparse(url).netloc
+    host_gate = admission.gate(host)
+    attempt = 0
+    while True:
+        host_gate.acquire()
+        start = time.perf_counter()
+        try:
+            response = _session.get(url, params=params, timeout=timeout, **kwargs)
+        except (requests.ConnectionError, requests.Timeout):
+            host_gate.release(throttled=True)
+            metrics.UPSTREAM_REQUESTS.inc(host=host, status="error")
+            metrics.ERRORS.inc(stage="upstream")
+            if attempt >= config.HTTP_RETRIES:
+                raise
+            time.sleep(_retry_delay(attempt, None))
+        except BaseException:
+            host_gate.release()
+            raise
+        else:
+            elapsed = time.perf_counter() - start
+            host_gate.release(elapsed, throttled=response.status_code in RETRY_STATUS_CODES)
+            metrics.UPSTREAM_SECONDS.observe(elapsed, host=host)
+            metrics.UPSTREAM_REQUESTS.inc(host=host, status=str(response.status_code))
+            if not kwargs.get("stream"):
+                metrics.UPSTREAM_BYTES.observe(len(response.content), host=host)
+            if response.status_code not in RETRY_STATUS_CODES or attempt >= config.HTTP_RETRIES:
+                return response
+            # A streamed body is still unread; closing hands its connection back to the pool.
+            response.close()
+            time.sleep(_retry_delay(attempt, response.headers.get("Retry-After")))
+        attempt += 1
+
+
+def read_capped(response:requests.Response, max_bytes:int) -> bytes:
+    """The body of a streamed response, raising ``ResponseTooLarge`` as soon as it passes ``max_bytes``."""
+    with response:
+        if int(response.headers.get("Content-Length") or 0) > max_bytes:
+            raise ResponseTooLarge(f"Response exceeds {max_bytes} bytes")
+        body = bytearray()
+        for chunk in response.iter_content(READ_CHUNK_SIZE):
+            body += chunk
+            if len(body) > max_bytes:
+                raise ResponseTooLarge(f"Response exceeds {max_bytes} bytes")
+        return bytes(body)
+
+
+def api_get(language:str, params:dict, timeout=None, max_bytes:int=0) -> dict:
+    """Calls the MediaWiki action API of a wiki and returns the decoded JSON.
+
+    ``maxlag`` is sent with every request; lag errors are retried like 503s.
+    Raises ``requests.RequestException`` for HTTP failures and ``ValueError``
+    for undecodable bodies, or ``ResponseTooLarge`` past ``max_bytes`` (0: no limit).
+    """
+    params = {"format": "json", "maxlag": config.MEDIAWIKI_MAXLAG, **params}
+    url = api_url(language)
+    attempt = 0
+    while True:
+        response = get(url, params=params, timeout=timeout, stream=bool(max_bytes))
+        if max_bytes:
+            if not response.ok:
+                response.close()
+            response.raise_for_status()
+            data = json.loads(read_capped(response, max_bytes))
+        else:
+            response.raise_for_status()
+            data = response.json()
+        if data.get("error", {}).get("code") != "maxlag":
+            return data
+        admission.gate(urlparse(url).netloc).throttled()
+        if attempt >= config.HTTP_RETRIES:
+            return data
+        time.sleep(_retry_delay(attempt, response.headers.get("Retry-After")))
+        attempt += 1
@@ -0,0 +1,250 @@
+import contextvars
+import cProfile
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+import config
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (1024, 10 * 1024, 100 * 1024, 512 * 1024, 1024 ** 2, 5 * 1024 ** 2, 20 * 1024 ** 2)
+
+
+def _escape(value:str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names:tuple[str, ...], values:tuple, extra:str="") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name:str, documentation:str, labels:tuple[str, ...]=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._values:dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount:float=1, **labels):
+        key = tuple(labels.get(name, "") for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(tuple(labels.get(name, "") for name in self.labels), 0)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labels, key)} {value}")
+        return lines
+
+
+class Gauge:
+    def __init__(self, name:str, documentation:str, labels:tuple[str, ...]=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._values:dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def set(self, value:float, **labels):
+        key = tuple(labels.get(name, "") for name in self.labels)
+        with self._lock:
+            self._values[key] = value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} gauge"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labels, key)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name:str, documentation:str, labels:tuple[str, ...]=(), buckets=DURATION_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        # label values -> [bucket counts..., sum, count]
+        self._values:dict[tuple, list[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, amount:float, **labels):
+        key = tuple(labels.get(name, "") for name in self.labels)
+        with self._lock:
+            state = self._values.setdefault(key, [0] * (len(self.buckets) + 2))
+            for index, bound in enumerate(self.buckets):
+                if amount <= bound:
+                    state[index] += 1
+            state[-2] += amount
+            state[-1] += 1
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, state in sorted(self._values.items()):
+                for bound, count in zip(self.buckets, state):
+                    bucket_labels = _format_labels(self.labels, key, f'le="{bound}"')
+                    lines.append(f"{self.name}_bucket{bucket_labels} {count}")
+                bucket_labels = _format_labels(self.labels, key, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {state[-1]}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {state[-2]}")
+                lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {state[-1]}")
+        return lines
+
+
+STAGE_SECONDS = Histogram("wiki_analysis_stage_seconds", "Duration of analysis stages.", ("stage", "language"))
+UPSTREAM_REQUESTS = Counter("wiki_upstream_requests_total", "MediaWiki HTTP requests by host and status.",
+                            ("host", "status"))
+UPSTREAM_SECONDS = Histogram("wiki_upstream_request_seconds", "MediaWiki HTTP request latency.", ("host",))
+UPSTREAM_BYTES = Histogram("wiki_upstream_response_bytes", "MediaWiki HTTP response body sizes.", ("host",),
+                           buckets=SIZE_BUCKETS)
+CACHE_REQUESTS = Counter("wiki_cache_requests_total", "Cache lookups by cache and result.", ("cache", "result"))
+ERRORS = Counter("wiki_analysis_errors_total", "Failed analyses and upstream calls.", ("stage",))
+UPSTREAM_SHED = Counter("wiki_upstream_shed_total", "MediaWiki calls rejected by admission control.", ("host",))
+UPSTREAM_CONCURRENCY_LIMIT = Gauge("wiki_upstream_concurrency_limit", "Current adaptive concurrency limit per host.",
+                                   ("host",))
+
+REGISTRY = [STAGE_SECONDS, UPSTREAM_REQUESTS, UPSTREAM_SECONDS, UPSTREAM_BYTES, CACHE_REQUESTS, ERRORS,
+            UPSTREAM_SHED, UPSTREAM_CONCURRENCY_LIMIT]
+
+
+def render() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def record_cache(cache:str, hit:bool):
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+# --- Per-request Server-Timing ---
+
+class RequestTimings:
+    """Stage durations of one inbound request, summed across the threads that worked on it."""
+
+    def __init__(self):
+        self._durations:dict[str, list[float]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage:str, seconds:float):
+        with self._lock:
+            entry = self._durations.setdefault(stage, [0.0, 0])
+            entry[0] += seconds
+            entry[1] += 1
+
+    def header(self, total:float|None=None) -> str:
+        with self._lock:
+            entries = [f'{stage};dur={seconds * 1000:.1f};desc="{count}x"'
+                       for stage, (seconds, count) in self._durations.items()]
+        if total is not None:
+            entries.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(entries)
+
+
+_request_timings:contextvars.ContextVar[RequestTimings | None] = contextvars.ContextVar("request_timings",
+                                                                                          default=None)
+
+
+def start_request() -> RequestTimings:
+    timings = RequestTimings()
+    _request_timings.set(timings)
+    return timings
+
+
+def _language_label(language:str) -> str:
+    if not language:
+        return ""
+    return language if language in config.METRICS_LANGUAGES else "other"
+
+
+@contextmanager
+def timed(stage:str, language:str=""):
+    """Records the duration of a stage in the histogram and in the current request's Server-Timing."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(elapsed, stage=stage, language=_language_label(language))
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.add(stage, elapsed)
+
+
+# --- Opt-in profiling ---
+
+class RequestProfile:
+    """cProfile data of one request, collected from the event loop and every worker thread."""
+
+    def __init__(self):
+        self.profiles:list[cProfile.Profile] = []
+        self._lock = threading.Lock()
+
+    def add(self, profile:cProfile.Profile):
+        with self._lock:
+            self.profiles.append(profile)
+
+    def dump(self, name:str) -> str | None:
+        if not self.profiles:
+            return None
+        os.makedirs(config.PROFILE_DIR, exist_ok=True)
+        path = os.path.join(config.PROFILE_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{name}.prof")
+        with self._lock:
+            stats = pstats.Stats(*self.profiles)
+        stats.dump_stats(path)
+        return path
+
+
+_request_profile:contextvars.ContextVar[RequestProfile | None] = contextvars.ContextVar("request_profile",
+                                                                                          default=None)
+
+
+def start_profile() -> RequestProfile:
+    profile = RequestProfile()
+    _request_profile.set(profile)
+    return profile
+
+
+@contextmanager
+def profiled():
+    """Profiles the enclosed block on the current thread if the current request asked for a profile."""
+    request_profile = _request_profile.get()
+    if request_profile is None:
+        yield
+        return
+    profile = cProfile.Profile()
+    try:
+        profile.enable()
+    except ValueError:
+        # Another profiler is already active (e.g. a concurrent profiled request); skip this block.
+        yield
+        return
+    try:
+        yield
+    finally:
+        profile.disable()
+        request_profile.add(profile)
+
+
+metrics_router = APIRouter(tags=["Monitoring"])
+
+
+@metrics_router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus text exposition of the analysis, upstream and cache metrics."""
+    return PlainTextResponse(render(), media_type="text/plain; version=0.0.4")
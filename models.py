@@ -0,0 +1,37 @@
+from typing import Any
+
+from pydantic import BaseModel, Field
+
+
+class WikipediaTable(BaseModel):
+    table_id:str = Field(description="Identifier of the table within the article, e.g. table_1")
+    headers:list[str] = Field(description="One name per column; multi-row headers are joined with ' / '")
+    rows:list[list[str]] = Field(description="Body rows with rowspan and colspan expanded")
+    caption:str | None = Field(default=None, description="Table caption, if any")
+
+
+class TableExtractionRequest(BaseModel):
+    page_title:str = Field(min_length=1, description="Article title")
+    language:str = Field(default="en", min_length=1, description="Language code (en) or name (english)")
+
+
+class TableExtractionResponse(BaseModel):
+    article_title:str = Field(description="Requested article title")
+    language:str = Field(description="Requested language")
+    number_of_tables:int = Field(gt=-1, description="Number of data tables found")
+    tables:list[WikipediaTable] = Field(description="Extracted tables")
+    table_details:dict[str, str] = Field(description="Row and column counts per table number")
+
+
+class WikipediaCitation(BaseModel):
+    text:str = Field(description="Citation text")
+    url:str | None = Field(default=None, description="Cited URL, if any")
+
+
+class WikipediaHeader(BaseModel):
+    level:int = Field(ge=1, le=6, description="Heading level (1-6)")
+    text:str = Field(description="Heading text")
+
+
+class WikipediaInfoBox(BaseModel):
+    fields:dict[str, Any] = Field(description="Infobox attributes and their values")
@@ -1,9 +1,32 @@
-from fastapi import APIRouter, HTTPException, Path
-from utility import get_translation
+import functools
+import json
+import logging
+import math
+import time
+from typing import Literal
+
+from fastapi import APIRouter, HTTPException, Path, Query, Request
+from fastapi.responses import StreamingResponse
+from requests import RequestException
+from admission import Overloaded, Unavailable
+from mediawiki import LANGUAGE_CODE
+from utility import get_langlinks, get_langlinks_batch, get_page_info, get_page_info_batch, get_translations
 from starlette import status
-import table, infoBox, header, citation, images
+import table, infobox, header, citation, images
+from article import get_article
+from cache import article_cache, revision_key
+from concurrency import bounded_as_completed, bounded_gather, run_blocking
+import config
+from fast_score import get_score_counts
+import metrics
+from responses import json_response
+from score_index import score_index
+from scoring import score_from_counts
+from singleflight import AsyncSingleFlight
 from pydantic import BaseModel, Field
 
+logger = logging.getLogger(__name__)
+
 operations_router = APIRouter(
     prefix="/operations",
     tags=["Analysis"],
@@ -18,6 +41,15 @@ LANGUAGES = {
     "ar": "Arabic (العربية)"
 }
 
+# Default languages of a multi-language analysis; ``languages=all`` uses every linked language edition.
+DEFAULT_LANGUAGES = tuple(LANGUAGES)
+
+# "full" runs every analyzer on the rendered HTML; "fast" scores from wikitext and parse metadata only.
+ScoreMode = Literal["full", "fast"]
+
+_analyses = AsyncSingleFlight()
+
+
 class FinalResponse(BaseModel):
     title:str = Field(title="Final Page Title")
     table_analysis:table.TableResponse = Field(title="Table Analysis")
@@ -25,135 +57,493 @@ class FinalResponse(BaseModel):
     info_box:infobox.InfoBoxResponse = Field(title="InfoBox Analysis")
     citations:citation.CitationResponse = Field(title="Citation Analysis")
     total_images:int = Field(title="Total images/Media Files")
+    revision_id:int | None = Field(None, title="Analyzed Revision")
+
+
+def score_components(article_response: FinalResponse) -> dict[str, int]:
+    """The structural counts that feed the quality score."""
+    return {
+        "citations": article_response.citations.total_citations,
+        "tables": article_response.table_analysis.number_of_tables,
+        "infobox_attributes": article_response.info_box.total_attributes,
+        "headers": article_response.header_analysis.total_count,
+        "images": article_response.total_images,
+    }
 
 
 def calculate_single_score(article_response: FinalResponse) -> float:
     """Calculates the combined quality score for a single article's response object."""
-    total_tables = article_response.table_analysis.number_of_tables
-    total_infobox_attrs = article_response.info_box.total_attributes
-    total_citations = article_response.citations.total_citations
-    total_headers = article_response.header_analysis.total_count
-    total_images = article_response.total_images
+    return score_from_counts(**score_components(article_response))
 
-    # Structural scoring formula:
-    score = ((0.5 * total_citations) + (0.3 * total_tables) +
-             (0.10 * total_infobox_attrs) + (0.05 * total_headers) + (0.05 * total_images))
-    return score
+
+def _page_info(title: str, language: str) -> dict:
+    """``get_page_info`` with upstream failures reported as 503, like failed article fetches."""
+    try:
+        return get_page_info(title, language)
+    except (RequestException, ValueError, Unavailable) as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
 
 
 # --- Helper Function 2: Single Article Analysis ---
-def analyze_single_article(title: str, language: str) -> FinalResponse:
-    """Performs all structural analyses (table, header, infobox, citation) for a single article."""
+def analyze_single_article(title: str, language: str, page_info: dict | None = None) -> FinalResponse:
+    """Performs all structural analyses (table, header, infobox, citation) for a single article.
+
+    ``page_info`` is the article's ``prop=info`` record when the caller already fetched it in a batch.
+    """
 
     try:
-        # Perform all analysis calls
-        table_analysis = table.analyze_tables(title, language)
-        header_counter = header.count_html_headers(title, language)
-        infobox_analysis = infobox.analyze_infobox(title, language)
-        citation_analysis = citation.extract_citation_from_wikitext(title, language)
-        image_count = images.get_image_count(title, language)
-
-        return FinalResponse(
+        revision_id = None
+        if page_info is None and article_cache is not None:
+            page_info = _page_info(title, language)
+        if page_info is not None:
+            # Cheap freshness check: a cached result is valid as long as the latest revision matches.
+            if "missing" in page_info or "invalid" in page_info:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                                    detail=f"Page '{title}' not found in {language} Wikipedia.")
+            revision_id = page_info.get("lastrevid")
+            if revision_id is not None and article_cache is not None:
+                cached = article_cache.get(revision_key("result", language, title, revision_id))
+                metrics.record_cache("result", cached is not None)
+                if cached is not None:
+                    response = FinalResponse.model_validate_json(cached)
+                    response.revision_id = revision_id
+                    return response
+
+        # Fetch the article once and share the parsed document across all analyzers
+        document = get_article(title, language, revision_id,
+                               page_info.get("length") if page_info is not None else None)
+
+        table_analysis = table.analyze_tables(title, language, document)
+        header_counter = header.count_html_headers(title, language, document)
+        infobox_analysis = infobox.analyze_infobox(title, language, document)
+        citation_analysis = citation.extract_citation_from_wikitext(title, language, document)
+        image_count = images.get_image_count(title, language, document)
+
+        response = FinalResponse(
             title=title,
             table_analysis=table_analysis,
             header_analysis=header_counter,
             info_box=infobox_analysis,
             citations=citation_analysis,
-            total_images=image_count
+            total_images=image_count,
+            revision_id=document.revision_id
         )
+        if article_cache is not None and document.revision_id is not None:
+            article_cache.set(revision_key("result", language, title, document.revision_id),
+                              response.model_dump_json())
+        return response
 
-    except HTTPException as e:
+    except (HTTPException, Overloaded) as e:
         raise e
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                             detail=f"Structural analysis error for {title} ({language}): {str(e)}")
 
 
-# --- Main API Endpoint (Modified) ---
+def score_article(title: str, language: str, page_info: dict | None = None,
+                  mode: ScoreMode = "full") -> tuple[float, int | None]:
+    """Scores one article and returns the score with the scored revision id (None when unknown).
 
-# REMOVED the redundant '{language}' path parameter
-@operations_router.get("/{source_language}/{title}", status_code=status.HTTP_200_OK)
-async def get_results(title: str, source_language: str = Path(min_length=1)):
-    """
-    Analyzes the structural quality score for the given article across all 6 supported languages.
+    Answers from the score index when it already holds the current revision.
+
+    Fast mode never downloads the rendered HTML; its scores bypass the index, which only holds full analyses.
     """
 
-    all_scores = []
-    normalized_title = title.replace(" ", "_")
-    target_languages = list(LANGUAGES.keys())
+    if mode == "fast":
+        if page_info is None and article_cache is not None:
+            page_info = _page_info(title, language)
+        revision_id = page_info.get("lastrevid") if page_info is not None else None
+        return score_from_counts(**get_score_counts(title, language, revision_id)), revision_id
+
+    if score_index is None:
+        response = analyze_single_article(title, language, page_info)
+        return calculate_single_score(response), response.revision_id
+
+    indexed_title = title.replace(" ", "_")
+    if page_info is None:
+        page_info = _page_info(title, language)
+    revision_id = page_info.get("lastrevid")
+    indexed = score_index.get(language, indexed_title)
+    is_current = indexed is not None and revision_id is not None and indexed["revision_id"] == revision_id
+    metrics.record_cache("score_index", is_current)
+    if is_current:
+        return indexed["score"], revision_id
+
+    response = analyze_single_article(title, language, page_info)
+    counts = score_components(response)
+    score = score_from_counts(**counts)
+    revision_id = response.revision_id or revision_id
+    if revision_id is not None:
+        score_index.put(language, indexed_title, revision_id, score, counts)
+    return score, revision_id
+
+
+# --- Helper Function 3: Per-Language Scoring ---
+def score_language(lang_code: str, source_language: str, current_title: str | None,
+                   page_info: dict | None = None, mode: ScoreMode = "full") -> dict:
+    """Analyzes the already-resolved article title in one language and returns its score record."""
+
+    # 2. Check for Translation Success
+    if not current_title:
+        return {
+            "lang_code": lang_code,
+            "lang_name": LANGUAGES.get(lang_code, lang_code),
+            "title": None,
+            "score": -1,  # -1 indicates the article could not be found/translated
+            "is_user_language": lang_code == source_language,
+            "is_authority_article": False,
+            "error": "Translation or article not available."
+        }
+
+    try:
+        # 3. Analyze and Score
+        with metrics.timed("analysis", lang_code):
+            score, revision_id = score_article(current_title, lang_code, page_info, mode)
+
+        # 4. Store Result
+        return {
+            "lang_code": lang_code,
+            "lang_name": LANGUAGES.get(lang_code, lang_code),
+            "title": current_title,
+            "score": round(score, 3),
+            "revision_id": revision_id,
+            "is_user_language": lang_code == source_language,
+            "is_authority_article": False
+        }
+
+    except Overloaded:
+        # Shedding load: fail the whole request with 503 instead of returning a -1 score.
+        raise
+    except HTTPException as e:
+        # Handle analysis errors (e.g., 404 from a downstream function)
+        metrics.ERRORS.inc(stage="analysis")
+        return {
+            "lang_code": lang_code,
+            "lang_name": LANGUAGES.get(lang_code, lang_code),
+            "title": current_title,
+            "score": -1,
+            "is_user_language": lang_code == source_language,
+            "is_authority_article": False,
+            "error": e.detail
+        }
+    except Exception as e:
+        # Handle unexpected errors
+        metrics.ERRORS.inc(stage="analysis")
+        return {
+            "lang_code": lang_code,
+            "lang_name": LANGUAGES.get(lang_code, lang_code),
+            "title": current_title,
+            "score": -1,
+            "is_user_language": lang_code == source_language,
+            "is_authority_article": False,
+            "error": f"Internal Error during analysis: {str(e)}"
+        }
+
+
+def rank_scores(all_scores: list[dict]) -> list[dict]:
+    """Marks the highest scoring article(s) as authority and sorts the records by score."""
 
-    for lang_code in target_languages:
-        current_title = ""
-
-        # 1. Determine Title (Source vs. Translation)
-        if lang_code == source_language:
-            # For the user's source language, use the original title
-            current_title = normalized_title
-        else:
-            # For all other languages, attempt translation
-            current_title = get_translation(normalized_title, source_language, lang_code)
-
-        # 2. Check for Translation Success
-        if not current_title:
-            all_scores.append({
-                "lang_code": lang_code,
-                "lang_name": LANGUAGES[lang_code],
-                "title": None,
-                "score": -1,  # -1 indicates the article could not be found/translated
-                "is_user_language": lang_code == source_language,
-                "is_authority_article": False,
-                "error": "Translation or article not available."
-            })
-            continue
-
-        try:
-            # 3. Analyze and Score
-            article_response = analyze_single_article(current_title, lang_code)
-            score = calculate_single_score(article_response)
-
-            # 4. Store Result
-            all_scores.append({
-                "lang_code": lang_code,
-                "lang_name": LANGUAGES[lang_code],
-                "title": current_title,
-                "score": round(score, 3),
-                "is_user_language": lang_code == source_language,
-                "is_authority_article": False
-            })
-
-        except HTTPException as e:
-            # Handle analysis errors (e.g., 404 from a downstream function)
-            all_scores.append({
-                "lang_code": lang_code,
-                "lang_name": LANGUAGES[lang_code],
-                "title": current_title,
-                "score": -1,
-                "is_user_language": lang_code == source_language,
-                "is_authority_article": False,
-                "error": e.detail
-            })
-        except Exception as e:
-            # Handle unexpected errors
-            all_scores.append({
-                "lang_code": lang_code,
-                "lang_name": LANGUAGES[lang_code],
-                "title": current_title,
-                "score": -1,
-                "is_user_language": lang_code == source_language,
-                "is_authority_article": False,
-                "error": f"Internal Error during analysis: {str(e)}"
-            })
     valid_scores = [d['score'] for d in all_scores if d.get('score', -1) >= 0]
     max_score = max(valid_scores) if valid_scores else -float('inf')
 
     for item in all_scores:
         is_authority = (item.get('score', -1) >= 0) and (item.get('score') == max_score)
         item['is_authority_article'] = is_authority
-    sorted_scores = sorted(all_scores, key=lambda x: x.get('score', -float('inf')), reverse=True)
+    return sorted(all_scores, key=lambda x: x.get('score', -float('inf')), reverse=True)
+
+
+def parse_languages(value: str | None) -> tuple[str, ...] | Literal["all"]:
+    """The ``languages`` query parameter: empty for the six defaults, ``all``, or comma-separated codes."""
+    if not value:
+        return DEFAULT_LANGUAGES
+    if value == "all":
+        return "all"
+    languages = tuple(dict.fromkeys(code.strip().lower() for code in value.split(",") if code.strip()))
+    invalid = [code for code in languages if not LANGUAGE_CODE.match(code)]
+    if invalid or not languages:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"Invalid language codes: {', '.join(invalid) or value}")
+    if len(languages) > config.MAX_LANGUAGES:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"At most {config.MAX_LANGUAGES} languages may be requested.")
+    return languages
+
+
+# --- Main API Endpoint (Modified) ---
+
+# REMOVED the redundant '{language}' path parameter
+@operations_router.get("/{source_language}/{title}", status_code=status.HTTP_200_OK)
+async def get_results(request: Request, title: str,
+                      source_language: str = Path(min_length=1, pattern=LANGUAGE_CODE.pattern),
+                      mode: ScoreMode = Query("full"), fields: str | None = Query(None),
+                      languages: str | None = Query(None), top_k: int | None = Query(None, ge=1)):
+    """
+    Analyzes the structural quality score for the given article across the 6 supported languages by default.
+    ``mode=fast`` ranks from wikitext and parse metadata without downloading rendered HTML.
+    ``fields`` selects parts of the response, e.g. ``scores_by_language.lang_code,scores_by_language.score``.
+    ``languages=all`` covers every language edition of the article, ``languages=en,de,ja`` a chosen set;
+    ``top_k`` fully analyzes only the k longest versions (and the source language).
+    """
+
+    results = await analyze_article(title, source_language, mode, parse_languages(languages), top_k)
+    return json_response(request, results, fields)
+
+
+async def analyze_article(title: str, source_language: str, mode: ScoreMode = "full",
+                          languages: tuple[str, ...] | Literal["all"] = DEFAULT_LANGUAGES,
+                          top_k: int | None = None) -> dict:
+    """Scores and ranks the article in every requested language (the body of ``get_results``)."""
+    # Identical concurrent requests wait on one shared analysis instead of repeating the fan-out.
+    return await _analyses.do((source_language, title.replace(" ", "_"), mode, languages, top_k),
+                              functools.partial(_analyze_all_languages, title, source_language, mode,
+                                                languages, top_k))
+
+
+async def _prewarm_article(language: str, title: str) -> bool:
+    try:
+        await analyze_article(title, language)
+        return True
+    except Exception:
+        metrics.ERRORS.inc(stage="prewarm")
+        return False
+
+
+async def prewarm(articles: list[tuple[str, str]]) -> int:
+    """Analyzes popular (language, title) pairs in every language, filling the caches and the score index.
+
+    Returns the number of articles warmed; failures are counted and skipped.
+    """
+    start = time.perf_counter()
+    warmed = sum(await bounded_gather(
+        [functools.partial(_prewarm_article, language, title) for language, title in articles],
+        limit=config.BATCH_CONCURRENCY
+    ))
+    logger.info("Prewarmed %d of %d articles in %.1fs", warmed, len(articles), time.perf_counter() - start)
+    return warmed
+
+
+def resolve_titles(normalized_title: str, source_language: str,
+                   languages: tuple[str, ...] | Literal["all"]) -> dict[str, str]:
+    """Title of the article in each requested language, from one langlinks lookup."""
+    if languages == "all":
+        # Codes end up in the API host name, so only well-formed ones are followed.
+        links = {code: title for code, title in get_langlinks(normalized_title, source_language).items()
+                 if LANGUAGE_CODE.fullmatch(code)}
+        return {source_language: normalized_title, **links}
+    return get_translations(normalized_title, source_language, list(languages))
+
+
+async def prerank_languages(titles: dict[str, str], source_language: str,
+                            top_k: int) -> tuple[dict[str, str], dict[str, dict], list[dict]]:
+    """Keeps the ``top_k`` longest language versions, plus the source language, for full analysis.
+
+    Costs one ``prop=info`` query per wiki and no article downloads. Citations, tables, sections
+    and images all add bytes, so the highest scoring version is almost always among the longest.
+    Returns the kept titles, their ``prop=info`` records (reused by the analysis) and the rest.
+    """
+    languages = list(titles)
+    infos = await bounded_gather(
+        [functools.partial(run_blocking, _batch_page_info, [titles[code]], code) for code in languages],
+        limit=config.LANGUAGE_INFO_CONCURRENCY
+    )
+    page_infos = {code: info[titles[code]] for code, info in zip(languages, infos) if titles[code] in info}
+
+    def length(code: str) -> int:
+        info = page_infos.get(code)
+        if info is None:
+            return 0
+        return -1 if "missing" in info or "invalid" in info else info.get("length", 0)
+
+    ranked = sorted(languages, key=length, reverse=True)
+    kept = ranked[:top_k] + ([source_language] if source_language in ranked[top_k:] else [])
+    skipped = [{"lang_code": code, "title": titles[code], "length": max(0, length(code))}
+               for code in ranked if code not in kept]
+    return {code: titles[code] for code in kept}, page_infos, skipped
+
+
+async def plan_languages(title: str, source_language: str,
+                         languages: tuple[str, ...] | Literal["all"] = DEFAULT_LANGUAGES,
+                         top_k: int | None = None) -> tuple[dict[str, str], dict[str, dict], list[dict] | None]:
+    """Titles to analyze per language, their ``prop=info`` records and the languages pre-ranked out (if any)."""
+    # One langlinks lookup resolves every target language
+    titles = await run_blocking(resolve_titles, title.replace(" ", "_"), source_language, languages)
+    if top_k is None or len(titles) <= top_k:
+        return titles, {}, None
+    return await prerank_languages(titles, source_language, top_k)
+
+
+async def _analyze_all_languages(title: str, source_language: str, mode: ScoreMode = "full",
+                                 languages: tuple[str, ...] | Literal["all"] = DEFAULT_LANGUAGES,
+                                 top_k: int | None = None) -> dict:
+    # 1. Determine Titles
+    titles, page_infos, skipped = await plan_languages(title, source_language, languages, top_k)
+
+    # Languages are analyzed concurrently on the shared pool; the event loop stays free.
+    all_scores = await bounded_gather(
+        [functools.partial(run_blocking, score_language, lang_code, source_language, current_title,
+                           page_infos.get(lang_code), mode)
+         for lang_code, current_title in titles.items()],
+        limit=config.MAX_CONCURRENT_LANGUAGES
+    )
+    sorted_scores = rank_scores(list(all_scores))
 
     # 5. Return the combined results
-    return {
+    results = {
+        "article": title,
+        "source_language_code": source_language,
+        "scores_by_language": sorted_scores
+    }
+    if skipped is not None:
+        results["not_analyzed"] = skipped
+    return results
+
+
+# --- Streaming API Endpoint ---
+
+def _format_event(event: str, data: dict, stream_format: str) -> str:
+    payload = json.dumps(data, ensure_ascii=False)
+    if stream_format == "sse":
+        return f"event: {event}\ndata: {payload}\n\n"
+    return json.dumps({"event": event, "data": data}, ensure_ascii=False) + "\n"
+
+
+async def iter_language_scores(title: str, source_language: str, mode: ScoreMode = "full",
+                               titles: dict[str, str] | None = None, page_infos: dict[str, dict] | None = None):
+    """Yields the score record of each language as soon as it is computed (unranked).
+
+    ``titles`` (and their ``page_infos``) come from ``plan_languages``; by default the supported languages.
+    """
+    if titles is None:
+        titles, page_infos, _ = await plan_languages(title, source_language)
+    page_infos = page_infos or {}
+    async for record in bounded_as_completed(
+            [functools.partial(run_blocking, score_language, lang_code, source_language, current_title,
+                               page_infos.get(lang_code), mode)
+             for lang_code, current_title in titles.items()],
+            limit=config.MAX_CONCURRENT_LANGUAGES):
+        yield record
+
+
+async def _stream_scores(title: str, source_language: str, stream_format: str, mode: ScoreMode = "full",
+                         languages: tuple[str, ...] | Literal["all"] = DEFAULT_LANGUAGES, top_k: int | None = None):
+    all_scores = []
+    try:
+        titles, page_infos, skipped = await plan_languages(title, source_language, languages, top_k)
+        async for record in iter_language_scores(title, source_language, mode, titles, page_infos):
+            all_scores.append(record)
+            yield _format_event("score", record, stream_format)
+    except Overloaded as e:
+        # The status line is already sent, so shedding is reported in-band.
+        yield _format_event("error", {"detail": str(e), "retry_after": math.ceil(e.retry_after)}, stream_format)
+        return
+
+    sorted_scores = rank_scores(all_scores)
+    authority = next((item for item in sorted_scores if item["is_authority_article"]), None)
+    summary = {
         "article": title,
         "source_language_code": source_language,
+        "authority_article": authority,
         "scores_by_language": sorted_scores
     }
+    if skipped is not None:
+        summary["not_analyzed"] = skipped
+    yield _format_event("summary", summary, stream_format)
+
+
+@operations_router.get("/{source_language}/{title}/stream", status_code=status.HTTP_200_OK)
+async def stream_results(title: str, source_language: str = Path(min_length=1, pattern=LANGUAGE_CODE.pattern),
+                         format: Literal["ndjson", "sse"] = Query("ndjson"), mode: ScoreMode = Query("full"),
+                         languages: str | None = Query(None), top_k: int | None = Query(None, ge=1)):
+    """
+    Streams each language's score record as soon as it is ready, followed by a summary with the ranking.
+    """
+
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    stream = _stream_scores(title, source_language, format, mode, parse_languages(languages), top_k)
+    return StreamingResponse(stream, media_type=media_type,
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+# --- Batch Scoring ---
+
+class BatchArticle(BaseModel):
+    language: str = Field(min_length=1, pattern=LANGUAGE_CODE.pattern, title="Source language code")
+    title: str = Field(min_length=1, title="Article title in the source language")
+
+
+class BatchRequest(BaseModel):
+    articles: list[BatchArticle] = Field(min_length=1, title="Articles to score")
+    mode: ScoreMode = Field("full", title="Scoring mode")
+
+
+def _resolve_batch_titles(articles: list[BatchArticle], target_languages: list[str]) -> list[dict[str, str]]:
+    """Resolves every article in every target language with multi-title langlinks queries per source wiki."""
+
+    titles_by_source: dict[str, list[str]] = {}
+    for article in articles:
+        titles_by_source.setdefault(article.language, []).append(article.title.replace(" ", "_"))
+    links_by_source = {source_language: get_langlinks_batch(titles, source_language)
+                       for source_language, titles in titles_by_source.items()}
+
+    resolved = []
+    for article in articles:
+        normalized_title = article.title.replace(" ", "_")
+        links = links_by_source[article.language][normalized_title]
+        resolved.append({
+            lang_code: normalized_title if lang_code == article.language else links.get(lang_code, normalized_title)
+            for lang_code in target_languages
+        })
+    return resolved
+
+
+def _batch_page_info(titles: list[str], language: str) -> dict[str, dict]:
+    """Batched prop=info lookup; on failure each article falls back to its own lookup."""
+    try:
+        return get_page_info_batch(titles, language)
+    except Unavailable:
+        return {}
+    except Overloaded:
+        raise
+    except Exception:
+        return {}
+
+
+@operations_router.post("/batch", status_code=status.HTTP_200_OK)
+async def get_batch_results(http_request: Request, request: BatchRequest, fields: str | None = Query(None)):
+    """
+    Scores many articles in one call; each entry has the same shape as the single-article endpoint.
+    ``fields`` applies to the response, e.g. ``results.article,results.scores_by_language.score``.
+    """
+
+    if len(request.articles) > config.BATCH_MAX_ARTICLES:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"A batch may contain at most {config.BATCH_MAX_ARTICLES} articles.")
+
+    target_languages = list(LANGUAGES.keys())
+    resolved_titles = await run_blocking(_resolve_batch_titles, request.articles, target_languages)
+
+    # One batched prop=info lookup per wiki gives every article's revision for the cache check.
+    page_infos = dict(zip(target_languages, await bounded_gather(
+        [functools.partial(run_blocking, _batch_page_info,
+                           [titles[lang_code] for titles in resolved_titles], lang_code)
+         for lang_code in target_languages],
+        limit=config.BATCH_CONCURRENCY
+    )))
+
+    calls = [
+        functools.partial(run_blocking, score_language, lang_code, article.language,
+                          titles[lang_code], page_infos[lang_code].get(titles[lang_code]), request.mode)
+        for article, titles in zip(request.articles, resolved_titles)
+        for lang_code in target_languages
+    ]
+    all_scores = await bounded_gather(calls, limit=config.BATCH_CONCURRENCY)
+
+    results = []
+    for index, article in enumerate(request.articles):
+        article_scores = list(all_scores[index * len(target_languages):(index + 1) * len(target_languages)])
+        results.append({
+            "article": article.title,
+            "source_language_code": article.language,
+            "scores_by_language": rank_scores(article_scores)
+        })
+    return json_response(http_request, {"results": results}, fields)
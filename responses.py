@@ -0,0 +1,189 @@
+import hashlib
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Any
+
+import orjson
+from fastapi import HTTPException, Request
+from starlette import status
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.responses import JSONResponse, Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+import config
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON rendered with orjson: compact, and several times faster than the standard encoder."""
+
+    def render(self, content:Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
+def _field_tree(fields:str) -> dict:
+    """``"a,b.c,b.d"`` -> ``{"a": None, "b": {"c": None, "d": None}}``; None selects the whole value."""
+    tree:dict = {}
+    for path in fields.split(","):
+        names = [name.strip() for name in path.split(".")]
+        if not all(names):
+            continue
+        node = tree
+        for name in names[:-1]:
+            node = node.setdefault(name, {})
+            if node is None:
+                break  # a shorter path already selects the whole sub-document
+        else:
+            node[names[-1]] = None
+    return tree
+
+
+def _select(data:Any, tree:dict) -> Any:
+    if isinstance(data, list):
+        return [_select(item, tree) for item in data]
+    if not isinstance(data, dict):
+        return data
+    return {key: value if tree[key] is None else _select(value, tree[key])
+            for key, value in data.items() if key in tree}
+
+
+def select_fields(data:Any, fields:str|None) -> Any:
+    """Keeps only the comma-separated dotted ``fields`` of ``data``; lists apply the selection to each item.
+
+    ``"article,scores_by_language.lang_code,scores_by_language.score"`` keeps the article and two keys
+    of every score record. Returns new containers, so shared (single-flight or cached) results are never modified.
+    """
+    if not fields:
+        return data
+    tree = _field_tree(fields)
+    if not tree:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No fields selected.")
+    return _select(data, tree)
+
+
+def _etag_matches(if_none_match:str, etag:str) -> bool:
+    # Weak comparison (RFC 9110): compressed and identity representations share one validator.
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag.removeprefix("W/") in candidates
+
+
+def _not_modified_since(if_modified_since:str, last_modified:float) -> bool:
+    try:
+        return int(last_modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+    except (TypeError, ValueError):
+        return False
+
+
+def json_response(request:Request, content:Any, fields:str|None=None, last_modified:float|None=None) -> Response:
+    """Serializes ``content`` once with orjson and answers conditional requests.
+
+    The ``ETag`` is a digest of the body, which carries the revision ids of the analyzed articles,
+    so it changes exactly when an article is edited or a score changes; ``If-None-Match`` (or
+    ``If-Modified-Since`` when ``last_modified`` is known) that still matches gets an empty 304.
+    """
+    body = orjson.dumps(select_fields(content, fields), option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    headers = {
+        "ETag": 'W/"%s"' % hashlib.blake2b(body, digest_size=16).hexdigest(),
+        "Cache-Control": f"public, max-age={config.RESPONSE_MAX_AGE}" if config.RESPONSE_MAX_AGE > 0 else "no-cache",
+    }
+    if last_modified is not None:
+        headers["Last-Modified"] = formatdate(last_modified, usegmt=True)
+
+    if_none_match = request.headers.get("if-none-match")
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_none_match is not None:
+        not_modified = _etag_matches(if_none_match, headers["ETag"])
+    else:
+        not_modified = last_modified is not None and if_modified_since is not None \
+            and _not_modified_since(if_modified_since, last_modified)
+    if not_modified:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+
+def _accepts(accept_encoding:str, coding:str) -> bool:
+    for entry in accept_encoding.lower().split(","):
+        name, _, parameters = entry.partition(";")
+        if name.strip() == coding:
+            quality = parameters.strip().removeprefix("q=")
+            try:
+                return not parameters.strip() or float(quality) > 0
+            except ValueError:
+                return True
+    return False
+
+
+class _BrotliResponder:
+    """Brotli-encodes one response; streamed bodies are flushed chunk by chunk so events are not held back."""
+
+    def __init__(self, app:ASGIApp, minimum_size:int, quality:int):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.compressor = brotli.Compressor(quality=quality)
+        self.send:Send | None = None
+        self.start:Message | None = None
+        self.passthrough = False
+
+    async def __call__(self, scope:Scope, receive:Receive, send:Send):
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    async def send_compressed(self, message:Message):
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            self.passthrough = "content-encoding" in headers \
+                or headers.get("content-type", "").startswith("text/event-stream")
+            if self.passthrough:
+                await self.send(message)
+            else:
+                self.start = message
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.start is not None:
+            start, self.start = self.start, None
+            headers = MutableHeaders(raw=start["headers"])
+            headers.add_vary_header("Accept-Encoding")
+            if len(body) < self.minimum_size and not more_body:
+                self.passthrough = True
+                await self.send(start)
+                await self.send(message)
+                return
+            headers["Content-Encoding"] = "br"
+            if "content-length" in headers:
+                del headers["Content-Length"]
+            body = self._compress(body, more_body)
+            if not more_body:
+                headers["Content-Length"] = str(len(body))
+            await self.send(start)
+        else:
+            body = self._compress(body, more_body)
+        await self.send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+    def _compress(self, body:bytes, more_body:bool) -> bytes:
+        return self.compressor.process(body) + (self.compressor.flush() if more_body else self.compressor.finish())
+
+
+class CompressionMiddleware:
+    """Brotli for clients that accept it (when the ``brotli`` package is installed), gzip otherwise."""
+
+    def __init__(self, app:ASGIApp, minimum_size:int=1000, gzip_level:int=6, brotli_quality:int=5):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.brotli_quality = brotli_quality
+        self.gzip = GZipMiddleware(app, minimum_size=minimum_size, compresslevel=gzip_level)
+
+    async def __call__(self, scope:Scope, receive:Receive, send:Send):
+        if scope["type"] == "http" and brotli is not None \
+                and _accepts(Headers(scope=scope).get("accept-encoding", ""), "br"):
+            await _BrotliResponder(self.app, self.minimum_size, self.brotli_quality)(scope, receive, send)
+        else:
+            await self.gzip(scope, receive, send)
@@ -4,5 +4,5 @@ from fastapi import APIRouter
 
 router = APIRouter()
 
-@router.post("/citation", response_model=WikipediaCitation)
+@router.post("/citation", response_model=List[WikipediaCitation])
 async def parse_article_citation(article_json:Dict[str, Any]) -> List[WikipediaCitation]: return []
\ No newline at end of file
@@ -4,5 +4,5 @@ from fastapi import APIRouter
 
 router = APIRouter()
 
-@router.post("/head", response_model=WikipediaHeader)
+@router.post("/head", response_model=List[WikipediaHeader])
 async def parse_article_categories(article_json:Dict[str, Any]) -> List[WikipediaHeader]: return []
\ No newline at end of file
@@ -4,7 +4,7 @@ from fastapi import APIRouter
 
 router = APIRouter()
 
-@router.post("/info-box", response_model=WikipediaInfoBox) # TODO: avoid using a dash in endpoint
+@router.post("/info-box", response_model=Optional[WikipediaInfoBox]) # TODO: avoid using a dash in endpoint
 async def parse_article_infobox(article_json:Dict[str, Any]) -> Optional[WikipediaInfoBox]:
     """Extract and parse the infobox from Wikipedia article (JSON)"""
     
@@ -1,47 +1,97 @@
-from typing import Any, Dict, List, Optional
+import json
+from itertools import chain
+from typing import Any, AsyncIterator, Dict, Iterator, List, Literal, Optional
 from models import WikipediaTable, TableExtractionRequest, TableExtractionResponse
-from fastapi import APIRouter, HTTPException
-from table_extraction import extract_tables_from_wikipedia, get_table_details
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from requests import RequestException
+from concurrency import iterate_blocking, run_blocking
+from responses import json_response
+from table_extraction import ExtractedTable, stream_article_tables
 
 router = APIRouter()
 
-@router.post("/tables", response_model=WikipediaTable)
+@router.post("/tables", response_model=List[WikipediaTable])
 async def parse_article_tables(article_json:Dict[str, Any]) -> List[WikipediaTable]: return []
 
+
+def _table_details(table: ExtractedTable) -> str:
+    return f"{table.count_rows()} rows and {len(table.headers)} columns"
+
+
+def _article_tables(request: TableExtractionRequest) -> Iterator[ExtractedTable]:
+    tables = stream_article_tables(request.page_title, request.language)
+    first = next(tables, None)
+    if first is None:
+        raise HTTPException(status_code=404, detail=f"No tables found in article '{request.page_title}'")
+    return chain([first], tables)
+
+
+def _json_document(request: TableExtractionRequest) -> Iterator[str]:
+    """The TableExtractionResponse document, written one table row at a time; details come last."""
+    tables = _article_tables(request)
+    yield '{"article_title": %s, "language": %s, "tables": [' % (json.dumps(request.page_title, ensure_ascii=False),
+                                                                 json.dumps(request.language, ensure_ascii=False))
+    table_details = {}
+    for number, table in enumerate(tables, start=1):
+        yield ",\n" if number > 1 else "\n"
+        yield from table.iter_json(table_id=f"table_{number}")
+        table_details[str(number)] = _table_details(table)
+    yield '\n], "number_of_tables": %d, "table_details": %s}\n' % (len(table_details), json.dumps(table_details))
+
+
+def _csv_document(request: TableExtractionRequest, number: int) -> Iterator[str]:
+    for table in _article_tables(request):
+        if table.index == number:
+            yield from table.iter_csv()
+            return
+    raise HTTPException(status_code=404, detail=f"Article '{request.page_title}' has no table {number}")
+
+
+def _selected_document(request: TableExtractionRequest) -> dict:
+    tables = list(_article_tables(request))
+    return {
+        "article_title": request.page_title,
+        "language": request.language,
+        "number_of_tables": len(tables),
+        "tables": [{"table_id": f"table_{number}", **table.to_dict()} for number, table in enumerate(tables, start=1)],
+        "table_details": {str(number): _table_details(table) for number, table in enumerate(tables, start=1)},
+    }
+
+
+async def _resumed(first: str, chunks: AsyncIterator[str]) -> AsyncIterator[str]:
+    yield first
+    async for chunk in chunks:
+        yield chunk
+
+
 @router.post("/extract-tables", response_model=TableExtractionResponse)
-async def extract_wikipedia_tables(request: TableExtractionRequest) -> TableExtractionResponse:
-    """Extract all tables from a Wikipedia article given its title and language"""
+async def extract_wikipedia_tables(http_request: Request, request: TableExtractionRequest,
+                                   fields: Optional[str] = Query(None),
+                                   format: Literal["json", "csv"] = Query("json"),
+                                   table: int = Query(1, ge=1)):
+    """Extract all tables from a Wikipedia article given its title and language
+
+    The article HTML is parsed while it downloads and the tables are streamed out as
+    they are found. ``format=csv`` returns table number ``table`` alone as CSV.
+    ``fields`` selects parts of the JSON document, which is then built in memory.
+    """
     try:
-        tables_data = extract_tables_from_wikipedia(request.page_title, request.language)
-        
-        if not tables_data:
-            raise HTTPException(status_code=404, detail=f"No tables found in article '{request.page_title}'")
-        
-        wikipedia_tables = []
-        for idx, table_data in enumerate(tables_data):
-            table_id = f"table_{idx + 1}"
-            headers = table_data['headers']
-            rows = table_data['rows']
-            caption = table_data.get('caption')
-            
-            wikipedia_table = WikipediaTable(
-                table_id=table_id,
-                headers=headers,
-                rows=rows,
-                caption=caption
-            )
-            wikipedia_tables.append(wikipedia_table)
-        
-        table_details = get_table_details(tables_data)
-        
-        return TableExtractionResponse(
-            article_title=request.page_title,
-            language=request.language,
-            number_of_tables=len(wikipedia_tables),
-            tables=wikipedia_tables,
-            table_details=table_details
-        )
+        if fields and format == "json":
+            # fields=article_title,number_of_tables,table_details leaves out the rows
+            return json_response(http_request, await run_blocking(_selected_document, request), fields)
+        if format == "csv":
+            chunks, media_type = iterate_blocking(_csv_document, request, table), "text/csv; charset=utf-8"
+        else:
+            chunks, media_type = iterate_blocking(_json_document, request), "application/json"
+        # The first chunk comes once a table is found, so a missing page or table is still a 404.
+        first = await anext(chunks)
+        return StreamingResponse(_resumed(first, chunks), media_type=media_type)
+    except HTTPException:
+        raise
+    except RequestException as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error extracting tables: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error extracting tables: {str(e)}")
@@ -0,0 +1,84 @@
+import sqlite3
+import threading
+import time
+
+import config
+
+COMPONENTS = ("citations", "tables", "infobox_attributes", "headers", "images")
+
+
+class ScoreIndex:
+    """Latest score and component counts of every analyzed article, keyed by (language, title) in SQLite."""
+
+    def __init__(self, path:str):
+        self.path = path
+        self._local = threading.local()
+        with self.connection() as connection:
+            connection.execute("CREATE TABLE IF NOT EXISTS scores ("
+                               "language TEXT NOT NULL, title TEXT NOT NULL, revision_id INTEGER NOT NULL, "
+                               "score REAL NOT NULL, " + ", ".join(f"{name} INTEGER NOT NULL" for name in COMPONENTS)
+                               + ", updated_at REAL NOT NULL, checked_at REAL NOT NULL, "
+                               "PRIMARY KEY (language, title))")
+            connection.execute("CREATE INDEX IF NOT EXISTS scores_by_score ON scores (language, score DESC)")
+
+    def connection(self) -> sqlite3.Connection:
+        # SQLite connections cannot be shared across threads, so each thread opens its own.
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def get(self, language:str, title:str) -> dict | None:
+        row = self.connection().execute("SELECT * FROM scores WHERE language = ? AND title = ?",
+                                        (language, title)).fetchone()
+        return dict(row) if row is not None else None
+
+    def put(self, language:str, title:str, revision_id:int, score:float, counts:dict[str, int]):
+        now = time.time()
+        with self.connection() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO scores (language, title, revision_id, score, "
+                + ", ".join(COMPONENTS) + ", updated_at, checked_at) VALUES (?, ?, ?, ?, "
+                + ", ".join("?" * len(COMPONENTS)) + ", ?, ?)",
+                (language, title, revision_id, score, *(counts[name] for name in COMPONENTS), now, now))
+
+    def mark_checked(self, language:str, titles:list[str]):
+        with self.connection() as connection:
+            connection.executemany("UPDATE scores SET checked_at = ? WHERE language = ? AND title = ?",
+                                   [(time.time(), language, title) for title in titles])
+
+    def delete(self, language:str, titles:list[str]):
+        with self.connection() as connection:
+            connection.executemany("DELETE FROM scores WHERE language = ? AND title = ?",
+                                   [(language, title) for title in titles])
+
+    def languages(self) -> list[str]:
+        return [row[0] for row in self.connection().execute("SELECT DISTINCT language FROM scores ORDER BY 1")]
+
+    def revisions(self, language:str) -> dict[str, int]:
+        """Stored revision id of every indexed title, least recently checked first."""
+        rows = self.connection().execute(
+            "SELECT title, revision_id FROM scores WHERE language = ? ORDER BY checked_at", (language,))
+        return {title: revision_id for title, revision_id in rows}
+
+    def top(self, language:str, limit:int=100, offset:int=0, min_score:float|None=None) -> list[dict]:
+        query = "SELECT * FROM scores WHERE language = ?"
+        params:list = [language]
+        if min_score is not None:
+            query += " AND score >= ?"
+            params.append(min_score)
+        query += " ORDER BY score DESC, title LIMIT ? OFFSET ?"
+        params.extend((limit, offset))
+        return [dict(row) for row in self.connection().execute(query, params)]
+
+
+def _build_index() -> ScoreIndex | None:
+    return ScoreIndex(config.SCORE_INDEX_PATH) if config.SCORE_INDEX_PATH else None
+
+
+# Shared index of computed scores; None when disabled.
+score_index = _build_index()
@@ -0,0 +1,127 @@
+import asyncio
+import functools
+import logging
+
+from fastapi import APIRouter, HTTPException, Path, Query, Request
+from requests import RequestException
+from starlette import status
+
+import config
+import metrics
+from admission import Unavailable
+from concurrency import bounded_gather, run_blocking
+from operations import score_article
+from responses import json_response
+from score_index import score_index
+from utility import get_page_info_batch
+
+logger = logging.getLogger(__name__)
+
+scores_router = APIRouter(
+    prefix="/scores",
+    tags=["Score Index"],
+)
+
+
+def _require_index():
+    if score_index is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="The score index is disabled.")
+    return score_index
+
+
+def _rescore(title: str, language: str, page_info: dict) -> bool:
+    try:
+        score_article(title, language, page_info)
+        return True
+    except Exception:
+        metrics.ERRORS.inc(stage="index_refresh")
+        return False
+
+
+async def refresh_language(language: str, limit: int) -> dict:
+    """Re-scores the indexed articles of one wiki whose latest revision differs from the stored one.
+
+    Freshness comes from batched ``prop=info`` lookups, so unchanged articles cost one title in a
+    50-title query and are never downloaded. Only titles the API reports as missing or invalid are
+    removed; a title without a record in the response is left for the next pass.
+    """
+    revisions = await run_blocking(score_index.revisions, language)
+    infos = await run_blocking(get_page_info_batch, list(revisions), language)
+
+    missing = [title for title, info in infos.items() if "missing" in info or "invalid" in info]
+    current = {title: info["lastrevid"] for title, info in infos.items()
+               if "lastrevid" in info and title not in missing}
+    changed = [title for title, revision_id in current.items() if revision_id != revisions[title]][:limit]
+    unchanged = [title for title, revision_id in current.items() if revision_id == revisions[title]]
+
+    if missing:
+        await run_blocking(score_index.delete, language, missing)
+    await run_blocking(score_index.mark_checked, language, unchanged)
+    results = await bounded_gather(
+        [functools.partial(run_blocking, _rescore, title, language, infos[title]) for title in changed],
+        limit=config.BATCH_CONCURRENCY
+    )
+    return {"checked": len(infos), "recomputed": sum(results), "failed": len(results) - sum(results),
+            "removed": len(missing)}
+
+
+async def refresh_index(language: str | None = None) -> dict[str, dict]:
+    languages = [language] if language else await run_blocking(score_index.languages)
+    summary = {}
+    for code in languages:
+        try:
+            with metrics.timed("index_refresh", code):
+                summary[code] = await refresh_language(code, config.SCORE_INDEX_REFRESH_LIMIT)
+        except (RequestException, ValueError, Unavailable) as e:
+            # One unreachable or lagged wiki must not stop the others; its entries stay as they are.
+            metrics.ERRORS.inc(stage="index_refresh")
+            logger.warning("Score index refresh of %s failed: %s", code, e)
+            summary[code] = {"error": str(e)}
+    return summary
+
+
+async def refresh_periodically():
+    """Background task: keeps the index current, at a cost proportional to the number of edits."""
+    while True:
+        await asyncio.sleep(config.SCORE_INDEX_REFRESH_INTERVAL)
+        try:
+            await refresh_index()
+        except Exception:
+            metrics.ERRORS.inc(stage="index_refresh")
+            logger.exception("Score index refresh failed")
+
+
+@scores_router.get("/{language}", status_code=status.HTTP_200_OK)
+async def get_indexed_scores(request: Request, language: str = Path(min_length=1),
+                             limit: int = Query(100, ge=1, le=1000), offset: int = Query(0, ge=0),
+                             min_score: float | None = Query(None), fields: str | None = Query(None)):
+    """
+    Lists the indexed articles of one wiki, highest score first, without contacting Wikipedia.
+    """
+    index = _require_index()
+    scores = await run_blocking(index.top, language, limit, offset, min_score)
+    return json_response(request, {"language": language, "scores": scores}, fields,
+                         last_modified=max((record["updated_at"] for record in scores), default=None))
+
+
+@scores_router.get("/{language}/{title}", status_code=status.HTTP_200_OK)
+async def get_indexed_score(request: Request, title: str, language: str = Path(min_length=1),
+                            fields: str | None = Query(None)):
+    """
+    Returns the stored score, component counts and revision of one article.
+    """
+    index = _require_index()
+    record = await run_blocking(index.get, language, title.replace(" ", "_"))
+    if record is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail=f"Page '{title}' is not in the {language} score index.")
+    return json_response(request, record, fields, last_modified=record["updated_at"])
+
+
+@scores_router.post("/refresh", status_code=status.HTTP_200_OK)
+async def post_refresh(language: str | None = Query(None)):
+    """
+    Runs one refresh pass now, for one wiki or for every indexed wiki.
+    """
+    _require_index()
+    return {"refreshed": await refresh_index(language)}
@@ -0,0 +1,15 @@
+# Weight of each structural component in the quality score.
+SCORE_WEIGHTS = {
+    "citations": 0.5,
+    "tables": 0.3,
+    "infobox_attributes": 0.10,
+    "headers": 0.05,
+    "images": 0.05,
+}
+
+
+def score_from_counts(citations:int, tables:int, infobox_attributes:int, headers:int, images:int) -> float:
+    """Structural scoring formula shared by the live analysis and the offline tools."""
+    return ((SCORE_WEIGHTS["citations"] * citations) + (SCORE_WEIGHTS["tables"] * tables) +
+            (SCORE_WEIGHTS["infobox_attributes"] * infobox_attributes) +
+            (SCORE_WEIGHTS["headers"] * headers) + (SCORE_WEIGHTS["images"] * images))
@@ -0,0 +1,57 @@
+import asyncio
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error:BaseException | None = None
+
+
+class SingleFlight:
+    """Deduplicates concurrent blocking calls: callers with the same key share one execution."""
+
+    def __init__(self):
+        self._calls:dict = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func, *args, **kwargs):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+class AsyncSingleFlight:
+    """Deduplicates concurrent coroutines: callers with the same key await one shared task."""
+
+    def __init__(self):
+        self._tasks:dict = {}
+
+    async def do(self, key, coroutine_factory):
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(coroutine_factory())
+            self._tasks[key] = task
+            task.add_done_callback(lambda _: self._tasks.pop(key, None))
+        # Shielded so that one caller going away does not cancel the work the others wait on.
+        return await asyncio.shield(task)
@@ -0,0 +1,384 @@
+"""Table extraction from rendered article HTML.
+
+Tables are parsed with lxml and streamed one at a time; each table's rows are
+generated lazily with ``rowspan``/``colspan`` expanded, so a large statistical
+table is never held as more than its parsed element plus one row (or one
+Arrow record batch). Exports: JSON, CSV, Arrow/Parquet and pandas.
+"""
+import csv
+import io
+import json
+from itertools import islice
+from typing import Iterable, Iterator, TextIO
+
+from fastapi import HTTPException
+from lxml import etree
+from starlette import status
+
+import config
+import mediawiki
+from article import html_url, parse_page
+
+# Tables used for page layout, navigation or maintenance notices rather than data.
+LAYOUT_TABLE_CLASSES = {"infobox", "navbox", "vertical-navbox", "sidebar", "metadata", "ambox", "mbox-small",
+                        "succession-box", "sistersitebox"}
+# Cell content that is not part of the value: footnote markers, hidden sort keys, styles and nested tables.
+SKIPPED_CELL_TAGS = {"style", "script", "table"}
+SKIPPED_CELL_CLASSES = {"reference", "sortkey", "mw-editsection", "noprint"}
+MAX_SPAN = 1000
+ARROW_BATCH_ROWS = 8192
+
+LANGUAGE_NAMES = {
+    "english": "en",
+    "spanish": "es",
+    "español": "es",
+    "french": "fr",
+    "français": "fr",
+    "german": "de",
+    "deutsch": "de",
+    "portuguese": "pt",
+    "português": "pt",
+    "arabic": "ar",
+    "العربية": "ar",
+}
+
+
+def language_code(language:str) -> str:
+    """Accepts a language code ("en") or an English or native language name ("english", "Français")."""
+    normalized = language.strip().lower()
+    if normalized in LANGUAGE_NAMES:
+        return LANGUAGE_NAMES[normalized]
+    if normalized.replace("-", "").isalpha() and 2 <= len(normalized) <= 12:
+        return normalized
+    raise ValueError(f"Unsupported language '{language}'")
+
+
+def _classes(element) -> set[str]:
+    return set((element.get("class") or "").split())
+
+
+def _span(cell, attribute:str) -> int:
+    value = cell.get(attribute)
+    if value is None:
+        return 1
+    try:
+        return min(MAX_SPAN, max(1, int(value.strip().rstrip(";"))))
+    except ValueError:
+        return 1
+
+
+def _is_hidden(element) -> bool:
+    style = (element.get("style") or "").replace(" ", "").lower()
+    return "display:none" in style
+
+
+def _cell_text(cell) -> str:
+    if not len(cell):
+        return " ".join((cell.text or "").split())
+    parts = []
+
+    def collect(element):
+        if element.text:
+            parts.append(element.text)
+        for child in element:
+            if isinstance(child.tag, str) and not (child.tag in SKIPPED_CELL_TAGS
+                                                   or _classes(child) & SKIPPED_CELL_CLASSES or _is_hidden(child)):
+                if child.tag == "br":
+                    parts.append(" ")
+                collect(child)
+            if child.tail:
+                parts.append(child.tail)
+
+    collect(cell)
+    return " ".join("".join(parts).split())
+
+
+def _table_rows(table) -> Iterator:
+    """The ``<tr>`` elements of a table in document order, excluding those of nested tables."""
+    for child in table:
+        if child.tag == "tr":
+            yield child
+        elif child.tag in ("thead", "tbody", "tfoot"):
+            yield from (row for row in child if row.tag == "tr")
+
+
+def _cells(row) -> list:
+    return [cell for cell in row if cell.tag in ("td", "th")]
+
+
+def _expand(rows:Iterable, width:int|None=None) -> Iterator[tuple[bool, list[str]]]:
+    """Yields (is_header_row, cell texts) per row with row and column spans expanded into a grid.
+
+    A cell spanning several columns or rows is repeated in each position it covers.
+    Rows are padded to ``width`` when given.
+    """
+    pending:dict[int, list] = {}  # column -> [rows remaining, text] of cells spanning down from above
+    for row in rows:
+        cells = _cells(row)
+        values:list[str] = []
+        column = 0
+
+        def fill_pending():
+            nonlocal column
+            while column in pending:
+                remaining = pending[column]
+                values.append(remaining[1])
+                remaining[0] -= 1
+                if remaining[0] == 0:
+                    del pending[column]
+                column += 1
+
+        for cell in cells:
+            fill_pending()
+            text = _cell_text(cell)
+            rowspan = _span(cell, "rowspan")
+            for _ in range(_span(cell, "colspan")):
+                values.append(text)
+                if rowspan > 1:
+                    pending[column] = [rowspan - 1, text]
+                column += 1
+        # Cells spanning down into columns after the last cell of this row.
+        while pending and column <= max(pending):
+            if column in pending:
+                fill_pending()
+            else:
+                values.append("")
+                column += 1
+
+        if width is not None and len(values) < width:
+            values.extend([""] * (width - len(values)))
+        yield bool(cells) and all(cell.tag == "th" for cell in cells), values
+
+
+def _grid_width(rows:Iterable) -> int:
+    """Number of grid columns, found by replaying the spans without extracting any text."""
+    width = 0
+    pending:dict[int, int] = {}
+    for row in rows:
+        column = 0
+        occupied = set(pending)
+        for cell in _cells(row):
+            while column in occupied:
+                column += 1
+            rowspan = _span(cell, "rowspan")
+            for _ in range(_span(cell, "colspan")):
+                if rowspan > 1:
+                    pending[column] = max(pending.get(column, 0), rowspan)
+                column += 1
+        width = max(width, column, max(occupied) + 1 if occupied else 0)
+        for key in list(pending):
+            pending[key] -= 1
+            if pending[key] <= 0:
+                del pending[key]
+    return width
+
+
+def _column_names(header_rows:list[list[str]], width:int) -> list[str]:
+    """One name per column from (possibly multi-row) headers, e.g. "Population / 2020"; duplicates get a suffix."""
+    names = []
+    for column in range(width):
+        parts = []
+        for row in header_rows:
+            value = row[column] if column < len(row) else ""
+            if value and value not in parts:
+                parts.append(value)
+        names.append(" / ".join(parts) or f"Column {column + 1}")
+    seen:dict[str, int] = {}
+    for index, name in enumerate(names):
+        if name in seen:
+            seen[name] += 1
+            names[index] = f"{name} ({seen[name]})"
+        else:
+            seen[name] = 1
+    return names
+
+
+class ExtractedTable:
+    """One table of an article: caption and headers up front, body rows generated on demand."""
+
+    def __init__(self, index:int, element):
+        self.index = index
+        self._element = element
+        caption = element.find("caption")
+        self.caption = (_cell_text(caption) or None) if caption is not None else None
+        self.width = _grid_width(_table_rows(element))
+
+        self.header_rows:list[list[str]] = []
+        for is_header, values in _expand(_table_rows(element), self.width):
+            if not is_header:
+                break
+            self.header_rows.append(values)
+        self.headers = _column_names(self.header_rows, self.width)
+
+    def rows(self) -> Iterator[list[str]]:
+        """Body rows, one expanded row at a time; header rows are excluded."""
+        return islice((values for _, values in _expand(_table_rows(self._element), self.width)),
+                      len(self.header_rows), None)
+
+    def count_rows(self) -> int:
+        return sum(1 for _ in _table_rows(self._element)) - len(self.header_rows)
+
+    def to_dict(self) -> dict:
+        return {"caption": self.caption, "headers": self.headers, "rows": list(self.rows())}
+
+    def iter_json(self, **fields) -> Iterator[str]:
+        """The table as a JSON object (``fields`` first, then caption, headers and rows), a row at a time."""
+        yield "{" + "".join(f"{json.dumps(name)}: {json.dumps(value, ensure_ascii=False)}, "
+                            for name, value in fields.items())
+        yield '"caption": %s, "headers": %s, "rows": [' % (json.dumps(self.caption, ensure_ascii=False),
+                                                          json.dumps(self.headers, ensure_ascii=False))
+        for number, row in enumerate(self.rows()):
+            yield (",\n  " if number else "\n  ") + json.dumps(row, ensure_ascii=False)
+        yield "]}"
+
+    def iter_csv(self, header:bool=True) -> Iterator[str]:
+        """The table as CSV text, one line at a time."""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        rows = self.rows()
+        for row in ([self.headers] if header else []):
+            writer.writerow(row)
+        while True:
+            if buffer.tell():
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            row = next(rows, None)
+            if row is None:
+                return
+            writer.writerow(row)
+
+    def record_batches(self, batch_rows:int=ARROW_BATCH_ROWS):
+        """Arrow record batches of string columns, built ``batch_rows`` rows at a time."""
+        import pyarrow as pa
+
+        schema = pa.schema([pa.field(name, pa.string()) for name in self.headers])
+        rows = self.rows()
+        while True:
+            batch = list(islice(rows, batch_rows))
+            if not batch:
+                break
+            yield pa.RecordBatch.from_arrays([pa.array(column, pa.string()) for column in zip(*batch)],
+                                             schema=schema)
+
+    def to_arrow(self):
+        try:
+            import pyarrow as pa
+        except ImportError as e:
+            raise RuntimeError("Arrow output requires pyarrow (pip install pyarrow)") from e
+        schema = pa.schema([pa.field(name, pa.string()) for name in self.headers])
+        return pa.Table.from_batches(list(self.record_batches()), schema=schema)
+
+    def to_dataframe(self):
+        import pandas as pd
+
+        try:
+            return self.to_arrow().to_pandas()
+        except RuntimeError:
+            return pd.DataFrame.from_records(self.rows(), columns=self.headers)
+
+    def write_csv(self, output:TextIO, header:bool=True) -> int:
+        written = 0
+        for line in self.iter_csv(header):
+            output.write(line)
+            written += 1
+        return written - header
+
+    def write_parquet(self, path:str) -> int:
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise RuntimeError("Parquet output requires pyarrow (pip install pyarrow)") from e
+        written = 0
+        with pq.ParquetWriter(path, pa.schema([pa.field(name, pa.string()) for name in self.headers])) as writer:
+            for batch in self.record_batches():
+                writer.write_batch(batch)
+                written += batch.num_rows
+        return written
+
+
+def _is_data_table(table) -> bool:
+    return not (_classes(table) & LAYOUT_TABLE_CLASSES) and next(table.iterancestors("table"), None) is None
+
+
+def iter_tables(source, include_layout:bool=False) -> Iterator[ExtractedTable]:
+    """Streams the top-level tables of an HTML document (a string, bytes or binary file object).
+
+    Each table is detached from the document once parsed, and content before it
+    is dropped, so memory stays bounded by the largest table rather than the page.
+    Layout tables (infoboxes, navboxes, notices) are skipped unless ``include_layout``.
+    """
+    if isinstance(source, str):
+        source = source.encode("utf-8")
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+
+    index = 0
+    for _, element in etree.iterparse(source, events=("end",), tag="table", html=True, encoding="utf-8",
+                                      remove_comments=True):
+        if next(element.iterancestors("table"), None) is not None:
+            continue
+        keep = include_layout or _is_data_table(element)
+        # Free everything parsed before this table, then detach the table itself.
+        node = element
+        while node.getparent() is not None:
+            parent = node.getparent()
+            while node.getprevious() is not None:
+                del parent[0]
+            node = parent
+        element.getparent().remove(element)
+        if keep:
+            index += 1
+            yield ExtractedTable(index, element)
+
+
+def write_json(tables:Iterable[ExtractedTable], output:TextIO) -> int:
+    """Writes ``[{"caption", "headers", "rows"}, ...]`` row by row without building the whole document."""
+    count = 0
+    output.write("[")
+    for table in tables:
+        output.write(",\n" if count else "\n")
+        for chunk in table.iter_json():
+            output.write(chunk)
+        count += 1
+    output.write("\n]\n")
+    return count
+
+
+def fetch_article_html(page_title:str, language:str) -> str:
+    """Rendered HTML of an article; ``language`` may be a code or a language name."""
+    return parse_page(page_title, language_code(language), "text",
+                      max_bytes=config.MAX_ARTICLE_HTML_BYTES)["text"]["*"]
+
+
+def stream_article_tables(page_title:str, language:str) -> Iterator[ExtractedTable]:
+    """Data tables of an article, parsed while its HTML downloads; ``language`` may be a code or a name.
+
+    The HTML comes in chunks from the REST API, so neither the page nor a tree of it is
+    ever held. The request is made (and a missing page raises 404) before this returns.
+    """
+    response = mediawiki.get(html_url(page_title, language_code(language), None), stream=True)
+    if response.status_code == status.HTTP_404_NOT_FOUND:
+        response.close()
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail=f"Page '{page_title}' not found in {language} Wikipedia.")
+    try:
+        response.raise_for_status()
+    except Exception:
+        response.close()
+        raise
+    response.raw.decode_content = True
+    return _closing(iter_tables(response.raw), response)
+
+
+def _closing(tables:Iterator[ExtractedTable], response) -> Iterator[ExtractedTable]:
+    try:
+        yield from tables
+    finally:
+        response.close()
+
+
+def extract_tables_from_wikipedia(page_title:str, language:str) -> list[dict]:
+    """Every data table of an article as ``{"caption", "headers", "rows"}`` dicts; for small articles."""
+    return [table.to_dict() for table in stream_article_tables(page_title, language)]
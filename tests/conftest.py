@@ -0,0 +1,4 @@
+import os
+
+# Keep tests off the on-disk stores of a development checkout; set before any module reads config.
+os.environ.update(CACHE_DB_PATH="", SCORE_INDEX_PATH="", JOB_DB_PATH="", SCORE_INDEX_REFRESH_INTERVAL="0")
@@ -0,0 +1,105 @@
+import json
+import threading
+import time
+
+import pytest
+import requests
+
+import admission
+import config
+import mediawiki
+
+
+@pytest.fixture(autouse=True)
+def gates(monkeypatch):
+    monkeypatch.setattr(admission, "_gates", {})
+    monkeypatch.setattr(config, "HTTP_RATE_LIMIT", 0)
+    monkeypatch.setattr(config, "HTTP_MIN_CONCURRENCY", 1)
+    monkeypatch.setattr(config, "HTTP_MAX_CONCURRENCY", 8)
+    monkeypatch.setattr(config, "HTTP_TARGET_LATENCY", 1.0)
+
+
+def _response(status:int, body:dict) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status
+    response._content = json.dumps(body).encode()
+    return response
+
+
+def test_limit_halves_when_throttled_and_grows_back_on_success():
+    limit = admission.AdaptiveLimit(2, 8, target_latency=1.0, cooldown=0)
+
+    limit.on_throttled()
+    assert limit.limit == 4
+    limit.on_throttled()
+    limit.on_throttled()
+    assert limit.limit == 2  # never below the minimum
+
+    for _ in range(100):
+        limit.on_success(0.1)
+    assert limit.limit == 8  # never above the maximum
+
+
+def test_slow_success_counts_as_throttling():
+    limit = admission.AdaptiveLimit(1, 8, target_latency=1.0, cooldown=0)
+
+    limit.on_success(5.0)
+
+    assert limit.limit == 4
+
+
+def test_one_decrease_per_cooldown():
+    limit = admission.AdaptiveLimit(1, 8, target_latency=1.0, cooldown=60)
+
+    limit.on_throttled()
+    limit.on_throttled()
+
+    assert limit.limit == 4
+
+
+def test_429_shrinks_the_host_limit(monkeypatch):
+    monkeypatch.setattr(config, "HTTP_RETRIES", 1)
+    monkeypatch.setattr(config, "HTTP_BACKOFF_BASE", 0)
+    responses = iter([_response(429, {}), _response(200, {})])
+    monkeypatch.setattr(mediawiki._session, "get", lambda url, **kwargs: next(responses))
+
+    assert mediawiki.get("https://throttled.test/w/api.php").status_code == 200
+    # Halved by the 429, then one additive step for the retried call.
+    assert admission.gate("throttled.test").concurrency.limit == 4.25
+
+
+def test_maxlag_shrinks_the_host_limit(monkeypatch):
+    monkeypatch.setattr(config, "HTTP_RETRIES", 0)
+    monkeypatch.setattr(config, "MEDIAWIKI_API_URL", "https://lagged.test/w/api.php")
+    monkeypatch.setattr(mediawiki._session, "get", lambda url, **kwargs: _response(
+        200, {"error": {"code": "maxlag", "info": "Waiting for db"}}))
+
+    assert mediawiki.api_get("en", {})["error"]["code"] == "maxlag"
+    assert admission.gate("lagged.test").concurrency.limit == 4
+
+
+def test_full_queue_rejects_new_work_and_waiters_time_out(monkeypatch):
+    monkeypatch.setattr(config, "HTTP_MAX_CONCURRENCY", 1)
+    monkeypatch.setattr(config, "HTTP_QUEUE_SIZE", 1)
+    monkeypatch.setattr(config, "HTTP_QUEUE_TIMEOUT", 0.3)
+    host_gate = admission.gate("busy.test")
+    host_gate.acquire()
+    errors = []
+
+    def waiter():
+        try:
+            host_gate.acquire()
+        except admission.Overloaded as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=waiter)
+    thread.start()
+    time.sleep(0.1)
+    overload = admission.inbound_overload()
+    thread.join()
+
+    assert isinstance(overload, admission.Overloaded) and overload.host == "busy.test"
+    assert len(errors) == 1 and errors[0].host == "busy.test"
+    assert admission.inbound_overload() is None
+    host_gate.release()
+    host_gate.acquire()
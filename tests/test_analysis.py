@@ -0,0 +1,44 @@
+import os
+
+import pytest
+
+from analysis import DocumentTooLarge, analyze_html, analyze_html_stream
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def _read(name:str) -> bytes:
+    with open(os.path.join(FIXTURES, name), "rb") as source:
+        return source.read()
+
+
+def _chunks(payload:bytes, size:int):
+    return (payload[start:start + size] for start in range(0, len(payload), size))
+
+
+EXPECTED = {
+    "headers": {"h1": 0, "h2": 4, "h3": 1, "h4": 0, "h5": 0, "h6": 0},
+    "tables": [{"Index": 1, "Rows": 3, "Columns": 2},
+               {"Index": 2, "Rows": 3, "Columns": 3},
+               {"Index": 3, "Rows": 2, "Columns": 2}],
+    "infobox": [{"attribute": "Country", "value": "Nowhere"}, {"attribute": "Population", "value": "1,000 [1]"}],
+    "see_also_links": 2,
+}
+
+
+def test_action_parse_html():
+    # The table of contents heading is not counted.
+    assert analyze_html(_read("article-action-parse.html").decode()) == EXPECTED
+
+
+@pytest.mark.parametrize("chunk_size", [64, 1024, 1 << 20])
+def test_streamed_parsoid_html_matches_action_parse_html(chunk_size):
+    parsoid = _read("article-parsoid.html")
+
+    assert analyze_html_stream(_chunks(parsoid, chunk_size)) == EXPECTED
+    assert analyze_html(parsoid.decode()) == EXPECTED
+
+
+def test_stream_size_limit():
+    with pytest.raises(DocumentTooLarge):
+        analyze_html_stream(_chunks(_read("article-parsoid.html"), 256), max_bytes=1000)
@@ -0,0 +1,44 @@
+import asyncio
+import threading
+
+import pytest
+
+from concurrency import iterate_blocking
+
+
+def test_iterate_blocking_creates_advances_and_closes_on_one_thread():
+    threads = []
+
+    def numbers(count:int):
+        try:
+            for number in range(count):
+                threads.append(threading.get_ident())
+                yield number
+        finally:
+            threads.append(threading.get_ident())
+
+    async def take_two():
+        chunks = iterate_blocking(numbers, 5)
+        taken = [await anext(chunks), await anext(chunks)]
+        await chunks.aclose()
+        return taken
+
+    assert asyncio.run(take_two()) == [0, 1]
+    for _ in range(100):
+        if len(threads) == 3:
+            break
+        threading.Event().wait(0.01)
+    assert len(threads) == 3 and len(set(threads)) == 1
+    assert threads[0] != threading.get_ident()
+
+
+def test_iterate_blocking_raises_the_iterator_error():
+    def failing():
+        raise ValueError("no tables")
+        yield
+
+    async def consume():
+        return [item async for item in iterate_blocking(failing)]
+
+    with pytest.raises(ValueError, match="no tables"):
+        asyncio.run(consume())
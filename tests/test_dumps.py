@@ -0,0 +1,61 @@
+import bz2
+import csv
+import os
+import shutil
+
+import pytest
+
+from dumps import OUTPUT_COLUMNS, iter_pages, language_from_dump_name, score_dump, score_pages, write_csv
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "testwiki-pages-articles.xml")
+
+SAMPLE_ROW = {"language": "test", "title": "Sample article", "revision_id": 101, "score": 2.15,
+              "citations": 3, "tables": 1, "infobox_attributes": 2, "headers": 2, "images": 1,
+              "citations_with_doi": 0, "citations_with_isbn": 1}
+
+
+def test_iter_pages_skips_redirects_and_other_namespaces():
+    pages = list(iter_pages(FIXTURE))
+
+    assert [(title, revision_id) for title, revision_id, _ in pages] == [("Sample article", 101), ("Stub", 104)]
+    # Escaped markup in the dump is unescaped wikitext.
+    assert '<ref name="river">' in pages[0][2]
+
+
+def test_iter_pages_reads_bz2(tmp_path):
+    compressed = tmp_path / "testwiki-pages-articles.xml.bz2"
+    with open(FIXTURE, "rb") as source, bz2.open(compressed, "wb") as target:
+        shutil.copyfileobj(source, target)
+
+    assert [title for title, _, _ in iter_pages(str(compressed))] == ["Sample article", "Stub"]
+
+
+def test_score_pages():
+    rows = score_pages(list(iter_pages(FIXTURE)), "test")
+
+    assert rows[0] == SAMPLE_ROW
+    assert rows[1]["score"] == 0 and rows[1]["citations"] == 0
+
+
+def test_score_dump_and_csv_output(tmp_path):
+    output = tmp_path / "scores.csv"
+
+    written = write_csv(score_dump(FIXTURE, "test", workers=1, chunk_size=1), str(output))
+
+    assert written == 2
+    with open(output, newline="", encoding="utf-8") as source:
+        reader = csv.DictReader(source)
+        rows = list(reader)
+    assert reader.fieldnames == OUTPUT_COLUMNS
+    assert sorted(row["title"] for row in rows) == ["Sample article", "Stub"]
+    sample = next(row for row in rows if row["title"] == "Sample article")
+    assert sample == {column: str(value) for column, value in SAMPLE_ROW.items()}
+
+
+@pytest.mark.parametrize("name, language", [
+    ("enwiki-latest-pages-articles.xml.bz2", "en"),
+    ("/dumps/zh_yuewiki-20250101-pages-articles.xml", "zh_yue"),
+    ("articles.xml", None),
+])
+def test_language_from_dump_name(name, language):
+    assert language_from_dump_name(name) == language
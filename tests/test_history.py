@@ -0,0 +1,97 @@
+import pytest
+
+import history
+from benchmarks.fixtures import SYNTHETIC_SIZES, synthetic_article
+from scoring import score_from_counts
+from wikitext import combine_section_counts, section_counts, split_sections, wikitext_counts
+
+COMPONENTS = ("citations", "tables", "infobox_attributes", "headers", "images")
+
+EDGE_CASES = {
+    "empty": "",
+    "lead only": "Text.<ref>Bare.</ref>",
+    "named ref across sections": """Lead.<ref name="a">{{cite web |url=https://example.org}}</ref>
+== One ==
+Again.<ref name="a" /> And defined twice.<ref name="a">Same citation.</ref>
+== Two ==
+New.<ref name="b">Other.</ref><ref name="b" />""",
+    "infobox after the lead": """Lead.
+== Data ==
+{{Infobox settlement
+| name = X
+| population = 10
+}}
+== More ==
+{{Infobox person
+| name = Y
+}}""",
+    "heading levels, tables and files": """== A ==
+{| class="wikitable"
+|-
+| 1
+|}
+=== B ===
+[[File:X.png|thumb]]
+<gallery>
+Y.png
+Z.png
+</gallery>
+==== C ====
+{{cite book |isbn=1}}""",
+}
+
+
+def _combined(wikitext:str) -> dict:
+    return combine_section_counts([section_counts(section) for section in split_sections(wikitext)])
+
+
+def _whole(wikitext:str) -> dict:
+    counts = wikitext_counts(wikitext)
+    return {component: counts[component] for component in COMPONENTS}
+
+
+@pytest.mark.parametrize("name", EDGE_CASES)
+def test_section_counts_add_up_to_a_full_rescore(name):
+    assert _combined(EDGE_CASES[name]) == _whole(EDGE_CASES[name])
+
+
+@pytest.mark.parametrize("title", SYNTHETIC_SIZES)
+def test_section_counts_add_up_on_synthetic_articles(title):
+    wikitext = synthetic_article(title, "en", *SYNTHETIC_SIZES[title])["wikitext"]
+
+    combined = _combined(wikitext)
+
+    assert combined == _whole(wikitext)
+    assert score_from_counts(**combined) == score_from_counts(**_whole(wikitext))
+
+
+def test_history_series_matches_full_rescoring(monkeypatch):
+    base = EDGE_CASES["named ref across sections"]
+    texts = {
+        1: base,
+        2: base + "\n== Three ==\nAdded.<ref>New bare ref.</ref>",
+        3: base,  # revert to revision 1
+        4: base.replace("Again.", "Again, edited."),
+    }
+    revisions = [{"revid": revid, "timestamp": f"2025-01-0{revid}T00:00:00Z", "sha1": f"sha-{revid}"}
+                 for revid in texts]
+    revisions[2]["sha1"] = "sha-1"
+    downloaded = []
+
+    def iter_wikitexts(revision_ids, language):
+        downloaded.extend(revision_ids)
+        return ((revision_id, texts[revision_id]) for revision_id in revision_ids)
+
+    monkeypatch.setattr(history, "article_cache", None)
+    monkeypatch.setattr(history, "list_revisions", lambda title, language, limit: list(reversed(revisions)))
+    monkeypatch.setattr(history, "iter_wikitexts", iter_wikitexts)
+
+    result = history.score_history("Sample", "en", 4)
+
+    # Revision 1 has the content of its revert, so only one of the two is downloaded.
+    assert sorted(downloaded) == [2, 3, 4]
+    assert result["sections_reused"] > 0
+    for point in result["series"]:
+        expected = _whole(texts[point["revision_id"]])
+        assert {component: point[component] for component in COMPONENTS} == expected
+        assert point["score"] == round(score_from_counts(**expected), 3)
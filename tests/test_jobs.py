@@ -0,0 +1,113 @@
+import asyncio
+import json
+import threading
+
+import pytest
+from fastapi import HTTPException
+from pydantic import ValidationError
+
+import config
+import jobs
+from jobs import JobRequest, JobStore, check_callback_url
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    monkeypatch.setattr(jobs, "job_store", store)
+    return store
+
+
+@pytest.mark.parametrize("url", [
+    "http://127.0.0.1/hook",
+    "http://localhost:8000/hook",
+    "http://10.0.0.5/hook",
+    "http://192.168.1.1/hook",
+    "http://169.254.169.254/latest/meta-data",
+    "http://[::1]/hook",
+    "http://[::ffff:127.0.0.1]/hook",
+    "http://0.0.0.0/hook",
+    "ftp://93.184.215.14/hook",
+])
+def test_internal_callback_urls_are_rejected(url):
+    with pytest.raises(ValueError):
+        check_callback_url(url)
+
+
+def test_public_callback_url_is_accepted():
+    check_callback_url("https://93.184.215.14:8443/hook")
+
+
+def test_callback_allowlist(monkeypatch):
+    monkeypatch.setattr(config, "JOB_CALLBACK_HOSTS", frozenset({"hooks.internal"}))
+
+    check_callback_url("http://hooks.internal/done")
+    with pytest.raises(ValueError):
+        check_callback_url("https://93.184.215.14/hook")
+
+
+def test_submit_rejects_internal_callback(store):
+    request = JobRequest(language="en", title="Paris", callback_url="http://169.254.169.254/hook")
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(jobs.submit_job(request))
+
+    assert error.value.status_code == 400
+    assert store.counts() == {}
+
+
+def test_progress_total_follows_the_planned_languages(store, monkeypatch):
+    titles = {"en": "Paris", "fr": "Paris", "eo": "Parizo"}
+
+    async def plan_languages(title, source_language):
+        return titles, {}, None
+
+    async def iter_language_scores(title, source_language, mode, planned_titles, page_infos):
+        assert planned_titles == titles
+        for lang_code in planned_titles:
+            yield {"language": lang_code, "score": 1.0}
+
+    monkeypatch.setattr(jobs, "plan_languages", plan_languages)
+    monkeypatch.setattr(jobs, "iter_language_scores", iter_language_scores)
+    monkeypatch.setattr(jobs, "rank_scores", lambda records: records)
+    job, _ = store.submit("en", "Paris", "full", "interactive")
+    assert jobs.job_response(job)["progress"]["total"] is None
+
+    asyncio.run(jobs.run_job(store.claim(("interactive",), 60)))
+
+    response = jobs.job_response(store.get(job["id"]))
+    assert response["status"] == "done"
+    assert response["progress"]["completed"] == response["progress"]["total"] == 3
+    assert json.loads(store.get(job["id"])["languages"]) == ["en", "fr", "eo"]
+
+
+def test_callbacks_are_delivered_off_the_analysis_pool(store, monkeypatch):
+    delivered = threading.Event()
+    threads = []
+
+    def notify(job):
+        threads.append(threading.current_thread().name)
+        delivered.set()
+
+    async def plan_languages(title, source_language):
+        return {"en": title}, {}, None
+
+    async def iter_language_scores(title, source_language, mode, titles, page_infos):
+        yield {"language": "en", "score": 1.0}
+
+    monkeypatch.setattr(jobs, "_notify", notify)
+    monkeypatch.setattr(jobs, "plan_languages", plan_languages)
+    monkeypatch.setattr(jobs, "iter_language_scores", iter_language_scores)
+    monkeypatch.setattr(jobs, "rank_scores", lambda records: records)
+    store.submit("en", "Paris", "full", "interactive")
+
+    asyncio.run(jobs.run_job(store.claim(("interactive",), 60)))
+
+    assert delivered.wait(5)
+    assert threads[0].startswith("job-callback")
+
+
+@pytest.mark.parametrize("language", ["127.0.0.1:8080", "evil.example/#", "EN"])
+def test_malformed_job_language_is_rejected(language):
+    with pytest.raises(ValidationError):
+        JobRequest(language=language, title="Paris")
@@ -0,0 +1,98 @@
+import json
+
+import pytest
+from fastapi import HTTPException
+
+import admission
+import article
+import config
+import mediawiki
+
+
+class FakeResponse:
+    def __init__(self, status_code:int):
+        self.status_code = status_code
+        self.headers = {}
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(admission, "_gates", {})
+    monkeypatch.setattr(config, "HTTP_RATE_LIMIT", 0)
+    monkeypatch.setattr(config, "HTTP_RETRIES", 2)
+    monkeypatch.setattr(config, "HTTP_BACKOFF_BASE", 0)
+
+
+def test_streamed_responses_are_closed_before_a_retry(monkeypatch):
+    responses = [FakeResponse(503), FakeResponse(429), FakeResponse(200)]
+    calls = iter(responses)
+    monkeypatch.setattr(mediawiki._session, "get", lambda url, **kwargs: next(calls))
+
+    response = mediawiki.get("https://retry.test/w/rest.php/v1/page/A/html", stream=True)
+
+    assert response is responses[2] and not response.closed
+    assert responses[0].closed and responses[1].closed
+
+
+def test_last_failed_attempt_is_returned_open(monkeypatch):
+    responses = [FakeResponse(503) for _ in range(3)]
+    calls = iter(responses)
+    monkeypatch.setattr(mediawiki._session, "get", lambda url, **kwargs: next(calls))
+
+    response = mediawiki.get("https://retry.test/w/rest.php/v1/page/A/html", stream=True)
+
+    assert response is responses[2] and not response.closed
+    assert responses[0].closed and responses[1].closed
+
+
+class BodyResponse(FakeResponse):
+    def __init__(self, body:bytes, content_length:int|None=None):
+        super().__init__(200)
+        self.body = body
+        self.ok = True
+        if content_length is not None:
+            self.headers["Content-Length"] = str(content_length)
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size):
+        for start in range(0, len(self.body), 4):
+            yield self.body[start:start + 4]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def test_capped_api_responses_are_streamed_and_abandoned_past_the_limit(monkeypatch):
+    body = b'{"parse": {"text": {"*": "<p>0123456789</p>"}}}'
+    responses = []
+
+    def get(url, **kwargs):
+        assert kwargs["stream"]
+        responses.append(BodyResponse(body))
+        return responses[-1]
+
+    monkeypatch.setattr(mediawiki._session, "get", get)
+
+    assert mediawiki.api_get("en", {"action": "parse"}, max_bytes=len(body)) == json.loads(body)
+    with pytest.raises(mediawiki.ResponseTooLarge):
+        mediawiki.api_get("en", {"action": "parse"}, max_bytes=len(body) - 1)
+    assert all(response.closed for response in responses)
+
+
+def test_declared_length_past_the_limit_is_not_read(monkeypatch):
+    response = BodyResponse(b"", content_length=1000)
+    monkeypatch.setattr(mediawiki._session, "get", lambda url, **kwargs: response)
+    monkeypatch.setattr(config, "MAX_ARTICLE_HTML_BYTES", 999)
+
+    with pytest.raises(HTTPException) as error:
+        article.fetch_article("Large", "en")
+    assert error.value.status_code == 422 and response.closed
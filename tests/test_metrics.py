@@ -0,0 +1,34 @@
+import time
+
+import article
+import metrics
+from table import analyze_tables
+
+
+def _stage_sum(stage:str, language:str) -> float:
+    state = metrics.STAGE_SECONDS._values.get((stage, language))
+    return state[-2] if state else 0.0
+
+
+def test_unlisted_languages_share_one_series():
+    with metrics.timed("test_stage", "en"):
+        pass
+    with metrics.timed("test_stage", "xx-unlisted"):
+        pass
+
+    keys = {key for key in metrics.STAGE_SECONDS._values if key[0] == "test_stage"}
+    assert keys == {("test_stage", "en"), ("test_stage", "other")}
+
+
+def test_html_parse_is_not_counted_in_analyzer_stage(monkeypatch):
+    def slow_analysis(html):
+        time.sleep(0.05)
+        return {"tables": [{"rows": 1, "columns": 1}]}
+
+    monkeypatch.setattr(article, "analyze_html", slow_analysis)
+    document = article.ArticleDocument("T", "de", "<table></table>", "", [], [])
+    parse_before, table_before = _stage_sum("html_analysis", "de"), _stage_sum("analyzer.table", "de")
+
+    assert analyze_tables("T", "de", document).number_of_tables == 1
+    assert _stage_sum("html_analysis", "de") - parse_before >= 0.05
+    assert _stage_sum("analyzer.table", "de") - table_before < 0.05
@@ -0,0 +1,75 @@
+import json
+
+import pytest
+import requests
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import admission
+import config
+import mediawiki
+import operations
+from application import application
+
+app = FastAPI()
+app.include_router(operations.operations_router)
+client = TestClient(app)
+
+
+@pytest.mark.parametrize("code", ["127.0.0.1:8080", "evil.example%23", "EN", "e", "en%0A"])
+@pytest.mark.parametrize("suffix", ["", "/stream"])
+def test_malformed_source_language_is_rejected(code, suffix, monkeypatch):
+    monkeypatch.setattr(mediawiki._session, "get", lambda *args, **kwargs: pytest.fail("upstream was called"))
+
+    assert client.get(f"/operations/{code}/Paris{suffix}").status_code == 422
+
+
+@pytest.mark.parametrize("code", ["127.0.0.1:8080/x#", "en\n", "en.evil.example"])
+def test_api_url_rejects_malformed_codes(code):
+    with pytest.raises(ValueError):
+        mediawiki.api_url(code)
+
+
+def test_malformed_langlink_codes_are_not_followed(monkeypatch):
+    monkeypatch.setattr(operations, "get_langlinks", lambda title, language: {
+        "de": "Paris", "zh-min-nan": "Pa-lí", "evil.example:80/#": "Paris"})
+
+    assert operations.resolve_titles("Paris", "en", "all") == {"en": "Paris", "de": "Paris", "zh-min-nan": "Pa-lí"}
+
+
+def test_malformed_batch_language_is_rejected_per_item(monkeypatch):
+    monkeypatch.setattr(mediawiki._session, "get", lambda *args, **kwargs: pytest.fail("upstream was called"))
+
+    response = client.post("/operations/batch", json={"articles": [
+        {"language": "en", "title": "Paris"}, {"language": "127.0.0.1:8080", "title": "Paris"}]})
+
+    assert response.status_code == 422
+    assert [error["loc"] for error in response.json()["detail"]] == [["body", "articles", 1, "language"]]
+
+
+@pytest.fixture
+def unreachable_wiki(monkeypatch):
+    def get(*args, **kwargs):
+        raise requests.ConnectionError("connection refused")
+
+    monkeypatch.setattr(mediawiki._session, "get", get)
+    monkeypatch.setattr(admission, "_gates", {})
+    monkeypatch.setattr(config, "HTTP_RATE_LIMIT", 0)
+    monkeypatch.setattr(config, "HTTP_RETRIES", 0)
+    monkeypatch.setattr(config, "HTTP_BACKOFF_MAX", 7)
+
+
+def test_unreachable_langlinks_lookup_is_a_503_with_retry_after(unreachable_wiki):
+    response = TestClient(application).get("/operations/en/Unreachable_langlinks")
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "7"
+    assert "connection refused" in response.json()["detail"]
+
+
+def test_unreachable_langlinks_lookup_ends_a_stream_in_band(unreachable_wiki):
+    response = client.get("/operations/en/Unreachable_langlinks_stream/stream")
+
+    assert response.status_code == 200
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert len(events) == 1 and events[0]["event"] == "error" and events[0]["data"]["retry_after"] == 7
@@ -0,0 +1,59 @@
+import asyncio
+
+import pytest
+
+import mediawiki
+import scores
+from score_index import ScoreIndex
+
+COUNTS = {"citations": 1, "tables": 0, "infobox_attributes": 0, "headers": 1, "images": 0}
+
+
+@pytest.fixture
+def index(tmp_path, monkeypatch):
+    index = ScoreIndex(str(tmp_path / "scores.sqlite3"))
+    for revision_id, title in enumerate(["Unchanged", "Edited", "Deleted", "Unreported"], start=1):
+        index.put("en", title, revision_id, 1.0, COUNTS)
+    monkeypatch.setattr(scores, "score_index", index)
+    return index
+
+
+def test_api_error_keeps_the_index(index, monkeypatch):
+    monkeypatch.setattr(mediawiki, "api_get",
+                        lambda language, params: {"error": {"code": "maxlag", "info": "Waiting for db"}})
+
+    summary = asyncio.run(scores.refresh_index())
+
+    assert summary == {"en": {"error": "maxlag: Waiting for db"}}
+    assert len(index.revisions("en")) == 4
+
+
+def test_only_reported_changes_are_applied(index, monkeypatch):
+    monkeypatch.setattr(mediawiki, "api_get", lambda language, params: {"query": {"pages": {
+        "1": {"pageid": 1, "title": "Unchanged", "lastrevid": 1},
+        "2": {"pageid": 2, "title": "Edited", "lastrevid": 20},
+        "-1": {"title": "Deleted", "missing": ""},
+    }}})
+    rescored = []
+    monkeypatch.setattr(scores, "score_article", lambda title, language, page_info: rescored.append(title))
+
+    summary = asyncio.run(scores.refresh_index("en"))
+
+    assert summary == {"en": {"checked": 4, "recomputed": 1, "failed": 0, "removed": 1}}
+    assert rescored == ["Edited"]
+    assert set(index.revisions("en")) == {"Unchanged", "Edited", "Unreported"}
+
+
+def test_score_frame_reloads_on_the_ttl_not_on_every_write(index, monkeypatch):
+    from corpus import ScoreFrame
+
+    clock = [1000.0]
+    monkeypatch.setattr("corpus.time.monotonic", lambda: clock[0])
+    frames = ScoreFrame(index, ttl=60)
+
+    first = frames.get()
+    index.put("en", "Added", 5, 1.0, COUNTS)
+    assert frames.get() is first and len(first) == 4
+
+    clock[0] += 61
+    assert len(frames.get()) == 5
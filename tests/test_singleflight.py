@@ -0,0 +1,90 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from singleflight import AsyncSingleFlight, SingleFlight
+
+CALLERS = 8
+
+
+def _run_concurrently(flight:SingleFlight, func) -> list:
+    """Calls ``flight.do("key", func)`` from CALLERS threads and returns each outcome (result or exception)."""
+    def call():
+        try:
+            return flight.do("key", func)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(CALLERS) as pool:
+        futures = [pool.submit(call) for _ in range(CALLERS)]
+        return [future.result(timeout=5) for future in futures]
+
+
+def _gated(outcome):
+    """A function that blocks until every caller has had time to join, then returns or raises ``outcome``."""
+    calls = []
+    release = threading.Event()
+
+    def func():
+        calls.append(1)
+        release.wait(5)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    threading.Timer(0.2, release.set).start()
+    return func, calls
+
+
+def test_concurrent_identical_calls_run_once():
+    func, calls = _gated("result")
+
+    assert _run_concurrently(SingleFlight(), func) == ["result"] * CALLERS
+    assert len(calls) == 1
+
+
+def test_exception_reaches_every_waiter():
+    error = ValueError("upstream failed")
+    func, calls = _gated(error)
+
+    assert _run_concurrently(SingleFlight(), func) == [error] * CALLERS
+    assert len(calls) == 1
+
+
+def test_finished_call_is_not_reused():
+    flight = SingleFlight()
+    results = iter([1, 2])
+
+    assert flight.do("key", lambda: next(results)) == 1
+    assert flight.do("key", lambda: next(results)) == 2
+
+
+def test_async_concurrent_identical_calls_run_once():
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def main():
+        flight = AsyncSingleFlight()
+        return await asyncio.gather(*(flight.do("key", work) for _ in range(CALLERS)))
+
+    assert asyncio.run(main()) == ["result"] * CALLERS
+    assert len(calls) == 1
+
+
+def test_async_exception_reaches_every_waiter():
+    async def work():
+        await asyncio.sleep(0.05)
+        raise ValueError("upstream failed")
+
+    async def main():
+        flight = AsyncSingleFlight()
+        return await asyncio.gather(*(flight.do("key", work) for _ in range(CALLERS)), return_exceptions=True)
+
+    outcomes = asyncio.run(main())
+    assert len(outcomes) == CALLERS
+    assert all(isinstance(outcome, ValueError) for outcome in outcomes)
+    assert len({id(outcome) for outcome in outcomes}) == 1
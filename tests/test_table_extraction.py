@@ -0,0 +1,177 @@
+import io
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import admission
+import config
+import mediawiki
+from routers.tables import router
+from table_extraction import iter_tables, write_json
+
+
+def _only_table(html:str):
+    tables = list(iter_tables(html))
+    assert len(tables) == 1
+    return tables[0]
+
+
+def test_rowspan_and_colspan_are_expanded():
+    table = _only_table("""<table>
+      <tr><th>Region</th><th>City</th><th>Population</th></tr>
+      <tr><td rowspan="2">North</td><td>A</td><td>10</td></tr>
+      <tr><td>B</td><td>20</td></tr>
+      <tr><td colspan="2">Total</td><td>30</td></tr>
+      <tr><td>South</td><td colspan="2" rowspan="2">No data</td></tr>
+      <tr><td>East</td></tr>
+    </table>""")
+
+    assert table.headers == ["Region", "City", "Population"]
+    assert list(table.rows()) == [
+        ["North", "A", "10"],
+        ["North", "B", "20"],
+        ["Total", "Total", "30"],
+        ["South", "No data", "No data"],
+        ["East", "No data", "No data"],
+    ]
+    assert table.count_rows() == 5
+
+
+def test_rowspan_past_the_last_cell_of_a_row_and_short_rows_are_padded():
+    table = _only_table("""<table>
+      <tr><th>A</th><th>B</th><th>C</th></tr>
+      <tr><td>1</td><td>2</td><td rowspan="2">3</td></tr>
+      <tr><td>4</td></tr>
+    </table>""")
+
+    assert list(table.rows()) == [["1", "2", "3"], ["4", "", "3"]]
+
+
+def test_multi_row_headers_are_joined_per_column():
+    table = _only_table("""<table>
+      <caption>Population<sup class="reference">[1]</sup></caption>
+      <thead>
+        <tr><th rowspan="2">Country</th><th colspan="2">Population</th></tr>
+        <tr><th>2010</th><th>2020</th></tr>
+      </thead>
+      <tbody><tr><td>X</td><td>1</td><td>2</td></tr></tbody>
+    </table>""")
+
+    assert table.caption == "Population"
+    assert table.header_rows == [["Country", "Population", "Population"], ["Country", "2010", "2020"]]
+    assert table.headers == ["Country", "Population / 2010", "Population / 2020"]
+    assert list(table.rows()) == [["X", "1", "2"]]
+
+
+def test_duplicate_and_missing_headers_get_names():
+    table = _only_table("""<table>
+      <tr><th>Name</th><th>Name</th><th></th></tr>
+      <tr><td>a</td><td>b</td><td>c</td></tr>
+    </table>""")
+
+    assert table.headers == ["Name", "Name (2)", "Column 3"]
+
+
+def test_layout_and_nested_tables_are_skipped():
+    html = """<table class="infobox"><tr><th>Key</th><td>Value</td></tr></table>
+      <table class="wikitable">
+        <tr><th>Outer</th></tr>
+        <tr><td>cell<table><tr><td>nested</td></tr></table></td></tr>
+      </table>"""
+
+    tables = list(iter_tables(html))
+    assert [table.headers for table in tables] == [["Outer"]]
+    assert list(tables[0].rows()) == [["cell"]]
+    assert len(list(iter_tables(html, include_layout=True))) == 2
+
+
+def test_write_json():
+    output = io.StringIO()
+
+    assert write_json(iter_tables("<table><tr><th>A</th></tr><tr><td>1</td></tr></table>"), output) == 1
+    assert output.getvalue() == '[\n{"caption": null, "headers": ["A"], "rows": [\n  ["1"]]}\n]\n'
+
+
+def test_iter_csv_matches_write_csv():
+    table = _only_table('<table><tr><th>A</th><th>B</th></tr><tr><td>1</td><td>x,y</td></tr></table>')
+    output = io.StringIO()
+
+    assert table.write_csv(output) == 1
+    assert "".join(table.iter_csv()) == output.getvalue() == 'A,B\r\n1,"x,y"\r\n'
+
+
+ARTICLE_HTML = b"""<html><body>
+  <table class="infobox"><tr><td>layout</td></tr></table>
+  <table><caption>First</caption><tr><th>A</th></tr><tr><td>1</td></tr><tr><td>2</td></tr></table>
+  <table><tr><th>B</th><th>C</th></tr><tr><td>3</td><td>4</td></tr></table>
+</body></html>"""
+
+
+class StreamedResponse:
+    def __init__(self, status_code:int, body:bytes=b""):
+        self.status_code = status_code
+        self.headers = {}
+        self.raw = io.BytesIO(body)
+        self.closed = False
+
+    def raise_for_status(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(admission, "_gates", {})
+    monkeypatch.setattr(config, "HTTP_RATE_LIMIT", 0)
+    requested = []
+
+    def get(url, **kwargs):
+        requested.append((url, kwargs.get("stream")))
+        return StreamedResponse(404) if "Missing" in url else StreamedResponse(200, ARTICLE_HTML)
+
+    monkeypatch.setattr(mediawiki._session, "get", get)
+    app = FastAPI()
+    app.include_router(router)
+    test_client = TestClient(app)
+    test_client.requested = requested
+    return test_client
+
+
+def test_extract_tables_streams_the_rest_html(client):
+    response = client.post("/extract-tables", json={"page_title": "Tables", "language": "english"})
+
+    assert response.status_code == 200
+    assert client.requested == [("https://en.wikipedia.org/w/rest.php/v1/page/Tables/html", True)]
+    assert json.loads(response.text) == {
+        "article_title": "Tables",
+        "language": "english",
+        "tables": [
+            {"table_id": "table_1", "caption": "First", "headers": ["A"], "rows": [["1"], ["2"]]},
+            {"table_id": "table_2", "caption": None, "headers": ["B", "C"], "rows": [["3", "4"]]},
+        ],
+        "number_of_tables": 2,
+        "table_details": {"1": "2 rows and 1 columns", "2": "1 rows and 2 columns"},
+    }
+
+
+def test_extract_tables_as_csv_and_with_fields(client):
+    body = {"page_title": "Tables", "language": "en"}
+
+    response = client.post("/extract-tables?format=csv&table=2", json=body)
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.text == "B,C\r\n3,4\r\n"
+    assert client.post("/extract-tables?format=csv&table=3", json=body).status_code == 404
+
+    response = client.post("/extract-tables?fields=number_of_tables,table_details", json=body)
+    assert response.json() == {"number_of_tables": 2,
+                               "table_details": {"1": "2 rows and 1 columns", "2": "1 rows and 2 columns"}}
+
+
+def test_extract_tables_from_a_missing_page(client):
+    response = client.post("/extract-tables", json={"page_title": "Missing", "language": "en"})
+
+    assert response.status_code == 404
@@ -0,0 +1,74 @@
+import pytest
+
+from wikitext import scan_citations
+
+
+@pytest.mark.parametrize("template", [
+    "{{cite web |title=A}}",
+    "{{Cite Web |title=A}}",
+    "{{cite_web|title=A}}",
+    "{{  Cite   journal\n|title=A}}",
+    "{{Citation |title=A}}",
+    "{{Cita web |título=A}}",
+    "{{Citar livro |título=A}}",
+    "{{Article |titre=A}}",
+    "{{Ouvrage |titre=A}}",
+    "{{Literatur |Titel=A}}",
+    "{{استشهاد بكتاب |عنوان=A}}",
+])
+def test_citation_templates_are_counted(template):
+    counts = scan_citations(f"Text.{template}")
+
+    assert counts["cite_templates"] == 1
+    assert counts["total_citations"] == 1
+
+
+@pytest.mark.parametrize("template", [
+    "{{Citation needed|date=May 2025}}",
+    "{{Cita requerida}}",
+    "{{Citation-needed}}",
+    "{{Article détaillé|Paris}}",
+    "{{Article principal|Paris}}",
+    "{{Citar fontes}}",
+    "{{Cite}}",
+])
+def test_templates_named_like_citations_are_not_counted(template):
+    counts = scan_citations(f"Text.{template}")
+
+    assert counts["cite_templates"] == 0
+    assert counts["total_citations"] == 0
+
+
+def test_identifiers_count_only_in_citation_templates():
+    wikitext = """{{Infobox company
+| url = https://example.org
+| isbn = 0-00-000000-0
+}}
+{{Authority control|doi=10.1000/1}}
+Text.<ref>{{cite book |title=A |isbn=978-0-00-000000-0 |doi=10.1000/2}}</ref>
+<ref>{{cite web |url=https://example.org/a |archive-url={{Webarchive |url=https://archive.org/a}}}}</ref>
+"""
+    counts = scan_citations(wikitext)
+
+    assert counts["citations_with_isbn"] == 1
+    assert counts["citations_with_doi"] == 1
+    assert counts["citations_with_url"] == 1
+    assert counts["citations_with_pmid"] == 0
+
+
+def test_refs():
+    wikitext = """A.<ref name="a">{{cite web |url=https://example.org}}</ref>
+B.<ref name="a" /> C.<ref name=a>Repeated definition.</ref>
+D.<ref>Bare reference.</ref> E.<ref></ref>
+{{cite book |title=Outside any ref}}
+<!-- <ref>Commented out.</ref> --><nowiki><ref>Escaped.</ref></nowiki>
+"""
+    counts = scan_citations(wikitext)
+
+    assert counts["refs"] == 5
+    assert counts["named_refs"] == 2
+    assert counts["reused_refs"] == 2
+    assert counts["bare_refs"] == 1
+    assert counts["cite_templates"] == 2
+    # The named ref once, the bare ref and the template outside refs; the empty ref is not a citation.
+    assert counts["total_citations"] == 3
@@ -1,40 +1,200 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlparse
+
 import requests
 
-def get_translation(source_title:str, source_language:str, target_language:str):
-    url = f"https://{source_language}.wikipedia.org/w/api.php"
+from admission import Unavailable
+from cache import article_cache
+import config
+import mediawiki
+import metrics
+
+# Maximum number of titles MediaWiki accepts in one ``titles=a|b|c`` query.
+MAX_TITLES_PER_QUERY = 50
+
+# (source wiki, title) -> (expiry timestamp, {language code: title})
+_langlinks_cache:OrderedDict[tuple[str, str], tuple[float, dict[str, str]]] = OrderedDict()
+_langlinks_lock = threading.Lock()
+# Maps are also written to the shared cache, so every worker on the host resolves a title once.
+_shared_cache = article_cache if config.LANGLINKS_CACHE_SIZE > 0 else None
+
+
+def _cached_langlinks(source_title:str, source_language:str):
+    with _langlinks_lock:
+        entry = _langlinks_cache.get((source_language, source_title))
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            del _langlinks_cache[(source_language, source_title)]
+            return None
+        _langlinks_cache.move_to_end((source_language, source_title))
+        return entry[1]
+
+
+def _shared_langlinks(source_title:str, source_language:str) -> dict[str, str] | None:
+    """Links stored by any worker on this host, through the shared cache."""
+    if _shared_cache is None:
+        return None
+    cached = _shared_cache.get(f"langlinks:{source_language}:{source_title}")
+    if cached is None:
+        return None
+    links = json.loads(cached)
+    _store_langlinks(source_title, source_language, links, share=False)
+    return links
+
+
+def _store_langlinks(source_title:str, source_language:str, links:dict[str, str], share:bool=True):
+    if share and _shared_cache is not None:
+        _shared_cache.set(f"langlinks:{source_language}:{source_title}", json.dumps(links),
+                          ttl=config.LANGLINKS_CACHE_TTL)
+    with _langlinks_lock:
+        _langlinks_cache[(source_language, source_title)] = (time.monotonic() + config.LANGLINKS_CACHE_TTL, links)
+        _langlinks_cache.move_to_end((source_language, source_title))
+        while len(_langlinks_cache) > config.LANGLINKS_CACHE_SIZE:
+            _langlinks_cache.popitem(last=False)
+
+
+def _api_get(language:str, params:dict) -> dict:
+    """``mediawiki.api_get``, raising ``Unavailable`` (503 with Retry-After) when the wiki cannot be reached."""
+    try:
+        return mediawiki.api_get(language, params)
+    except requests.RequestException as e:
+        raise Unavailable(urlparse(mediawiki.api_url(language)).netloc, config.HTTP_BACKOFF_MAX, e) from e
+
+
+def _aliases(query:dict) -> dict[str, str]:
+    return {alias["from"]: alias["to"] for alias in query.get("normalized", []) + query.get("redirects", [])}
+
+
+def _resolve(aliases:dict[str, str], title:str) -> str:
+    # A requested title may first be normalized and then followed through a redirect.
+    title = aliases.get(title, title)
+    return aliases.get(title, title)
+
+
+def _query_langlinks(source_titles:list[str], source_language:str) -> dict[str, dict[str, str]] | None:
     params = {
         "action": "query",
-        "titles": source_title,
+        "titles": "|".join(source_titles),
         "prop": "langlinks",
-        "lllimit": "500",
-        "format": "json"
+        "lllimit": "max",
+        "redirects": "1"
     }
-    headers = {
-        "User-Agent": "Mozilla/5.0 (compatible; FastAPI/1.0)"
+
+    links_by_title:dict[str, dict[str, str]] = {}
+    aliases:dict[str, str] = {}
+    continuation:dict[str, str] = {}
+
+    # langlinks are paged across all titles of the query, so follow the continuation.
+    while True:
+        data = _api_get(source_language, {**params, **continuation})
+        if "error" in data:
+            return None
+        query = data.get("query", {})
+
+        aliases.update(_aliases(query))
+        for page in query.get("pages", {}).values():
+            page_links = links_by_title.setdefault(page.get("title", ""), {})
+            for link in page.get("langlinks", []):
+                page_links[link["lang"]] = link["*"]
+
+        if "continue" not in data:
+            break
+        continuation = data["continue"]
+
+    return {source_title: links_by_title.get(_resolve(aliases, source_title), {}) for source_title in source_titles}
+
+
+def get_langlinks_batch(source_titles:list[str], source_language:str) -> dict[str, dict[str, str]]:
+    """Returns the interlanguage links of every title, using multi-title queries for cache misses.
+
+    Raises ``Unavailable`` when the source wiki cannot be reached.
+    """
+    results = {}
+    missing = []
+    for source_title in dict.fromkeys(source_titles):
+        links = _cached_langlinks(source_title, source_language)
+        if links is None:
+            links = _shared_langlinks(source_title, source_language)
+        metrics.record_cache("langlinks", links is not None)
+        if links is None:
+            missing.append(source_title)
+        else:
+            results[source_title] = links
+
+    for start in range(0, len(missing), MAX_TITLES_PER_QUERY):
+        chunk = missing[start:start + MAX_TITLES_PER_QUERY]
+        with metrics.timed("langlinks", source_language):
+            fetched = _query_langlinks(chunk, source_language)
+        if fetched is None:
+            # API errors are not cached; the titles simply resolve to no links this time.
+            results.update({source_title: {} for source_title in chunk})
+            continue
+        for source_title, links in fetched.items():
+            _store_langlinks(source_title, source_language, links)
+            results[source_title] = links
+
+    return results
+
+
+def get_langlinks(source_title:str, source_language:str) -> dict[str, str]:
+    return get_langlinks_batch([source_title], source_language)[source_title]
+
+
+def get_translations(source_title:str, source_language:str, target_languages:list[str]) -> dict[str, str]:
+    """Resolves the title in every target language with a single langlinks lookup."""
+    links = get_langlinks(source_title, source_language)
+    return {
+        target_language: source_title if target_language == source_language
+        else links.get(target_language, source_title)
+        for target_language in target_languages
     }
 
-    response = requests.get(url, params=params, headers=headers)
-    data = response.json()
-    pages = data.get("query", {}).get("pages", {})
 
-    for page in pages.values():
-        for link in page.get("langlinks", []):
-            if link["lang"] == target_language:
-                return link["*"]
+def get_translation(source_title:str, source_language:str, target_language:str):
+    return get_translations(source_title, source_language, [target_language])[target_language]
+
 
-    return source_title
+def get_page_info_batch(titles:list[str], language:str) -> dict[str, dict]:
+    """Returns the ``prop=info`` record (lastrevid, touched, length, missing) of every title.
+
+    This is the cheap freshness check: it never downloads article content. Raises
+    ``mediawiki.APIError`` for an error body, so a failed lookup never reads as "missing",
+    and ``Unavailable`` for an unreachable wiki; a title absent from the response gets an empty record.
+    """
+    results = {}
+    unique_titles = list(dict.fromkeys(titles))
+    for start in range(0, len(unique_titles), MAX_TITLES_PER_QUERY):
+        chunk = unique_titles[start:start + MAX_TITLES_PER_QUERY]
+        with metrics.timed("page_info", language):
+            data = _api_get(language, {
+                "action": "query",
+                "titles": "|".join(chunk),
+                "prop": "info",
+                "redirects": "1"
+            })
+        if "error" in data:
+            raise mediawiki.APIError(data["error"])
+        query = data.get("query", {})
+        aliases = _aliases(query)
+        pages_by_title = {page.get("title"): page for page in query.get("pages", {}).values()}
+        for title in chunk:
+            results[title] = pages_by_title.get(_resolve(aliases, title), {})
+    return results
+
+
+def get_page_info(title:str, language:str) -> dict:
+    return get_page_info_batch([title], language)[title]
 
 
 def page_exists(title:str, source_language:str="en"):
-    api_url = f"https://{source_language}.wikipedia.org/w/api.php"
     params = {
-        "action": "query", "page": title, "format": "json"
-    }
-    headers = {
-        "User-Agent": "Mozilla/5.0 (compatible; FastAPI/1.0)"
+        "action": "query", "titles": title
     }
-    response = requests.get(api_url, params=params, headers=headers)
-    data = response.json()
+    data = _api_get(source_language, params)
 
     pages = data.get("query", {}).get("pages", {})
     return "-1" not in pages
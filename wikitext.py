@@ -0,0 +1,262 @@
+import re
+
+from scoring import score_from_counts
+
+HEADING_PATTERN = re.compile(r"^(={1,6})[ \t]*(.+?)[ \t]*\1[ \t]*$", re.MULTILINE)
+TABLE_PATTERN = re.compile(r"^[ \t:]*\{\|", re.MULTILINE)
+GALLERY_PATTERN = re.compile(r"<gallery\b[^>]*>(.*?)</gallery>", re.IGNORECASE | re.DOTALL)
+
+# File namespace names and infobox template prefixes of the supported wikis.
+FILE_NAMESPACES = ("file", "image", "datei", "bild", "fichier", "archivo", "imagen",
+                   "ficheiro", "arquivo", "imagem", "ملف", "صورة")
+INFOBOX_PREFIXES = ("infobox", "ficha", "info/", "صندوق معلومات")
+
+FILE_LINK_PATTERN = re.compile(r"\[\[\s*(?:%s)\s*:" % "|".join(FILE_NAMESPACES), re.IGNORECASE)
+INFOBOX_START_PATTERN = re.compile(r"\{\{\s*(?:%s)" % "|".join(re.escape(p) for p in INFOBOX_PREFIXES),
+                                   re.IGNORECASE)
+TEMPLATE_TOKEN_PATTERN = re.compile(r"\{\{|\}\}|\[\[|\]\]|\|")
+
+# Citation template names of the supported wikis, normalized like ``_template_name``. Matched exactly:
+# prefixes would also take in {{Citation needed}}, {{Cita requerida}} or {{Article détaillé}}.
+CITE_TEMPLATES = frozenset((
+    # en (also used on the other wikis)
+    "citation", "cite web", "cite book", "cite journal", "cite news", "cite magazine", "cite encyclopedia",
+    "cite conference", "cite report", "cite thesis", "cite av media", "cite episode", "cite press release",
+    "cite arxiv", "cite map", "cite patent", "cite interview", "cite speech", "cite podcast", "cite document",
+    "cite techreport", "cite mailing list", "cite newsgroup", "cite serial", "cite sign", "cite tweet",
+    "cite video game", "cite dictionary", "cite court", "cite act", "cite legislation", "cite q",
+    # es
+    "cita web", "cita libro", "cita publicación", "cita noticia", "cita enciclopedia", "cita conferencia",
+    "cita tesis", "cita informe", "cita vídeo", "cita episodio", "cita mapa", "cita entrevista", "cita arxiv",
+    "cita comunicado",
+    # pt
+    "citar web", "citar livro", "citar periódico", "citar jornal", "citar notícia", "citar enciclopédia",
+    "citar conferência", "citar tese", "citar relatório", "citar vídeo", "citar episódio", "citar mapa",
+    "citar entrevista", "citar arxiv",
+    # fr
+    "lien web", "article", "ouvrage", "chapitre", "lien conférence", "lien vidéo",
+    # de
+    "literatur", "internetquelle",
+    # ar
+    "استشهاد", "استشهاد ويب", "استشهاد بويب", "استشهاد بكتاب", "استشهاد بدورية محكمة", "استشهاد بخبر",
+    "استشهاد بموسوعة", "استشهاد بمنشورات مؤتمر", "استشهاد بأطروحة", "استشهاد بفيديو",
+))
+WHITESPACE_PATTERN = re.compile(r"[\s_]+")
+CITATION_PARAMETERS = {"doi": "citations_with_doi", "isbn": "citations_with_isbn",
+                       "pmid": "citations_with_pmid", "url": "citations_with_url"}
+CITATION_METRICS = ("total_citations", "cite_templates", "refs", "named_refs", "reused_refs", "bare_refs",
+                    *CITATION_PARAMETERS.values())
+CITATION_TOKEN_PATTERN = re.compile(r"""
+      (?P<comment><!--.*?-->)
+    | (?P<nowiki><nowiki>.*?</nowiki>)
+    | (?P<open>\{\{(?P<name>[^{}|<\n]*))
+    | (?P<close>\}\})
+    | (?P<param>\|\s*(?P<parameter>doi|isbn|pmid|url)\s*=)
+    | (?P<ref_self><ref\b(?P<self_attributes>[^>]*?)/>)
+    | (?P<ref_open><ref\b(?P<attributes>[^>]*)>)
+    | (?P<ref_close></ref\s*>)
+""", re.IGNORECASE | re.DOTALL | re.VERBOSE)
+REF_NAME_PATTERN = re.compile(r"\bname\s*=\s*(\"[^\"]*\"|'[^']*'|[^\s/>]+)", re.IGNORECASE)
+
+
+def scan_citations(wikitext:str) -> dict[str, int]:
+    """Walks the wikitext once, tracking nested ``{{...}}`` and ``<ref>...</ref>`` structure.
+
+    Runs in linear time over the original string (no lowercased copy).
+    ``total_citations`` counts distinct citations: refs with content (a named
+    ref defined twice counts once) plus citation templates outside any ref.
+    Identifier counts are ``|doi=``, ``|isbn=``, ``|pmid=`` and ``|url=``
+    parameters of citation templates (not of a template nested in one).
+    """
+    return _scan_citations(wikitext)[0]
+
+
+def _template_name(name:str) -> str:
+    """Template name as MediaWiki resolves it: case-insensitive, with underscores and runs of spaces alike."""
+    return WHITESPACE_PATTERN.sub(" ", name).strip().lower()
+
+
+def _scan_citations(wikitext:str) -> tuple[dict[str, int], dict[str, bool]]:
+    """``scan_citations`` plus every ref name, mapped to whether its first ``<ref>`` was counted."""
+    counts = dict.fromkeys(CITATION_METRICS, 0)
+    templates:list[bool] = []
+    ref_names:dict[str, bool] = {}
+    ref_name = None
+    ref_start = None
+    ref_has_template = False
+
+    for token in CITATION_TOKEN_PATTERN.finditer(wikitext):
+        # Inner groups are nested in their token's group, so lastgroup is always the token kind.
+        kind = token.lastgroup
+        if kind == "open":
+            is_cite = _template_name(token.group("name")) in CITE_TEMPLATES
+            templates.append(is_cite)
+            if is_cite:
+                counts["cite_templates"] += 1
+                if ref_start is None:
+                    counts["total_citations"] += 1
+            if ref_start is not None:
+                ref_has_template = True
+        elif kind == "close":
+            if templates:
+                templates.pop()
+        elif kind == "param":
+            if templates and templates[-1]:
+                counts[CITATION_PARAMETERS[token.group("parameter").lower()]] += 1
+        elif kind == "ref_self":
+            # <ref name="x" /> re-uses a citation defined elsewhere.
+            counts["refs"] += 1
+            if REF_NAME_PATTERN.search(token.group("self_attributes")):
+                counts["reused_refs"] += 1
+        elif kind == "ref_open":
+            counts["refs"] += 1
+            ref_start = token.end()
+            ref_has_template = False
+            ref_name = None
+            name = REF_NAME_PATTERN.search(token.group("attributes"))
+            if name:
+                name = name.group(1).strip("\"' ")
+                counts["named_refs"] += 1
+                if name in ref_names:
+                    counts["reused_refs"] += 1
+                    ref_start = -1
+                else:
+                    ref_names[name] = False
+                    ref_name = name
+        elif kind == "ref_close" and ref_start is not None:
+            if ref_start >= 0 and wikitext[ref_start:token.start()].strip():
+                counts["total_citations"] += 1
+                if not ref_has_template:
+                    counts["bare_refs"] += 1
+                if ref_name is not None:
+                    ref_names[ref_name] = True
+            ref_start = None
+    return counts, ref_names
+
+
+def count_doi_isbn_in_wikitext(wikitext: str) -> dict[str, int]:
+    counts = scan_citations(wikitext)
+    return {
+        "citations_with_doi": counts["citations_with_doi"],
+        "citations_with_isbn": counts["citations_with_isbn"],
+        "total_citations": counts["total_citations"],
+    }
+
+
+def count_headers(wikitext:str) -> dict[str, int]:
+    """Counts ``== Heading ==`` lines per level, keyed like the HTML header counts (h1-h6)."""
+    counts = {f"h{level}": 0 for level in range(1, 7)}
+    for match in HEADING_PATTERN.finditer(wikitext):
+        counts[f"h{len(match.group(1))}"] += 1
+    return counts
+
+
+def count_tables(wikitext:str) -> int:
+    return len(TABLE_PATTERN.findall(wikitext))
+
+
+def count_images(wikitext:str) -> int:
+    """Counts file links plus the entries of ``<gallery>`` blocks."""
+    count = len(FILE_LINK_PATTERN.findall(wikitext))
+    for gallery in GALLERY_PATTERN.finditer(wikitext):
+        count += sum(1 for line in gallery.group(1).splitlines() if line.strip())
+    return count
+
+
+def count_infobox_attributes(wikitext:str) -> int:
+    """Counts the non-empty ``name = value`` parameters of the first infobox template."""
+    start = INFOBOX_START_PATTERN.search(wikitext)
+    if not start:
+        return 0
+
+    attributes = 0
+    depth = 0
+    parameter_start = None
+    for token in TEMPLATE_TOKEN_PATTERN.finditer(wikitext, start.start()):
+        value = token.group()
+        if depth == 1 and value in ("|", "}}"):
+            # A parameter of the infobox itself ends at the next top-level pipe or at the closing braces.
+            if parameter_start is not None:
+                name, equals, parameter_value = wikitext[parameter_start:token.start()].partition("=")
+                if equals and name.strip() and parameter_value.strip():
+                    attributes += 1
+            parameter_start = token.end()
+        if value in ("{{", "[["):
+            depth += 1
+        elif value in ("}}", "]]"):
+            depth -= 1
+            if depth == 0:
+                break
+    return attributes
+
+
+def wikitext_component_counts(wikitext:str) -> dict[str, int]:
+    """The score components that need the wikitext: citations, tables and infobox attributes."""
+    return {
+        "citations": scan_citations(wikitext)["total_citations"],
+        "tables": count_tables(wikitext),
+        "infobox_attributes": count_infobox_attributes(wikitext),
+    }
+
+
+def wikitext_counts(wikitext:str) -> dict[str, int]:
+    """All five score components (plus DOI/ISBN counts) derived from wikitext alone."""
+    citations = scan_citations(wikitext)
+    return {
+        "citations": citations["total_citations"],
+        "tables": count_tables(wikitext),
+        "infobox_attributes": count_infobox_attributes(wikitext),
+        "headers": sum(count_headers(wikitext).values()),
+        "images": count_images(wikitext),
+        "citations_with_doi": citations["citations_with_doi"],
+        "citations_with_isbn": citations["citations_with_isbn"],
+    }
+
+
+def score_wikitext(wikitext:str) -> tuple[float, dict[str, int]]:
+    counts = wikitext_counts(wikitext)
+    score = score_from_counts(citations=counts["citations"], tables=counts["tables"],
+                              infobox_attributes=counts["infobox_attributes"],
+                              headers=counts["headers"], images=counts["images"])
+    return score, counts
+
+
+def split_sections(wikitext:str) -> list[str]:
+    """Splits wikitext before every heading line; the first item is the lead (possibly empty)."""
+    bounds = [0, *(match.start() for match in HEADING_PATTERN.finditer(wikitext)), len(wikitext)]
+    return [wikitext[start:end] for start, end in zip(bounds, bounds[1:])]
+
+
+def section_counts(section:str) -> dict:
+    """Score components of one section, in a form ``combine_section_counts`` can add up.
+
+    ``infobox_attributes`` is None without an infobox, and ``ref_names`` keeps what
+    is needed to count a named ref defined in several sections once.
+    """
+    citations, ref_names = _scan_citations(section)
+    return {
+        "citations": citations["total_citations"],
+        "tables": count_tables(section),
+        "infobox_attributes": count_infobox_attributes(section) if INFOBOX_START_PATTERN.search(section) else None,
+        "headers": sum(count_headers(section).values()),
+        "images": count_images(section),
+        "ref_names": ref_names,
+    }
+
+
+def combine_section_counts(sections:list[dict]) -> dict[str, int]:
+    """The five score components of an article from the ``section_counts`` of its sections, in order."""
+    counts = {"citations": 0, "tables": 0, "infobox_attributes": None, "headers": 0, "images": 0}
+    seen_refs:set[str] = set()
+    for section in sections:
+        counts["citations"] += section["citations"]
+        # A name first defined in an earlier section is a reuse here, not a new citation.
+        counts["citations"] -= sum(1 for name, counted in section["ref_names"].items()
+                                   if counted and name in seen_refs)
+        seen_refs.update(section["ref_names"])
+        for component in ("tables", "headers", "images"):
+            counts[component] += section[component]
+        if counts["infobox_attributes"] is None:
+            counts["infobox_attributes"] = section["infobox_attributes"]
+    counts["infobox_attributes"] = counts["infobox_attributes"] or 0
+    return counts